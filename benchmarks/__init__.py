@@ -0,0 +1 @@
+"""Headless benchmarks for the trainer hot paths (``python -m benchmarks``)."""
@@ -0,0 +1,38 @@
+import os
+import sys
+import argparse
+
+# Headless: render with Agg even when a display is available
+os.environ["MPLBACKEND"] = "Agg"
+
+from benchmarks import runner
+from benchmarks import bench_trainer, bench_pairs, bench_logs, bench_startup  # noqa: F401  (registers benchmarks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Trainer hot path benchmarks")
+    parser.add_argument('-k', '--filter', default=None, help="Only run benchmarks whose name matches this regex")
+    parser.add_argument('--repeat', type=int, default=5, help="Timing rounds per benchmark")
+    parser.add_argument('--save', metavar="NAME", default=None,
+                        help="Save the results as a baseline (benchmarks/baselines/NAME.json, or a .json path)")
+    parser.add_argument('--compare', metavar="NAME", default=None,
+                        help="Compare the results with a saved baseline; exits 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown as a fraction of the baseline time")
+    args = parser.parse_args(argv)
+
+    results = runner.run(args.filter, repeat=args.repeat)
+
+    if args.save:
+        print(f"\nSaved baseline to {runner.save_baseline(results, args.save)}")
+
+    if args.compare:
+        regressions = runner.compare(results, runner.load_baseline(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import os
+import shutil
+from itertools import count
+
+from benchmarks.runner import benchmark
+from sctools import paths
+from sctools.analytics import AnalyticsIndex
+from sctools.logstore import LogStore, import_csv_logs
+from sctools.sessionlog import SessionLog
+
+
+def _legacy_logs(tmp: str) -> str:
+    logs_dir = os.path.join(tmp, "logs")
+    shutil.copytree(paths.logs_dir(), logs_dir, ignore=shutil.ignore_patterns("store", "*.json"))
+    return logs_dir
+
+
+@benchmark("logs.import_csv_logs")
+def import_logs(tmp):
+    logs_dir = _legacy_logs(tmp)
+    runs = count()
+
+    def ingest():
+        store = LogStore(os.path.join(tmp, f"store{next(runs)}"))
+        return import_csv_logs(store, logs_dir)
+    return ingest
+
+
+@benchmark("logs.analytics_rebuild")
+def analytics_rebuild(tmp):
+    store = LogStore(os.path.join(tmp, "store"))
+    import_csv_logs(store, _legacy_logs(tmp))
+
+    def rebuild():
+        index = AnalyticsIndex()
+        index.sync(store)
+        return index
+    return rebuild
+
+
+@benchmark("logs.session_record")
+def session_record(tmp):
+    log = SessionLog("corner", os.path.join(tmp, "store"))
+    log.open()
+    yield lambda: log.record(5, "f", True, 1.25, render_time=0.004, reaction_time=0.8)
+    log.close()
+
+
+@benchmark("report.build[unchanged]")
+def report_unchanged(tmp):
+    from sctools.report import build_reports
+
+    store = LogStore(os.path.join(tmp, "store"))
+    import_csv_logs(store, _legacy_logs(tmp))
+    output_dir = os.path.join(tmp, "report")
+    build_reports(store, output_dir, workers=1)
+    return lambda: build_reports(store, output_dir)
+
+
+@benchmark("report.aggregate")
+def report_aggregate(tmp):
+    from sctools.report import aggregate
+
+    store = LogStore(os.path.join(tmp, "store"))
+    import_csv_logs(store, _legacy_logs(tmp))
+    records = store.read()
+    return lambda: aggregate(records)
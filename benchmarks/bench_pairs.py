@@ -0,0 +1,56 @@
+import os
+import shutil
+
+from benchmarks.runner import benchmark
+from sctools.pairs import PAIR_LETTERS, build_all_groups, load_groups
+from sctools.pair_drills import create_groups, load_csv_files, load_word_pairs
+
+LETTERS = PAIR_LETTERS[:24]
+
+
+def _spreadsheet(tmp: str) -> str:
+    """A full 24x24 pairs spreadsheet in the layout of "Bld Pairs.xlsx"."""
+    import pandas as pd
+
+    path = os.path.join(tmp, "pairs.xlsx")
+    images = [[f"{a}{b} image" if a != b else "." for b in LETTERS] for a in LETTERS]
+    pd.DataFrame(images, index=list(LETTERS), columns=list(LETTERS)).to_excel(path)
+    return path
+
+
+@benchmark("pairs.create_groups")
+def create(tmp):
+    excel_path = _spreadsheet(tmp)
+    return lambda: create_groups(excel_path, tmp)
+
+
+@benchmark("pairs.load_groups[cached]")
+def load_cached(tmp):
+    excel_path = _spreadsheet(tmp)
+    return lambda: load_groups(excel_path, os.path.join(tmp, "cache"))
+
+
+@benchmark("pairs.build_all_groups[8 members]")
+def build_all(tmp):
+    sheets_dir = os.path.join(tmp, "sheets")
+    os.makedirs(sheets_dir)
+    excel_path = _spreadsheet(tmp)
+    for member in range(8):
+        shutil.copy(excel_path, os.path.join(sheets_dir, f"member{member}.xlsx"))
+    output_dir = os.path.join(tmp, "groups")
+    return lambda: list(build_all_groups(sheets_dir, output_dir))
+
+
+@benchmark("pairs.load_word_pairs")
+def load_pairs(tmp):
+    create_groups(_spreadsheet(tmp), tmp)
+    files = list(load_csv_files(tmp).values())
+    return lambda: load_word_pairs(files)
+
+
+@benchmark("simulate.session[srs]")
+def simulate_session(tmp):
+    from sctools.simulate import LearnerModel, simulate_session
+
+    model = LearnerModel()
+    return lambda: simulate_session(model, "srs", seed=0)
@@ -0,0 +1,23 @@
+import sys
+import subprocess
+
+from benchmarks.runner import benchmark
+
+
+def _command(code: str):
+    return lambda: subprocess.run([sys.executable, "-c", code], check=True)
+
+
+@benchmark("startup.cli_parser")
+def cli_parser(tmp):
+    return _command("from sctools.cli import build_parser; build_parser()")
+
+
+@benchmark("startup.recognition_import")
+def recognition_import(tmp):
+    return _command("import sctools.recognition")
+
+
+@benchmark("startup.pairs_import")
+def pairs_import(tmp):
+    return _command("import sctools.pair_drills")
@@ -0,0 +1,105 @@
+import io
+import os
+import warnings
+
+from benchmarks.runner import benchmark
+from sctools.bld import Trainer, PieceAtlas, PieceDisplay, BLD_CORNERS_ENCODER
+
+
+@benchmark("trainer.get_random_piece")
+def get_random_piece(tmp):
+    trainer = Trainer(seed=0)
+    return lambda: trainer.get_random_piece(ptype="edge")
+
+
+@benchmark("trainer.get_random_pieces[100k]")
+def get_random_pieces(tmp):
+    trainer = Trainer(seed=0)
+    return lambda: trainer.get_random_pieces(100_000, ptype="corner")
+
+
+@benchmark("trainer.check_piece_memo_letter")
+def check_piece_memo_letter(tmp):
+    trainer = Trainer(seed=0)
+    corner = BLD_CORNERS_ENCODER["idx_to_tuple"][5]
+    return lambda: trainer.check_piece_memo_letter(corner, "f", ptype="corner")
+
+
+def _png(fig):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig).print_png(buffer)
+    return buffer.getvalue()
+
+
+@benchmark("trainer.draw_edge+png")
+def draw_edge(tmp):
+    trainer = Trainer(seed=0)
+    return lambda: _png(trainer.draw_edge(3))
+
+
+@benchmark("trainer.draw_corner+png")
+def draw_corner(tmp):
+    trainer = Trainer(seed=0)
+    return lambda: _png(trainer.draw_corner(3))
+
+
+@benchmark("atlas.load[cached]")
+def atlas_load(tmp):
+    PieceAtlas.load(tmp)
+    return lambda: PieceAtlas.load(tmp)
+
+
+@benchmark("display.show")
+def display_show(tmp):
+    warnings.filterwarnings("ignore", message=".*non-interactive.*")
+    trainer = Trainer(seed=0)
+    display = PieceDisplay(PieceAtlas.load(tmp))
+    return lambda: display.show(trainer.get_random_piece(ptype="corner"), ptype="corner")
+
+
+@benchmark("trainer.draw[svg]")
+def draw_svg(tmp):
+    trainer = Trainer(seed=0, renderer="svg")
+    return lambda: trainer.draw(3, ptype="corner")
+
+
+@benchmark("trainer.draw[raster]")
+def draw_raster(tmp):
+    trainer = Trainer(seed=0, renderer="raster")
+    return lambda: trainer.draw(3, ptype="corner")
+
+
+@benchmark("algs.lookup")
+def algs_lookup(tmp):
+    from sctools.algs import AlgDB, build
+
+    path = os.path.join(tmp, "algs")
+    build(path, buffers={"edge": ["UF"], "corner": ["UFR"]}, workers=1)
+    db = AlgDB(path)
+    return lambda: db.lookup("corner", "UFR", "GH")
+
+
+@benchmark("trace.span[disabled]")
+def trace_span_disabled(tmp):
+    from sctools import trace
+
+    def run():
+        with trace.span("display"):
+            pass
+    return run
+
+
+@benchmark("trace.span[enabled]")
+def trace_span_enabled(tmp):
+    from sctools import trace
+
+    tracer = trace.Tracer("bench")
+
+    def run():
+        with tracer.span("display"):
+            pass
+        # Keep the event list from growing across rounds
+        tracer.events.clear()
+    return run
@@ -0,0 +1,152 @@
+import os
+import gc
+import re
+import json
+import inspect
+import time
+import platform
+import tempfile
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Seconds each timing round should take; the number of calls is calibrated to it
+ROUND_TIME = 0.2
+
+REGISTRY: Dict[str, Callable] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark.
+
+    The decorated function does the setup in the temporary directory it is
+    given and returns the zero-argument callable to time. Setups that need a
+    teardown yield the callable instead; they are resumed once it is timed.
+    """
+    def register(setup: Callable[[str], Callable[[], object]]):
+        REGISTRY[name] = setup
+        return setup
+    return register
+
+
+def _calibrate(func: Callable[[], object]) -> int:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= ROUND_TIME / 4 or number >= 1 << 20:
+            return max(1, int(number * ROUND_TIME / max(elapsed, 1e-9)))
+        number *= 4
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> dict:
+    """Per-call time (best and median of ``repeat`` rounds), ops/s and peak memory."""
+    func()   # warm up caches and lazy imports
+    number = _calibrate(func)
+
+    times = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            times.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    times.sort()
+    return {
+        "best": times[0],
+        "median": times[len(times) // 2],
+        "ops": 1.0 / times[len(times) // 2],
+        "peak_bytes": peak,
+        "number": number,
+    }
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5) -> Dict[str, dict]:
+    results = {}
+    for name, setup in REGISTRY.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        with tempfile.TemporaryDirectory(prefix="sctools-bench-") as tmp:
+            teardown = setup(tmp) if inspect.isgeneratorfunction(setup) else None
+            try:
+                func = next(teardown) if teardown else setup(tmp)
+            except ImportError as e:
+                print(f"{name:<32} skipped ({e})")
+                continue
+            results[name] = result = measure(func, repeat)
+            if teardown:
+                next(teardown, None)
+        print(format_result(name, result))
+    return results
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:7.2f} {unit}"
+    return f"{seconds / 1e-9:7.1f} ns"
+
+
+def format_result(name: str, result: dict) -> str:
+    return (f"{name:<32} {_format_time(result['median'])}  {result['ops']:12,.1f} ops/s  "
+            f"peak {result['peak_bytes'] / 1024:9.1f} KiB")
+
+
+def baseline_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def save_baseline(results: Dict[str, dict], name: str) -> str:
+    path = baseline_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump({
+            "machine": platform.node(),
+            "python": platform.python_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }, file, indent=1)
+    return path
+
+
+def load_baseline(name: str) -> dict:
+    with open(baseline_path(name), 'r') as file:
+        return json.load(file)["results"]
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float = 0.2) -> List[str]:
+    """Print the change against ``baseline`` and return the benchmarks that regressed.
+
+    A benchmark regresses when its median time grows by more than ``threshold``
+    (a fraction) or its peak memory by more than twice that.
+    """
+    regressions = []
+    print(f"\n{'benchmark':<32} {'time':>10} {'memory':>10}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<32} {'new':>10}")
+            continue
+        old = baseline[name]
+        time_change = result["median"] / old["median"] - 1
+        memory_change = (result["peak_bytes"] + 1) / (old["peak_bytes"] + 1) - 1
+        regressed = time_change > threshold or memory_change > 2 * threshold
+        print(f"{name:<32} {time_change:+10.1%} {memory_change:+10.1%}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
@@ -0,0 +1,6 @@
+import sys
+
+from sctools.cli import main
+
+if __name__ == "__main__":
+    main(["analytics"] + sys.argv[1:])
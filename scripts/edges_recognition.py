@@ -53,45 +53,45 @@ def main():
 
     print(f"Logging this session to: {log_file}")
 
-    log_file_handle = open(log_file, 'a', newline='')
-    csv_writer = csv.writer(log_file_handle)
-
-    session_stats = defaultdict(int)
-    session_stats
-
-    while True:
-        # Get and show the plot
-        edge = trainer.get_random_edge()
-        show_plot(trainer.draw_edge(edge))
-        
-        # Get user input
-        start_time = time.time()
-        user_input = input("Which edge is this?\n").lower()
-        end_time = time.time()
-
-        response_time = end_time - start_time
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        if user_input == 'quit':
-            print("Exiting the program.")
-            session_stats["total"] = session_stats["correct"] + session_stats["incorrect"]
-            stats = (
-                "*** Session Stats ***\n"
-                f"Correct: {session_stats['correct']}/{session_stats['total']}\n"
-            )
-            print(stats)
-            break
-        
-        if trainer.check_edge_memo_letter(edge, user_input):
-            print(f"Correct! (t: {response_time:.1f})")
-            session_stats["correct"] += 1
-        else:
-            print(f"Incorrect! (t: {response_time:.1f})")
-            session_stats["incorrect"] += 1
-
-        ref = trainer.get_memo_letter_from_pair(edge)
-        csv_writer.writerow([timestamp, edge, ref, user_input, f"{response_time:.3f}"])
-        
+    with open(log_file, 'a', newline='') as log_file_handle:
+        csv_writer = csv.writer(log_file_handle)
+
+        session_stats = defaultdict(int)
+        session_stats
+
+        while True:
+            # Get and show the plot
+            edge = trainer.get_random_edge()
+            show_plot(trainer.draw_edge(edge))
+
+            # Get user input
+            start_time = time.time()
+            user_input = input("Which edge is this?\n").lower()
+            end_time = time.time()
+
+            response_time = end_time - start_time
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            if user_input == 'quit':
+                print("Exiting the program.")
+                session_stats["total"] = session_stats["correct"] + session_stats["incorrect"]
+                stats = (
+                    "*** Session Stats ***\n"
+                    f"Correct: {session_stats['correct']}/{session_stats['total']}\n"
+                )
+                print(stats)
+                break
+
+            if trainer.check_edge_memo_letter(edge, user_input):
+                print(f"Correct! (t: {response_time:.1f})")
+                session_stats["correct"] += 1
+            else:
+                print(f"Incorrect! (t: {response_time:.1f})")
+                session_stats["incorrect"] += 1
+
+            ref = trainer.get_memo_letter_from_pair(edge)
+            csv_writer.writerow([timestamp, edge, ref, user_input, f"{response_time:.3f}"])
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
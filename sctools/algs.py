@@ -0,0 +1,510 @@
+import os
+import csv
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from sctools import cube
+from sctools.bld import BLD_CFG
+from sctools.parallel import bounded_map
+from sctools.srs import LETTERS
+
+PTYPES = ("edge", "corner")
+
+SCHEMAS = {"edge": BLD_CFG["edges_memo_schema"], "corner": BLD_CFG["corners_memo_schema"]}
+
+# Face-turn 3-cycles every algorithm is a conjugate of: Ua perm and Aa perm
+BASE_ALGS = {
+    "edge": "R U' R U R U R U' R' U' R2",
+    "corner": "R' F R' B2 R F' R' B2 R2",
+}
+
+# One index entry per (buffer, first target, second target) sticker triple
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u4"),      # into the text heap
+    ("length", "<u2"),      # 0: no algorithm (targets on the buffer piece or each other)
+    ("moves", "u1"),
+    ("source", "u1"),       # SOURCES
+])
+SOURCES = ("generated", "imported")
+
+DB_VERSION = 1
+
+# Longest algorithm, in face turns, an index entry can hold (``moves`` is a u1)
+MAX_MOVES = np.iinfo(INDEX_DTYPE["moves"]).max
+
+_N = 24
+
+
+def sticker_index(ptype: str, name: str) -> int:
+    """Memo location of a sticker named by its faces, e.g. "UF", or "UFR" or "URF" for the same corner sticker."""
+    name = name.strip().upper()
+    for i, location in enumerate(SCHEMAS[ptype]):
+        if location[0] == name[:1] and sorted(location) == sorted(name):
+            return i
+    raise ValueError(f"Unknown {ptype} sticker {name!r}")
+
+
+def _sticker_perms(ptype: str) -> np.ndarray:
+    """(18, 24) array: perms[m, loc] = location of the sticker at ``loc`` after move m."""
+    states = cube.apply_scrambles(cube.solved_states(len(cube.MOVE_NAMES)),
+                                  np.arange(len(cube.MOVE_NAMES))[:, None])
+    stickers = cube.facelets(states)[PTYPES.index(ptype)]
+    perms = np.empty_like(stickers)
+    perms[np.arange(len(stickers))[:, None], stickers] = np.arange(_N)
+    return perms.astype(np.intp)
+
+
+def _locations(ptype: str) -> np.ndarray:
+    return cube.EDGE_LOCATIONS if ptype == "edge" else cube.CORNER_LOCATIONS
+
+
+def _piece_of(ptype: str) -> np.ndarray:
+    piece_of = np.empty(_N, dtype=np.intp)
+    for slot, stickers in enumerate(_locations(ptype)):
+        piece_of[stickers] = slot
+    return piece_of
+
+
+def _expected_stickers(ptype: str, buffer: int, first: int, second: int) -> np.ndarray:
+    """Facelets after a 3-cycle sending the buffer sticker to ``first``, ``first`` to ``second``."""
+    locations = _locations(ptype).tolist()
+    piece_of = _piece_of(ptype)
+    expected = np.arange(_N)
+    for src, dst in ((buffer, first), (first, second), (second, buffer)):
+        src_stickers, dst_stickers = locations[piece_of[src]], locations[piece_of[dst]]
+        i, j = src_stickers.index(src), dst_stickers.index(dst)
+        n = len(src_stickers)
+        for k in range(n):
+            expected[dst_stickers[(j + k) % n]] = src_stickers[(i + k) % n]
+    return expected
+
+
+# Whole-cube rotations follow the face move indices: 18 + 3 * axis + turns
+_ROTATIONS = "xyz"
+
+# Per quarter turn of x, y and z, the face whose layer ends up at each face
+_ROTATION_SOURCES = {
+    "x": {"U": "F", "F": "D", "D": "B", "B": "U"},
+    "y": {"F": "R", "R": "B", "B": "L", "L": "F"},
+    "z": {"U": "L", "L": "D", "D": "R", "R": "U"},
+}
+
+# Quarter turn of every slice and wide move as face turns and a rotation, all on one axis
+_COMPOSITE_MOVES = {
+    "M": ("R", "L'", "x'"), "E": ("U", "D'", "y'"), "S": ("F'", "B", "z"),
+    "r": ("L", "x"), "l": ("R", "x'"), "u": ("D", "y"),
+    "d": ("U", "y'"), "f": ("B", "z"), "b": ("F", "z'"),
+}
+
+
+def _move_code(name: str) -> int:
+    if name[0] in _ROTATIONS:
+        return len(cube.MOVE_NAMES) + 3 * _ROTATIONS.index(name[0]) + ("", "2", "'").index(name[1:])
+    return cube.MOVE_INDEX[name]
+
+
+def _parse_moves(text: str) -> List[int]:
+    """Codes of the face moves, slices (M, E, S), wide moves (r or Rw) and rotations in ``text``."""
+    codes = []
+    for token in text.replace("’", "'").split():
+        name, suffix = token[0], token[1:].replace("2'", "2")
+        if suffix[:1] == "w" and name in "URFDLB":
+            name, suffix = name.lower(), suffix[1:]
+        if suffix not in ("", "2", "'") or name not in "URFDLB" + _ROTATIONS + "".join(_COMPOSITE_MOVES):
+            raise ValueError(f"Unsupported move: {token!r}")
+        quarters = {"": 1, "2": 2, "'": 3}[suffix]
+        if name in _COMPOSITE_MOVES:
+            # The parts share an axis, so they commute
+            codes += [_move_code(part) for part in _COMPOSITE_MOVES[name]] * quarters
+        else:
+            codes.append(_move_code(name + suffix))
+    return codes
+
+
+def _resolve_rotations(codes: Sequence[int]) -> List[int]:
+    """Face moves of ``codes`` with the rotations folded into the faces they turn."""
+    frame = {face: face for face in cube.FACES}
+    moves = []
+    for code in codes:
+        face, turns = divmod(code, 3)
+        if face < len(cube.FACES):
+            moves.append(cube.FACES.index(frame[cube.FACES[face]]) * 3 + turns)
+            continue
+        sources = _ROTATION_SOURCES[_ROTATIONS[face - len(cube.FACES)]]
+        for _ in range(turns + 1):
+            frame = {face: frame[sources.get(face, face)] for face in cube.FACES}
+    return moves
+
+
+def _parse_group(text: str, start: int) -> Tuple[List[int], int]:
+    """Move codes from ``start`` up to the closing bracket, separator or end of ``text``."""
+    moves, plain = [], []
+    i = start
+    while i < len(text) and text[i] not in "]:,":
+        if text[i] == "[":
+            moves += _parse_moves(" ".join(plain))
+            plain = []
+            first, i = _parse_group(text, i + 1)
+            separator = text[i] if i < len(text) else ""
+            if separator not in ":,":
+                raise ValueError(f"Expected ':' or ',' in {text!r}")
+            second, i = _parse_group(text, i + 1)
+            if i >= len(text) or text[i] != "]":
+                raise ValueError(f"Unclosed bracket in {text!r}")
+            i += 1
+            moves += first + second + invert_moves(first)
+            if separator == ",":
+                moves += invert_moves(second)
+        else:
+            end = i
+            while end < len(text) and text[end] not in "[]:,":
+                end += 1
+            plain.append(text[i:end])
+            i = end
+    return moves + _parse_moves(" ".join(plain)), i
+
+
+def parse_alg(alg: str) -> List[int]:
+    """Face move indices of an algorithm, expanding conjugates [A: B] and commutators [A, B].
+
+    Slices, wide moves and rotations become face moves in the fixed frame
+    of the centers.
+    """
+    moves, end = _parse_group(alg, 0)
+    if end != len(alg):
+        raise ValueError(f"Unexpected {alg[end]!r} in {alg!r}")
+    # Slices expand to face turns that mostly cancel (M2 -> R2 L2)
+    return simplify(_resolve_rotations(moves))
+
+
+def format_moves(moves: Sequence[int]) -> str:
+    return " ".join(cube.MOVE_NAMES[m] for m in moves)
+
+
+def invert_moves(moves: Sequence[int]) -> List[int]:
+    return [(m // 3) * 3 + 2 - m % 3 for m in moves[::-1]]
+
+
+def simplify(moves: Iterable[int]) -> List[int]:
+    """Merge turns of the same face (R R -> R2, R R' -> nothing), also across
+    a turn of the opposite face, which commutes with them (R L' R -> R2 L')."""
+    stack = []
+    for m in moves:
+        face, turns = divmod(m, 3)
+        # Quarter turns clockwise: 1, 2 or 3
+        quarters = turns + 1
+        opposite = (face + 3) % len(cube.FACES)
+        if stack and stack[-1][0] == face:
+            at = len(stack) - 1
+        elif len(stack) >= 2 and stack[-1][0] == opposite and stack[-2][0] == face:
+            at = len(stack) - 2
+        else:
+            stack.append((face, quarters))
+            continue
+        quarters = (stack.pop(at)[1] + quarters) % 4
+        if quarters:
+            stack.insert(at, (face, quarters))
+    return [face * 3 + quarters - 1 for face, quarters in stack]
+
+
+def _base_cycles(ptype: str):
+    """Sticker triples (p, q, r) cycled p -> q -> r by the base algorithm or its inverse."""
+    cycles = []
+    for inverse in (False, True):
+        moves = parse_alg(BASE_ALGS[ptype])
+        moves = invert_moves(moves) if inverse else moves
+        after = cube.facelets(cube.apply_moves(cube.SOLVED, np.array(moves)))[PTYPES.index(ptype)][0]
+        moved_to = np.empty(_N, dtype=np.intp)
+        moved_to[after] = np.arange(_N)   # where each sticker ended up
+        for p in np.flatnonzero(after != np.arange(_N)).tolist():
+            q = int(moved_to[p])
+            r = int(moved_to[q])
+            cycles.append(((p, q, r), inverse))
+    return cycles
+
+
+def _triple(x, a, b):
+    return (x * _N + a) * _N + b
+
+
+def find_setups(ptype: str):
+    """Shortest setup of every sticker triple, by one breadth-first search.
+
+    Returns (setup_move, next_triple, inverse) arrays over triple codes: the
+    first setup move (-1 for base triples), the triple it leads to, and
+    whether the base algorithm is applied inverted.
+    """
+    perms = _sticker_perms(ptype)
+    n_moves = len(perms)
+    inverse_perms = perms[[(m // 3) * 3 + 2 - m % 3 for m in range(n_moves)]]
+    size = _N ** 3
+    first_move = np.full(size, -2, dtype=np.int16)
+    next_triple = np.full(size, -1, dtype=np.int64)
+    inverse = np.zeros(size, dtype=bool)
+
+    frontier = []
+    for (p, q, r), inv in _base_cycles(ptype):
+        code = _triple(p, q, r)
+        first_move[code] = -1
+        inverse[code] = inv
+        frontier.append(code)
+    frontier = np.array(frontier, dtype=np.int64)
+
+    while len(frontier):
+        x, rest = np.divmod(frontier, _N * _N)
+        a, b = np.divmod(rest, _N)
+        found = []
+        for m in range(n_moves):
+            # Triples that move m takes onto the frontier: setup m, then the frontier's setup
+            codes = _triple(inverse_perms[m][x], inverse_perms[m][a], inverse_perms[m][b])
+            new = first_move[codes] == -2
+            codes, sources = codes[new], frontier[new]
+            codes, unique = np.unique(codes, return_index=True)
+            first_move[codes] = m
+            next_triple[codes] = sources[unique]
+            inverse[codes] = inverse[sources[unique]]
+            found.append(codes)
+        frontier = np.unique(np.concatenate(found))
+    return first_move, next_triple, inverse
+
+
+def _setup_moves(code: int, first_move: np.ndarray, next_triple: np.ndarray) -> List[int]:
+    moves = []
+    while first_move[code] >= 0:
+        moves.append(int(first_move[code]))
+        code = int(next_triple[code])
+    return moves
+
+
+def valid_triples(ptype: str) -> List[Tuple[int, int, int]]:
+    """Every (buffer, first, second) sticker triple on three different pieces."""
+    piece_of = _piece_of(ptype)
+    return [(x, a, b) for x in range(_N) for a in range(_N) for b in range(_N)
+            if len({piece_of[x], piece_of[a], piece_of[b]}) == 3]
+
+
+def verify(ptype: str, triples: Sequence[Tuple[int, int, int]], algs: Sequence[Sequence[int]]) -> np.ndarray:
+    """Whether each algorithm is exactly the 3-cycle of its triple, on a batch of simulated cubes."""
+    if not len(algs):
+        return np.zeros(0, dtype=bool)
+    length = max(len(moves) for moves in algs)
+    encoded = np.full((len(algs), max(length, 1)), cube.IDENTITY, dtype=np.int64)
+    for row, moves in enumerate(algs):
+        encoded[row, :len(moves)] = moves
+    states = cube.apply_scrambles(cube.solved_states(len(algs)), encoded)
+    edges, corners = cube.facelets(states)
+    stickers, other = (edges, corners) if ptype == "edge" else (corners, edges)
+    expected = np.stack([_expected_stickers(ptype, *t) for t in triples])
+    return (stickers == expected).all(axis=1) & (other == np.arange(_N)).all(axis=1)
+
+
+_SETUPS = {}
+
+
+def generate_buffer(ptype: str, buffer: int) -> List[Tuple[int, int, str, int, bool]]:
+    """(first, second, notation, move count, verified) for every pair of one buffer."""
+    if ptype not in _SETUPS:
+        _SETUPS[ptype] = find_setups(ptype)
+    first_move, next_triple, inverse = _SETUPS[ptype]
+    base = parse_alg(BASE_ALGS[ptype])
+
+    triples = [t for t in valid_triples(ptype) if t[0] == buffer]
+    notations, algs = [], []
+    for triple in triples:
+        code = _triple(*triple)
+        setup = _setup_moves(code, first_move, next_triple)
+        core = invert_moves(base) if inverse[code] else base
+        moves = simplify(setup + core + invert_moves(setup))
+        core_text = format_moves(core)
+        notations.append(f"[{format_moves(setup)}: {core_text}]" if setup else core_text)
+        algs.append(moves)
+    ok = verify(ptype, triples, algs)
+    return [(a, b, notation, len(moves), bool(good))
+            for (_, a, b), notation, moves, good in zip(triples, notations, algs, ok)]
+
+
+class AlgDB:
+    """Memory-mapped table of 3-cycle algorithms keyed by (buffer, pair).
+
+    Per piece type, ``<ptype>.idx.npy`` is a (24, 24, 24) array of
+    INDEX_DTYPE entries, indexed by the memo indices of the buffer and the
+    two targets; the algorithm text lives in the ``<ptype>.txt`` heap. A
+    lookup is two memory-mapped reads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), 'r') as file:
+            self.meta = json.load(file)
+        if self.meta["version"] != DB_VERSION:
+            raise ValueError(f"Unsupported algorithm database version: {self.meta['version']}")
+        self._index = {}
+        self._heap = {}
+        self._letters = {letter: i for i, letter in enumerate(self.meta["letters"])}
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+    def index(self, ptype: str) -> np.ndarray:
+        if ptype not in self._index:
+            self._index[ptype] = np.load(os.path.join(self.path, f"{ptype}.idx.npy"), mmap_mode='r')
+            heap_path = os.path.join(self.path, f"{ptype}.txt")
+            # An empty heap (no buffers of this type) cannot be mapped
+            self._heap[ptype] = (np.memmap(heap_path, dtype=np.uint8, mode='r') if os.path.getsize(heap_path)
+                                 else np.zeros(0, dtype=np.uint8))
+        return self._index[ptype]
+
+    def _sticker(self, ptype: str, sticker) -> int:
+        if isinstance(sticker, (int, np.integer)):
+            return int(sticker)
+        sticker = sticker.upper()
+        if len(sticker) == 1:
+            return self._letters[sticker]
+        return sticker_index(ptype, sticker)
+
+    def lookup(self, ptype: str, buffer, pair: str) -> Optional[str]:
+        """Algorithm for letter ``pair`` (e.g. "AB") from ``buffer`` (e.g. "UF" or its letter)."""
+        index = self.index(ptype)
+        entry = index[self._sticker(ptype, buffer), self._sticker(ptype, pair[0]), self._sticker(ptype, pair[1])]
+        if not entry["length"]:
+            return None
+        offset = int(entry["offset"])
+        return bytes(self._heap[ptype][offset:offset + int(entry["length"])]).decode("utf-8")
+
+    def __len__(self) -> int:
+        return sum(int((self.index(ptype)["length"] > 0).sum()) for ptype in PTYPES)
+
+
+def _write_table(path: str, ptype: str, rows: Iterable[Tuple[int, int, int, str, int, int]]):
+    """Write one piece type's index and heap from (buffer, first, second, alg, moves, source) rows."""
+    index = np.zeros((_N, _N, _N), dtype=INDEX_DTYPE)
+    offset = 0
+    tmp_heap = os.path.join(path, f"{ptype}.txt.tmp")
+    with open(tmp_heap, 'wb') as heap:
+        for buffer, first, second, alg, moves, source in rows:
+            data = alg.encode("utf-8")
+            heap.write(data)
+            index[buffer, first, second] = (offset, len(data), moves, source)
+            offset += len(data)
+    tmp_index = os.path.join(path, f"{ptype}.idx.tmp.npy")
+    np.save(tmp_index, index)
+    os.replace(tmp_heap, os.path.join(path, f"{ptype}.txt"))
+    os.replace(tmp_index, os.path.join(path, f"{ptype}.idx.npy"))
+
+
+def _read_table(db: AlgDB, ptype: str) -> Dict[Tuple[int, int, int], Tuple[str, int, int]]:
+    """Every entry of one piece type in ``db``, as written by ``_write_table``."""
+    index = db.index(ptype)
+    table = {}
+    for buffer, first, second in zip(*np.nonzero(index["length"])):
+        entry = index[buffer, first, second]
+        offset = int(entry["offset"])
+        alg = bytes(db._heap[ptype][offset:offset + int(entry["length"])]).decode("utf-8")
+        table[int(buffer), int(first), int(second)] = (alg, int(entry["moves"]), int(entry["source"]))
+    return table
+
+
+def load_imports(csv_path: str) -> Tuple[Dict[str, List[Tuple[int, int, int, int, str]]], List[Tuple[int, str]]]:
+    """Algorithms from a CSV with "type" (edge/corner), "buffer", "pair" and "alg" columns.
+
+    Returns the (line, buffer, first, second, alg) rows of each piece type,
+    and the (line, reason) of the rows that could not be read.
+    """
+    imports = {ptype: [] for ptype in PTYPES}
+    errors = []
+    letters = {letter: i for i, letter in enumerate(LETTERS)}
+    with open(csv_path, 'r', newline='', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            line = reader.line_num
+            try:
+                ptype = row["type"].strip().lower().rstrip("s")
+                if ptype not in PTYPES:
+                    raise ValueError(f"Unknown piece type {row['type']!r}")
+                buffer = row["buffer"].strip().upper()
+                buffer = letters[buffer] if len(buffer) == 1 else sticker_index(ptype, buffer)
+                pair = row["pair"].strip().upper()
+                if len(pair) != 2 or not set(pair) <= letters.keys():
+                    raise ValueError(f"Invalid letter pair {row['pair']!r}")
+            except (KeyError, AttributeError, ValueError) as e:
+                errors.append((line, str(e)))
+                continue
+            imports[ptype].append((line, buffer, letters[pair[0]], letters[pair[1]], row["alg"].strip()))
+    return imports, errors
+
+
+def build(path: str,
+          buffers: Optional[Dict[str, Sequence[str]]] = None,
+          imports: Optional[Dict[str, List[Tuple[int, int, int, int, str]]]] = None,
+          workers: Optional[int] = None) -> Dict[str, dict]:
+    """Generate, verify and write the database for ``buffers`` (all 24 stickers by default).
+
+    Buffers are generated on a process pool and merged into the existing
+    database, so the buffers that were not rebuilt keep their algorithms.
+    Imported algorithms replace the generated ones when they parse and
+    verify; the rest are reported as rejected, with their CSV line.
+    """
+    os.makedirs(path, exist_ok=True)
+    buffers = {ptype: [sticker_index(ptype, name) for name in (buffers or {}).get(ptype, SCHEMAS[ptype])]
+               for ptype in PTYPES}
+    imports = imports or {}
+    previous = {ptype: {} for ptype in PTYPES}
+    if AlgDB.exists(path):
+        try:
+            existing = AlgDB(path)
+        except ValueError:
+            # A database of another version is rebuilt from scratch
+            pass
+        else:
+            # Read everything now: the files are replaced while the maps would still be open
+            previous = {ptype: _read_table(existing, ptype) for ptype in PTYPES}
+            del existing
+    counts = {}
+    # Buffers come back in job order: every edge buffer, then every corner buffer
+    generated = bounded_map(generate_buffer, [(ptype, b) for ptype in PTYPES for b in buffers[ptype]], workers)
+    for ptype in PTYPES:
+        rebuilt = set(buffers[ptype])
+        # Earlier imports stay until replaced; generated entries of rebuilt buffers are redone
+        table = {key: value for key, value in previous[ptype].items()
+                 if key[0] not in rebuilt or value[2] == SOURCES.index("imported")}
+        failed = 0
+        for buffer in buffers[ptype]:
+            for first, second, notation, moves, good in next(generated):
+                if good and table.get((buffer, first, second), (None, 0, 0))[2] != SOURCES.index("imported"):
+                    table[buffer, first, second] = (notation, moves, SOURCES.index("generated"))
+                elif not good:
+                    failed += 1
+
+        rejects, parsed = [], []
+        for line, buffer, first, second, alg in imports.get(ptype, []):
+            try:
+                moves = parse_alg(alg)
+            except ValueError as e:
+                rejects.append((line, str(e)))
+                continue
+            if len(moves) > MAX_MOVES:
+                rejects.append((line, f"longer than {MAX_MOVES} moves"))
+                continue
+            parsed.append((line, (buffer, first, second), alg, moves))
+        ok = verify(ptype, [triple for _, triple, _, _ in parsed], [moves for *_, moves in parsed])
+        for (line, triple, alg, moves), good in zip(parsed, ok):
+            if good:
+                table[triple] = (alg, len(moves), SOURCES.index("imported"))
+            else:
+                rejects.append((line, f"{alg!r} is not the expected 3-cycle"))
+
+        _write_table(path, ptype, ((*key, *value) for key, value in sorted(table.items())))
+        counts[ptype] = {"algorithms": len(table), "failed": failed,
+                         "imported": int(ok.sum()), "rejected": len(rejects)}
+        if rejects:
+            counts[ptype]["rejects"] = sorted(rejects)
+
+    tmp_meta = os.path.join(path, "meta.json.tmp")
+    with open(tmp_meta, 'w') as file:
+        json.dump({"version": DB_VERSION, "letters": LETTERS, "base": BASE_ALGS,
+                   "counts": counts}, file)
+    os.replace(tmp_meta, os.path.join(path, "meta.json"))
+    return counts
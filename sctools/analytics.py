@@ -0,0 +1,246 @@
+import os
+from contextlib import nullcontext
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from sctools.bld import MEMO_LETTERS
+from sctools.logstore import KINDS, LogStore, import_csv_logs
+from sctools.pairs import PAIR_LETTERS, decode_pair
+
+
+N_ITEMS = len(PAIR_LETTERS) ** 2   # pairs need the most item slots
+
+# Log-spaced response time bins (seconds); the last bin collects the overflow
+HIST_EDGES = np.concatenate([[0.0], np.geomspace(0.25, 60.0, 24), [np.inf]])
+N_BINS = len(HIST_EDGES) - 1
+
+EWMA_ALPHA = 0.2
+
+INDEX_VERSION = 2
+
+
+def _month_ids(timestamps_ms: np.ndarray) -> np.ndarray:
+    return timestamps_ms.astype("datetime64[ms]").astype("datetime64[M]").astype(np.int64)
+
+
+def month_id(month: str) -> int:
+    """Month id of a "YYYY-MM" string."""
+    return int(np.datetime64(month, "M").astype(np.int64))
+
+
+def _ewma_fold(items: np.ndarray, values: np.ndarray, previous: np.ndarray,
+               seen: np.ndarray, alpha: float):
+    """EWMA after folding ``values`` (in order) into ``previous`` per item.
+
+    Closed form of e <- e + alpha * (x - e), applied group-wise. Items not
+    seen before start from their first value.
+    """
+    order = np.argsort(items, kind="stable")
+    items, values = items[order], values[order]
+    uniq, starts, counts = np.unique(items, return_index=True, return_counts=True)
+
+    group_end = np.repeat(starts + counts, counts)
+    steps_left = group_end - np.arange(len(items)) - 1
+    weighted = alpha * (1 - alpha) ** steps_left * values
+
+    start = np.where(seen[uniq], previous[uniq], values[starts])
+    folded = (1 - alpha) ** counts * start + np.add.reduceat(weighted, starts)
+    return uniq, folded
+
+
+class AnalyticsIndex:
+    """Persistent per-item summary of the log store, updated incrementally.
+
+    Items are piece indices for edges/corners and letter pair indices for
+    pairs. Counts, correct answers, summed response times and response time
+    histograms are kept per month; the EWMA of the response time is kept over
+    all time. Attempts without a finite response time count towards accuracy
+    only.
+
+    ``offset`` is the number of store records folded in, in store order, so
+    any process can bring the index up to date with ``sync``.
+    """
+
+    def __init__(self, path: Optional[str] = None, store: Optional[LogStore] = None):
+        self.path = path
+        self.store = store
+        self.months = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros((0, len(KINDS), N_ITEMS), dtype=np.uint32)
+        self.timed = np.zeros((0, len(KINDS), N_ITEMS), dtype=np.uint32)
+        self.correct = np.zeros((0, len(KINDS), N_ITEMS), dtype=np.uint32)
+        self.time_sum = np.zeros((0, len(KINDS), N_ITEMS), dtype=np.float64)
+        self.hist = np.zeros((0, len(KINDS), N_ITEMS, N_BINS), dtype=np.uint32)
+        self.ewma = np.zeros((len(KINDS), N_ITEMS), dtype=np.float64)
+        self.offset = 0   # number of store records already folded in
+
+    @classmethod
+    def for_store(cls, store: LogStore) -> "AnalyticsIndex":
+        return cls.load(os.path.join(store.path, "analytics.npz"), store)
+
+    @classmethod
+    def load(cls, path: str, store: Optional[LogStore] = None) -> "AnalyticsIndex":
+        index = cls(path, store)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if int(data["version"]) == INDEX_VERSION:
+                    for name in ("months", "count", "timed", "correct", "time_sum", "hist", "ewma"):
+                        setattr(index, name, data[name])
+                    index.offset = int(data["offset"])
+        return index
+
+    @staticmethod
+    def _saved_offset(path: str) -> int:
+        if not os.path.exists(path):
+            return -1
+        with np.load(path) as data:
+            return int(data["offset"]) if int(data["version"]) == INDEX_VERSION else -1
+
+    def save(self, path: Optional[str] = None):
+        """Write the index, unless another process already saved one covering more records."""
+        path = path or self.path
+        with self.store.locked() if self.store is not None else nullcontext():
+            if self._saved_offset(path) > self.offset:
+                return
+            tmp_path = path + ".tmp.npz"
+            np.savez_compressed(
+                tmp_path, version=INDEX_VERSION, offset=self.offset, months=self.months,
+                count=self.count, timed=self.timed, correct=self.correct, time_sum=self.time_sum,
+                hist=self.hist, ewma=self.ewma,
+            )
+            os.replace(tmp_path, path)
+
+    def _month_rows(self, months: np.ndarray) -> np.ndarray:
+        missing = np.setdiff1d(months, self.months)
+        if len(missing):
+            self.months = np.concatenate([self.months, missing])
+            grow = lambda a: np.concatenate([a, np.zeros((len(missing),) + a.shape[1:], dtype=a.dtype)])
+            self.count, self.timed, self.correct = grow(self.count), grow(self.timed), grow(self.correct)
+            self.time_sum, self.hist = grow(self.time_sum), grow(self.hist)
+        lookup = {m: row for row, m in enumerate(self.months.tolist())}
+        return np.array([lookup[m] for m in months.tolist()], dtype=np.int64)
+
+    def update(self, records: np.ndarray, advance: bool = True):
+        """Fold a chunk of log store records into the summary."""
+        if not len(records):
+            return
+        kinds = records["kind"].astype(np.int64)
+        items = records["item"].astype(np.int64)
+        times = records["response_time"].astype(np.float64)
+        rows = self._month_rows(_month_ids(records["timestamp"]))
+
+        seen = self.timed.sum(axis=0) > 0
+        np.add.at(self.count, (rows, kinds, items), 1)
+        np.add.at(self.correct, (rows, kinds, items), records["correct"].astype(np.uint32))
+
+        # A missing (NaN) time would poison the sums; a negative one is clock skew
+        timed = np.isfinite(times)
+        rows, kinds, items, times = rows[timed], kinds[timed], items[timed], np.maximum(times[timed], 0.0)
+        bins = np.searchsorted(HIST_EDGES, times, side="right") - 1
+        np.add.at(self.timed, (rows, kinds, items), 1)
+        np.add.at(self.time_sum, (rows, kinds, items), times)
+        np.add.at(self.hist, (rows, kinds, items, bins), 1)
+
+        if len(times):
+            flat = kinds * N_ITEMS + items
+            uniq, folded = _ewma_fold(flat, times, self.ewma.ravel(), seen.ravel(), EWMA_ALPHA)
+            self.ewma.ravel()[uniq] = folded
+
+        if advance:
+            self.offset += len(records)
+
+    def sync(self, store: LogStore) -> int:
+        """Fold in every store record written since the last sync, by any process.
+
+        An index ahead of the store (the store was replaced) is rebuilt.
+        """
+        with store.locked():
+            records = store.read()
+            new = np.array(records[self.offset:])
+            if self.offset > len(records):
+                self.__init__(self.path, store)
+                new = np.array(records)
+        self.update(new)
+        return len(new)
+
+    def _select(self, since: Optional[str], until: Optional[str]) -> np.ndarray:
+        mask = np.ones(len(self.months), dtype=bool)
+        if since:
+            mask &= self.months >= month_id(since)
+        if until:
+            mask &= self.months <= month_id(until)
+        return mask
+
+    def stats(self, kind: str, since: Optional[str] = None, until: Optional[str] = None) -> dict:
+        """Per-item arrays (count, accuracy, mean time, median, EWMA) for ``kind``."""
+        k = KINDS.index(kind)
+        mask = self._select(since, until)
+        count = self.count[mask, k].sum(axis=0)
+        correct = self.correct[mask, k].sum(axis=0)
+        timed = self.timed[mask, k].sum(axis=0)
+        time_sum = self.time_sum[mask, k].sum(axis=0)
+        hist = self.hist[mask, k].sum(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            accuracy = correct / count
+            mean_time = time_sum / timed
+
+        return dict(
+            count=count,
+            accuracy=accuracy,
+            mean_time=mean_time,
+            median_time=_hist_quantile(hist, 0.5),
+            ewma=np.where(self.timed[:, k].sum(axis=0) > 0, self.ewma[k], np.nan),
+        )
+
+    def _rank(self, kind: str, stat: str, descending: bool, n: int,
+              since: Optional[str], until: Optional[str], min_count: int):
+        stats = self.stats(kind, since, until)
+        values = np.where(stats["count"] >= max(min_count, 1), stats[stat], np.nan)
+        keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+        top = np.argsort(keys, kind="stable")[:n]
+        return [
+            (item_label(kind, i), float(values[i]), int(stats["count"][i]))
+            for i in top if np.isfinite(keys[i])
+        ]
+
+    def slowest(self, kind: str, n: int = 20, by: str = "mean_time",
+                since: Optional[str] = None, until: Optional[str] = None,
+                min_count: int = 1) -> List[Tuple[str, float, int]]:
+        """The ``n`` items with the highest ``by`` statistic as (label, value, count)."""
+        return self._rank(kind, by, True, n, since, until, min_count)
+
+    def least_accurate(self, kind: str, n: int = 20,
+                       since: Optional[str] = None, until: Optional[str] = None,
+                       min_count: int = 1) -> List[Tuple[str, float, int]]:
+        return self._rank(kind, "accuracy", False, n, since, until, min_count)
+
+
+def _hist_quantile(hist: np.ndarray, q: float) -> np.ndarray:
+    """Approximate quantile per item: the midpoint of the bin holding it."""
+    total = hist.sum(axis=-1)
+    cum = np.cumsum(hist, axis=-1)
+    b = np.minimum((cum < (q * total)[..., None]).sum(axis=-1), N_BINS - 1)
+    lo, hi = HIST_EDGES[b], HIST_EDGES[b + 1]
+    mid = np.where(np.isfinite(hi), (lo + hi) / 2, lo)
+    return np.where(total > 0, mid, np.nan)
+
+
+def item_label(kind: str, item: int) -> str:
+    if kind == "pairs":
+        return decode_pair(item)
+    # Legacy pieces that could not be decoded are stored as 255
+    return str(MEMO_LETTERS[item]) if item < len(MEMO_LETTERS) else "?"
+
+
+def rebuild(store: LogStore, logs_dir: Optional[str] = None) -> AnalyticsIndex:
+    """Import any legacy CSVs from ``logs_dir`` and rebuild the index from scratch."""
+    if logs_dir:
+        import_csv_logs(store, logs_dir)
+    index = AnalyticsIndex(os.path.join(store.path, "analytics.npz"), store)
+    index.sync(store)
+    # Replaces whatever was saved, even an index that claims more records
+    if os.path.exists(index.path):
+        os.remove(index.path)
+    index.save()
+    return index
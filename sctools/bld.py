@@ -1,12 +1,14 @@
+import os
 import string
+import hashlib
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from matplotlib.patches import Polygon
 
-from matplotlib.figure import Figure
 from typing import Tuple, Literal, Union
 
+from sctools import trace
+from sctools.render import Renderer, get_renderer
+from sctools.sampler import PieceSampler
+
 
 BLD_CFG = {
     "start": {
@@ -32,123 +34,412 @@ BLD_CFG = {
         "RFU", "RUB", "RBD", "RDF",
         "BRU", "BUL", "BLD", "BDR",
         "DLF", "DFR", "DRB", "DBL"
-    ]
+    ],
+    "edges_buffer": "UR",
+    "corners_buffer": "ULB",
 }
 
-_EDGES_POS_TO_MEMO = dict(zip(BLD_CFG["edges_memo_schema"], string.ascii_uppercase))
+SPEFFZ = string.ascii_uppercase[:24]
 
-_EDGES_TUPLE_TO_MEMO = {
-    (
-        BLD_CFG["start"][k[0]], 
-        BLD_CFG["start"][k[1]]
-    ): v for k, v in _EDGES_POS_TO_MEMO.items()
-}
-_EDGES_IDX_TO_TUPLE = dict(zip(range(0, 24), _EDGES_TUPLE_TO_MEMO.keys()))
-
-BLD_EDGES_ENCODER = dict(
-    pos_to_memo=_EDGES_POS_TO_MEMO, 
-    tuple_to_memo=_EDGES_TUPLE_TO_MEMO,
-    idx_to_tuple=_EDGES_IDX_TO_TUPLE,
-)
-
-_CORNERS_POS_TO_MEMO = dict(zip(BLD_CFG["corners_memo_schema"], string.ascii_uppercase))
-
-_CORNERS_TUPLE_TO_MEMO = {
-    (
-        BLD_CFG["start"][k[0]], 
-        BLD_CFG["start"][k[1]],
-        BLD_CFG["start"][k[2]]
-    ): v for k, v in _CORNERS_POS_TO_MEMO.items()
+# Outward normal of each face in cube coordinates
+FACE_VECTORS = {
+    "U": (0, 1, 0), "D": (0, -1, 0),
+    "R": (1, 0, 0), "L": (-1, 0, 0),
+    "F": (0, 0, 1), "B": (0, 0, -1),
 }
-_CORNERS_IDX_TO_TUPLE = dict(zip(range(0, 24), _CORNERS_TUPLE_TO_MEMO.keys()))
 
-BLD_CORNERS_ENCODER = dict(
-    pos_to_memo=_CORNERS_POS_TO_MEMO, 
-    tuple_to_memo=_CORNERS_TUPLE_TO_MEMO,
-    idx_to_tuple=_CORNERS_IDX_TO_TUPLE,
-)
+# Reference color scheme (the western one) in the solved, white-top,
+# green-front orientation; other orientations are rotations of it.
+WESTERN_COLORS = {"U": "white", "F": "green", "R": "red", "D": "yellow", "B": "blue", "L": "orange"}
+
+INVALID_IDX = 255
+
+
+def orient(colors: dict, top: str, front: str) -> dict:
+    """Face colors of the cube ``colors`` held with ``top`` up and ``front`` in front."""
+    by_vector = {FACE_VECTORS[face]: color for face, color in colors.items()}
+    face_of = {color: np.array(FACE_VECTORS[face]) for face, color in colors.items()}
+    if top not in face_of or front not in face_of:
+        raise ValueError(f"Unknown color; expected one of {', '.join(colors.values())}")
+    up, forward = face_of[top], face_of[front]
+    if up @ forward != 0:
+        raise ValueError(f"{top} and {front} are not adjacent faces")
+    right = np.cross(up, forward)
+    axes = {"U": up, "D": -up, "F": forward, "B": -forward, "R": right, "L": -right}
+    return {face: by_vector[tuple(int(v) for v in axes[face])] for face in BLD_CFG["start"]}
+
+
+def _build_encoder(schema, start: dict, letters: str):
+    pos_to_memo = dict(zip(schema, letters))
+    tuple_to_memo = {tuple(start[face] for face in pos): v for pos, v in pos_to_memo.items()}
+    return dict(
+        pos_to_memo=pos_to_memo,
+        tuple_to_memo=tuple_to_memo,
+        idx_to_tuple=dict(zip(range(0, 24), tuple_to_memo.keys())),
+    )
+
+
+def _build_tables(schema, start: dict, colors: tuple, letters: np.ndarray):
+    color_to_idx = {c: i for i, c in enumerate(colors)}
+    idx_to_colors = np.array(
+        [[color_to_idx[start[face]] for face in pos] for pos in schema],
+        dtype=np.uint8,
+    )
+    colors_to_idx = np.full((len(colors),) * idx_to_colors.shape[1], INVALID_IDX, dtype=np.uint8)
+    colors_to_idx[tuple(idx_to_colors.T)] = np.arange(len(schema))
+
+    return dict(
+        idx_to_colors=idx_to_colors,
+        colors_to_idx=colors_to_idx,
+        idx_to_letter=letters,
+        idx_to_pos=np.array(schema),
+    )
+
+
+class Scheme:
+    """Orientation, color scheme and letter scheme, with every encoder table built once.
+
+    Piece indices are memo positions, the same in every scheme; only the
+    colors drawn and the letters answered change. Build schemes with
+    ``get_scheme``, which memoizes them by ``key``.
+    """
+
+    def __init__(self, start: dict, letters: str = SPEFFZ):
+        if len(letters) != 24 or len(set(letters.upper())) != 24 or not letters.isalpha():
+            raise ValueError("A letter scheme needs 24 different letters")
+        self.start = dict(start)
+        self.letters = letters.upper()
+        self.key = "-".join(f"{face}{color}" for face, color in sorted(self.start.items())) + ":" + self.letters
+
+        # Compact integer encoding: colors are indices into ``colors`` and
+        # pieces are sticker indices, which coincide with their memo position.
+        self.colors = tuple(self.start.values())
+        self.color_to_idx = {c: i for i, c in enumerate(self.colors)}
+        self.memo_letters = np.array(list(self.letters))
+        self.letter_to_idx = np.full(128, INVALID_IDX, dtype=np.uint8)
+        self.letter_to_idx[[ord(c) for c in self.letters]] = np.arange(24)
+        self.letter_to_idx[[ord(c) for c in self.letters.lower()]] = np.arange(24)
+
+        self.encoders = {
+            "edge": _build_encoder(BLD_CFG["edges_memo_schema"], self.start, self.letters),
+            "corner": _build_encoder(BLD_CFG["corners_memo_schema"], self.start, self.letters),
+        }
+        self.tables = {
+            "edge": _build_tables(BLD_CFG["edges_memo_schema"], self.start, self.colors, self.memo_letters),
+            "corner": _build_tables(BLD_CFG["corners_memo_schema"], self.start, self.colors, self.memo_letters),
+        }
+
+    def __repr__(self) -> str:
+        return f"Scheme({self.key!r})"
+
+
+SCHEMES = {}
+
+
+def register_scheme(name: str, top: str = None, front: str = None, colors: dict = None,
+                    letters: str = SPEFFZ) -> Scheme:
+    """Add a named scheme to ``SCHEMES`` (see ``get_scheme`` for the arguments)."""
+    SCHEMES[name] = get_scheme(top=top, front=front, colors=colors, letters=letters)
+    return SCHEMES[name]
+
+
+_SCHEME_CACHE = {}
+
+
+def get_scheme(name: str = None, top: str = None, front: str = None, colors: dict = None,
+               letters: str = SPEFFZ) -> Scheme:
+    """A registered scheme by name, or the scheme of an orientation and letters.
+
+    ``colors`` are the face colors of the cube (default: western), and
+    ``top``/``front`` the colors held up and in front (default: as given).
+    Schemes are memoized, so equal inputs share one set of tables.
+    """
+    if name is not None:
+        if name not in SCHEMES:
+            raise ValueError(f"Unknown scheme {name!r}; expected one of {', '.join(SCHEMES)}")
+        return SCHEMES[name]
+
+    colors = dict(colors or WESTERN_COLORS)
+    start = orient(colors, top or colors["U"], front or colors["F"])
+    key = (tuple(sorted(start.items())), letters.upper())
+    if key not in _SCHEME_CACHE:
+        _SCHEME_CACHE[key] = Scheme(start, letters)
+    return _SCHEME_CACHE[key]
+
+
+# The repository default, and the tables derived from it
+DEFAULT_SCHEME = register_scheme("default", colors=BLD_CFG["start"])
+register_scheme("western", colors=WESTERN_COLORS)
+
+BLD_EDGES_ENCODER = DEFAULT_SCHEME.encoders["edge"]
+BLD_CORNERS_ENCODER = DEFAULT_SCHEME.encoders["corner"]
+
+BLD_COLORS = DEFAULT_SCHEME.colors
+_COLOR_TO_IDX = DEFAULT_SCHEME.color_to_idx
+
+MEMO_LETTERS = DEFAULT_SCHEME.memo_letters
+_LETTER_TO_IDX = DEFAULT_SCHEME.letter_to_idx
+
+BLD_EDGES_TABLES = DEFAULT_SCHEME.tables["edge"]
+BLD_CORNERS_TABLES = DEFAULT_SCHEME.tables["corner"]
+
+_TABLES = DEFAULT_SCHEME.tables
+_ENCODERS = DEFAULT_SCHEME.encoders
+
+Piece = Union[Tuple[str, str], Tuple[str, str, str], int, np.ndarray]
+
+
+def encode_piece(piece: Piece, ptype: Literal["edge", "corner"] = "edge", scheme: Scheme = None):
+    """Sticker index of a color tuple, or of every row of an (N, 2|3) color-index array.
+
+    Integers and integer arrays are taken to be indices already.
+    """
+    scheme = scheme or DEFAULT_SCHEME
+    if isinstance(piece, tuple):
+        return int(scheme.tables[ptype]["colors_to_idx"][tuple(scheme.color_to_idx[c] for c in piece)])
+
+    piece = np.asarray(piece)
+    if piece.ndim == 2:
+        return scheme.tables[ptype]["colors_to_idx"][tuple(piece.T)]
+    return piece
+
+
+def decode_piece(idx: int, ptype: Literal["edge", "corner"] = "edge", scheme: Scheme = None) -> Tuple[str, ...]:
+    return (scheme or DEFAULT_SCHEME).encoders[ptype]["idx_to_tuple"][int(idx)]
+
+
+def encode_letters(letters: Union[str, np.ndarray], scheme: Scheme = None):
+    """Memo index of each letter; anything but a single scheme letter maps to INVALID_IDX."""
+    lut = (scheme or DEFAULT_SCHEME).letter_to_idx
+    if isinstance(letters, str):
+        if len(letters) != 1 or ord(letters) >= 128:
+            return INVALID_IDX
+        return int(lut[ord(letters)])
+
+    letters = np.asarray(letters, dtype=str)
+    codes = letters.astype("U1").view(np.uint32).reshape(letters.shape)
+    idx = lut[np.minimum(codes, 127)]
+    return np.where(np.char.str_len(letters) == 1, idx, INVALID_IDX).astype(np.uint8)
+
 
 class Trainer:
 
+    def __init__(self, seed: int = None, weights: dict = None, avoid_repeats: bool = True,
+                 renderer: Union[str, Renderer] = "matplotlib", scheme: Union[str, Scheme] = None):
+        edge_seed, corner_seed = np.random.SeedSequence(seed).generate_state(2)
+        weights = weights or {}
+        self.samplers = {
+            "edge": PieceSampler(seed=int(edge_seed), weights=weights.get("edge"), avoid_repeats=avoid_repeats),
+            "corner": PieceSampler(seed=int(corner_seed), weights=weights.get("corner"), avoid_repeats=avoid_repeats),
+        }
+        self.seed = seed
+        # Backend for draw_edge/draw_corner: "matplotlib" (Figure), "svg" (str) or "raster" (RGBA array)
+        self.renderer = get_renderer(renderer)
+        # Colors and letters; a name from SCHEMES or a Scheme from get_scheme
+        self.scheme = get_scheme(scheme) if isinstance(scheme, str) else scheme or DEFAULT_SCHEME
+        self._diagrams = {}
+
     def get_random_piece(self, 
                          ptype: Literal["edge", "corner"] = "edge") -> Tuple[str, str]:
 
-        pick = int(np.random.rand() * 24)
-        if ptype == "edge": 
-            return BLD_EDGES_ENCODER["idx_to_tuple"][pick]
-        elif ptype == "corner":
-            return BLD_CORNERS_ENCODER["idx_to_tuple"][pick]          
-    
+        pick = self.samplers[ptype].next()
+        return self.scheme.encoders[ptype]["idx_to_tuple"][pick]
+
+    def get_random_pieces(self,
+                          size: int,
+                          ptype: Literal["edge", "corner"] = "edge") -> np.ndarray:
+        """A batch of piece indices from the same queue as ``get_random_piece``."""
+        return self.samplers[ptype].sample(size)
+
     def check_piece_memo_letter(self, 
-                                tuple: Union[Tuple[str, str], Tuple[str, str, str]], 
-                                letter: str,
+                                tuple: Piece, 
+                                letter: Union[str, np.ndarray],
                                 ptype: Literal["edge", "corner"] = "edge"):
 
-        if ptype == "edge":
-            ref_letter = self.get_edge_memo_letter_from_tuple(tuple)
-        elif ptype == "corner":
-            ref_letter = self.get_corner_memo_letter_from_tuple(tuple)
-        else:
+        if ptype not in self.scheme.tables:
             raise NotImplementedError
         
-        return ref_letter.lower() == letter.lower()
+        piece = encode_piece(tuple, ptype, self.scheme)
+        # An invalid piece and an invalid answer both encode to INVALID_IDX
+        return (piece == encode_letters(letter, self.scheme)) & (piece != INVALID_IDX)
+
+    def get_piece_memo_letter(self, piece: Piece, ptype: Literal["edge", "corner"] = "edge"):
+        letters = self.scheme.memo_letters[encode_piece(piece, ptype, self.scheme)]
+        return str(letters) if letters.ndim == 0 else letters
     
-    def get_edge_memo_letter_from_tuple(self, tuple: Tuple[str, str]) -> str:
-        return BLD_EDGES_ENCODER["tuple_to_memo"][tuple]
+    def get_edge_memo_letter_from_tuple(self, tuple: Piece) -> str:
+        return self.get_piece_memo_letter(tuple, ptype="edge")
+
+    def get_corner_memo_letter_from_tuple(self, tuple: Piece) -> str:
+        return self.get_piece_memo_letter(tuple, ptype="corner")
+
+    def draw(self, piece: Piece, ptype: Literal["edge", "corner"] = "edge"):
+        """Draw a piece (index or color tuple) with the trainer's renderer."""
+        if not isinstance(piece, tuple):
+            piece = decode_piece(piece, ptype=ptype, scheme=self.scheme)
+        return self.renderer.draw(piece, ptype)
 
-    def get_corner_memo_letter_from_tuple(self, tuple: Tuple[str, str]) -> str:
-        return BLD_CORNERS_ENCODER["tuple_to_memo"][tuple]
+    def draw_cube(self, state=None, view: Literal["net", "isometric"] = "net", highlight=None):
+        """Net or isometric diagram of a cube state (CubeState, scramble or array).
 
-    def draw_edge(self, edge: Tuple[str, str], print_correct: bool = False):
+        SVG with the svg renderer, an RGBA array otherwise; ``highlight``
+        names the piece slots to keep at full color, e.g. ``["UF", "UFR"]``.
+        """
+        from sctools.diagram import CubeDiagram
+
+        backend = "svg" if self.renderer.name == "svg" else "raster"
+        key = (view, backend, tuple(highlight) if highlight else None)
+        if key not in self._diagrams:
+            self._diagrams[key] = CubeDiagram(view, backend, highlight=highlight, scheme=self.scheme)
+        return self._diagrams[key].draw(state)
+
+    def draw_edge(self, edge: Union[Tuple[str, str], int], print_correct: bool = False):
+        if not isinstance(edge, tuple):
+            edge = decode_piece(edge, ptype="edge", scheme=self.scheme)
 
         if print_correct:
-            print(BLD_EDGES_ENCODER["tuple_to_memo"][edge])
+            print(self.scheme.encoders["edge"]["tuple_to_memo"][edge])
 
-        fig = Figure(figsize=(2, 2))
-        ax = fig.add_subplot(111)
+        return self.renderer.edge(edge)
 
-        square_d = patches.Rectangle((0, -1), 1, 1, edgecolor='black', facecolor=edge[0])
-        square_f = patches.Rectangle((0, 0), 1, 1, edgecolor='black', facecolor=edge[1])
+    def draw_corner(self, corner: Union[Tuple[str, str, str], int], print_correct: bool = False):
+        if not isinstance(corner, tuple):
+            corner = decode_piece(corner, ptype="corner", scheme=self.scheme)
+        
+        if print_correct:
+            print(self.scheme.encoders["corner"]["tuple_to_memo"][corner])
 
-        ax.add_patch(square_f)
-        ax.add_patch(square_d)
+        return self.renderer.corner(corner)
 
-        ax.set_axis_off()
+class PieceAtlas:
+    """Every edge and corner rasterized once into an RGBA array.
 
-        ax.set_xlim(-0, 1)
-        ax.set_ylim(-1, 1)
+    ``images[ptype]`` has shape (24, H, W, 4) and is indexed like
+    the scheme's ``encoders[ptype]["idx_to_tuple"]`` and drawn by a
+    matplotlib or raster renderer. The atlas can be persisted to disk,
+    keyed by the scheme's colors and the atlas version.
+    """
 
-        ax.set_aspect('equal', adjustable='box')  # Ensures equal aspect ratio
+    VERSION = 1
 
-        return fig
+    def __init__(self, images: dict, dpi: int, scheme: Scheme = None):
+        self.images = images
+        self.dpi = dpi
+        self.scheme = scheme or DEFAULT_SCHEME
 
-    def draw_corner(self, corner: Tuple[str, str, str], print_correct: bool = False):
-        
-        if print_correct:
-            print(BLD_CORNERS_ENCODER["tuple_to_memo"][corner])
+    @classmethod
+    def build(cls, trainer: "Trainer" = None, dpi: int = 100) -> "PieceAtlas":
+        trainer = trainer or Trainer()
+        images = {}
+        for ptype, draw in (("edge", trainer.draw_edge), ("corner", trainer.draw_corner)):
+            encoder = trainer.scheme.encoders[ptype]
+            frames = []
+            for idx in range(24):
+                frame = draw(encoder["idx_to_tuple"][idx])
+                if not isinstance(frame, np.ndarray):
+                    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+                    frame.set_dpi(dpi)
+                    canvas = FigureCanvasAgg(frame)
+                    canvas.draw()
+                    frame = np.asarray(canvas.buffer_rgba()).copy()
+                frames.append(frame)
+            images[ptype] = np.stack(frames)
+
+        return cls(images, dpi, trainer.scheme)
+
+    @staticmethod
+    def cache_key(dpi: int = 100, scheme: Scheme = None) -> str:
+        # Images depend on the colors only, not on the letters
+        colors = "-".join(f"{face}{color}" for face, color in sorted((scheme or DEFAULT_SCHEME).start.items()))
+        digest = hashlib.sha1(colors.encode()).hexdigest()[:12]
+        return f"piece_atlas_v{PieceAtlas.VERSION}_{dpi}dpi_{digest}.npz"
 
-        fig = Figure(figsize=(2, 2))
-        ax = fig.add_subplot(111)
+    def save(self, cache_dir: str) -> str:
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, self.cache_key(self.dpi, self.scheme))
+        np.savez_compressed(path, **self.images)
+        return path
 
-        # Define the vertices of the cube faces
-        top_face = [(0.5, 1), (1, 0.75), (0.5, 0.5), (0, 0.75)]
-        left_face = [(0, 0.75), (0.5, 0.5), (0.5, 0), (0, 0.25)]
-        right_face = [(1, 0.75), (1, 0.25), (0.5, 0), (0.5, 0.5)]
+    @classmethod
+    def load(cls, cache_dir: str = None, dpi: int = 100, scheme: Scheme = None) -> "PieceAtlas":
+        """Load the atlas from ``cache_dir``, building (and saving) it on a miss."""
+        if cache_dir is None:
+            return cls.build(Trainer(scheme=scheme), dpi=dpi)
 
-        # Draw each face
-        ax.add_patch(Polygon(top_face, closed=True, edgecolor='black', facecolor=corner[0], alpha=1))
-        ax.add_patch(Polygon(right_face, closed=True, edgecolor='black', facecolor=corner[1], alpha=1))
-        ax.add_patch(Polygon(left_face, closed=True, edgecolor='black', facecolor=corner[2], alpha=1))
+        path = os.path.join(cache_dir, cls.cache_key(dpi, scheme))
+        if os.path.exists(path):
+            with np.load(path) as data:
+                return cls({k: data[k] for k in data.files}, dpi, scheme)
 
-        # Remove axis ticks
-        ax.set_xticks([])
-        ax.set_yticks([])
+        atlas = cls.build(Trainer(scheme=scheme), dpi=dpi)
+        atlas.save(cache_dir)
+        return atlas
 
-        # Set axis limits
-        ax.set_xlim(-0.1, 1.1)
-        ax.set_ylim(-0.1, 1.1)
+    def image(self, piece: Piece, ptype: Literal["edge", "corner"] = "edge") -> np.ndarray:
+        return self.images[ptype][encode_piece(piece, ptype, self.scheme)]
 
-        # Ensure equal aspect ratio
-        ax.set_aspect('equal', adjustable='box')
 
-        return fig
\ No newline at end of file
+class PieceDisplay:
+    """A single matplotlib window that shows atlas images without re-rendering.
+
+    On backends that support blitting the image is an animated artist: full
+    redraws (the first prompt, resizes) save the empty axes, and every other
+    prompt only restores them and draws the new image, so it appears within
+    one frame.
+    """
+
+    def __init__(self, atlas: PieceAtlas):
+        import matplotlib.pyplot as plt
+
+        self._plt = plt
+        self.atlas = atlas
+        self.fig, self.ax = self._plt.subplots(figsize=(2, 2))
+        self.ax.set_axis_off()
+        self._artist = None
+        self._background = None
+        self._blit = self.fig.canvas.supports_blit
+        if self._blit:
+            self.fig.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def _on_draw(self, event):
+        # Animated artists are skipped by full draws: save the background, then draw the image
+        if self._artist is not None:
+            self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+            self.ax.draw_artist(self._artist)
+
+    def show(self, piece: Piece,
+             ptype: Literal["edge", "corner"] = "edge"):
+        with trace.span("display.image"):
+            img = self.atlas.image(piece, ptype)
+        self.show_image(img)
+
+    def show_image(self, img: np.ndarray):
+        """Put an atlas image on screen; returns once it is displayed."""
+        canvas = self.fig.canvas
+        if self._artist is None or self._artist.get_array().shape != img.shape:
+            with trace.span("display.draw"):
+                self.ax.clear()
+                self.ax.set_axis_off()
+                self._artist = self.ax.imshow(img, animated=self._blit)
+                self._background = None
+                # Draw synchronously, so the image is on screen when this returns
+                self._plt.show(block=False)
+                canvas.draw()
+                if self._blit:
+                    canvas.blit(self.fig.bbox)
+        elif self._background is not None:
+            with trace.span("display.blit"):
+                self._artist.set_data(img)
+                canvas.restore_region(self._background)
+                self.ax.draw_artist(self._artist)
+                canvas.blit(self.fig.bbox)
+        else:
+            with trace.span("display.draw"):
+                self._artist.set_data(img)
+                canvas.draw()
+        with trace.span("display.flush"):
+            canvas.flush_events()
+
+    def close(self):
+        self._plt.close(self.fig)
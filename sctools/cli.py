@@ -0,0 +1,506 @@
+import sys
+import time
+import argparse
+import builtins
+import importlib
+
+_START = time.perf_counter()
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "matplotlib.pyplot")
+
+
+class ImportProfiler:
+    """Inclusive time of every top-level import issued while active."""
+
+    def __init__(self):
+        self.timings = []
+        self._depth = 0
+        self._import = None
+
+    def __enter__(self):
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, *args, **kwargs):
+        if name in sys.modules:
+            return self._import(name, *args, **kwargs)
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            return self._import(name, *args, **kwargs)
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.timings.append((name, time.perf_counter() - start))
+
+    def report(self, stream=None, top: int = 10):
+        # Looked up per call, so a redirected sys.stderr is honored
+        stream = stream or sys.stderr
+        total = (time.perf_counter() - _START) * 1000
+        print(f"Startup: {total:.1f} ms from CLI import to command ready", file=stream)
+        for name, seconds in sorted(self.timings, key=lambda t: -t[1])[:top]:
+            print(f"  {seconds * 1000:8.1f} ms  {name}", file=stream)
+        loaded = [m for m in HEAVY_MODULES if m in sys.modules]
+        print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}", file=stream)
+
+
+def _run(module: str, args):
+    """Import a command module on demand and run its ``main``."""
+    profiler = ImportProfiler() if args.profile_startup else None
+    if profiler:
+        with profiler:
+            handler = importlib.import_module(module)
+        profiler.report()
+    else:
+        handler = importlib.import_module(module)
+    return handler.main(args)
+
+
+def _recognition(args):
+    return _run("sctools.recognition", args)
+
+
+def _pairs(args):
+    return _run("sctools.pair_drills", args)
+
+
+def _serve(args):
+    return _run("sctools.server", args)
+
+
+def _memo(args):
+    from sctools.memo import memo_file
+
+    start_time = time.time()
+    count = memo_file(
+        args.input, args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        edges_buffer=args.edges_buffer,
+        corners_buffer=args.corners_buffer,
+    )
+    elapsed = time.time() - start_time
+    print(f"Wrote memo for {count} scrambles to {args.output} ({elapsed:.1f}s)")
+
+
+def _diagrams(args):
+    from sctools.bld import BLD_CFG, get_scheme
+    from sctools.diagram import export_diagrams
+
+    top, front = args.orientation or (None, None)
+    scheme = get_scheme(colors=BLD_CFG["start"], top=top, front=front)
+    start_time = time.time()
+    with open(args.input, 'r') as file:
+        count = export_diagrams(
+            file, args.output,
+            view=args.view,
+            backend="svg" if args.svg else "raster",
+            size=args.size,
+            highlight=args.highlight,
+            sheet=args.sheet,
+            workers=args.workers,
+            scheme=scheme,
+        )
+    elapsed = time.time() - start_time
+    print(f"Rendered {count} diagrams to {args.output} ({elapsed:.1f}s)")
+
+
+def _groups(args):
+    from sctools import paths
+    from sctools.pairs import build_all_groups
+
+    start_time = time.time()
+    cache_dir = None if args.no_cache else paths.cache_dir()
+    count = 0
+    output = args.output or paths.groups_dir()
+    for member, path, n_pairs in build_all_groups(args.sheets_dir, output, cache_dir=cache_dir,
+                                                  workers=args.workers):
+        print(f"{member}: {n_pairs} pairs -> {path}")
+        count += 1
+    print(f"Built the groups of {count} members ({time.time() - start_time:.1f}s)")
+
+
+def _import_logs(args):
+    import os
+    from sctools import paths
+    from sctools.logstore import LogStore, import_csv_logs
+
+    logs_dir = args.logs_dir or paths.logs_dir()
+    store = LogStore(args.store or os.path.join(logs_dir, 'store'))
+    counts = import_csv_logs(store, logs_dir, workers=args.workers)
+    for filename, count in counts.items():
+        print(f"{filename}: {count} attempts")
+    print(f"Imported {len(counts)} sessions, {len(store)} attempts in store")
+
+
+def _analytics(args):
+    import os
+    from sctools import paths
+    from sctools.analytics import AnalyticsIndex, rebuild
+    from sctools.logstore import LogStore
+
+    logs_dir = args.logs_dir or paths.logs_dir()
+    store = LogStore(os.path.join(logs_dir, 'store'))
+
+    if args.command == "rebuild":
+        index = rebuild(store, logs_dir)
+        print(f"Rebuilt analytics index from {index.offset} attempts")
+        return
+
+    index = AnalyticsIndex.for_store(store)
+    if index.sync(store):
+        index.save()
+
+    if args.command == "slowest":
+        rows = index.slowest(args.kind, args.n, by=args.by, since=args.since,
+                             until=args.until, min_count=args.min_count)
+    else:
+        rows = index.least_accurate(args.kind, args.n, since=args.since,
+                                    until=args.until, min_count=args.min_count)
+
+    for label, value, count in rows:
+        print(f"{label:>3}  {value:7.3f}  (n={count})")
+
+
+def _report(args):
+    import os
+    from sctools import paths
+    from sctools.logstore import LogStore
+    from sctools.report import build_reports
+
+    logs_dir = args.logs_dir or paths.logs_dir()
+    store = LogStore(args.store or os.path.join(logs_dir, 'store'))
+    output = args.output or paths.report_dir()
+    start_time = time.time()
+    results = build_reports(store, output, per_user=args.per_user, force=args.force, workers=args.workers)
+    for user, counts in results.items():
+        print(f"{os.path.join(output, user, 'index.html')}: "
+              f"{counts['rendered']}/{counts['panels']} panels rendered")
+    print(f"Done ({time.time() - start_time:.2f}s)")
+
+
+def _regrade(args):
+    import os
+    from collections import Counter
+    from sctools import paths
+    from sctools.analytics import rebuild
+    from sctools.logstore import LogStore
+    from sctools.matching import AnswerIndex, load_aliases, regrade
+    from sctools.pairs import decode_pair, load_groups
+
+    logs_dir = args.logs_dir or paths.logs_dir()
+    store = LogStore(os.path.join(logs_dir, 'store'))
+    aliases = load_aliases(args.aliases) if args.aliases else None
+    answers = AnswerIndex.from_groups(load_groups(args.excel, paths.cache_dir()), aliases=aliases,
+                                      policy=args.match).prepare()
+
+    start_time = time.time()
+    positions, old, new = regrade(store, answers)
+    changed = positions[old != new]
+    print(f"Re-graded {len(positions)} pairs attempts with '{args.match}' matching "
+          f"({time.time() - start_time:.2f}s)")
+    if len(positions):
+        print(f"Accuracy: {old.mean():.1%} -> {new.mean():.1%}; "
+              f"{(~old & new).sum()} now correct, {(old & ~new).sum()} now incorrect")
+
+    records = store.read()[changed]
+    texts = store.texts(records)
+    counts = Counter(zip(records["item"].tolist(), texts, records["correct"].tolist()))
+    for (item, answer, was_correct), count in counts.most_common(args.n):
+        pair = decode_pair(item)
+        verdict = "incorrect -> correct" if not was_correct else "correct -> incorrect"
+        print(f"  {pair}  {answer!r:24} vs {answers.reference(pair)!r:24} {verdict}  (x{count})")
+
+    if args.apply and len(changed):
+        store.update(changed, "correct", new[old != new])
+        rebuild(store)
+        print(f"Updated {len(changed)} attempts and rebuilt the analytics index")
+
+
+def _algs_build(args):
+    from sctools import paths
+    from sctools.algs import build, load_imports
+
+    path = args.db or paths.algs_dir()
+    buffers = None
+    if args.buffers:
+        # Two stickers name an edge buffer, three a corner buffer
+        buffers = {"edge": [b for b in args.buffers if len(b) == 2],
+                   "corner": [b for b in args.buffers if len(b) == 3]}
+    imports = None
+    if args.import_csv:
+        imports, errors = load_imports(args.import_csv)
+        for line, reason in errors:
+            print(f"{args.import_csv}:{line}: skipped ({reason})")
+    start_time = time.time()
+    counts = build(path, buffers=buffers, imports=imports, workers=args.workers)
+    for ptype, count in counts.items():
+        print(f"{ptype}: {count['algorithms']} algorithms ({count['imported']} imported, "
+              f"{count['rejected']} rejected, {count['failed']} failed verification)")
+        for line, reason in count.get("rejects", []):
+            print(f"  {args.import_csv}:{line}: rejected ({reason})")
+    print(f"Wrote {path} ({time.time() - start_time:.1f}s)")
+
+
+def _algs_show(args):
+    from sctools import paths
+    from sctools.algs import AlgDB
+    from sctools.bld import BLD_CFG
+
+    path = args.db or paths.algs_dir()
+    if not AlgDB.exists(path):
+        print(f"No algorithm database at {path}; run 'sctools algs build' first")
+        return
+    db = AlgDB(path)
+    ptype = "corner" if args.type == 'c' else "edge"
+    buffer = args.buffer or BLD_CFG["corners_buffer" if ptype == "corner" else "edges_buffer"]
+    for pair in args.pairs:
+        print(f"{pair.upper()}: {db.lookup(ptype, buffer, pair) or '-'}")
+
+
+def _simulate(args):
+    import os
+    from sctools import paths
+    from sctools.logstore import LogStore
+    from sctools.simulate import LearnerModel, simulate, summarize
+
+    model = LearnerModel()
+    if not args.default_model:
+        logs_dir = args.logs_dir or paths.logs_dir()
+        store = LogStore(os.path.join(logs_dir, 'store'))
+        try:
+            model = LearnerModel.from_store(store, args.kind)
+        except ValueError as error:
+            print(f"{error}; using the default learner model")
+        degenerate = model.degenerate()
+        if degenerate:
+            # Strategies would all come out alike
+            print(f"Degenerate fit ({', '.join(degenerate)}); using the default learner model's instead")
+            model = model.with_prior()
+    print(model)
+
+    print(f"{'strategy':>10} {'n_master':>8} {'done':>6} {'prompts':>8} {'p90':>6} {'minutes':>8} {'p90':>6}")
+    for strategy in args.strategy:
+        for n_master in args.n_master:
+            start_time = time.time()
+            results = simulate(model, args.sessions, strategy, n_items=args.items, n_master=n_master,
+                               seed=args.seed, max_prompts=args.max_prompts, overhead=args.overhead,
+                               workers=args.workers)
+            summary = summarize(results, args.items)
+            print(f"{strategy:>10} {n_master:>8} {summary['completed']:>6.1%} "
+                  f"{summary['prompts_mean']:>8.1f} {summary['prompts_p90']:>6.0f} "
+                  f"{summary['minutes_mean']:>8.2f} {summary['minutes_p90']:>6.2f}"
+                  f"  ({time.time() - start_time:.1f}s)")
+
+
+def _traces(args):
+    from sctools import paths
+    from sctools.trace import load_durations, summarize, trace_files
+
+    files = args.files or trace_files(paths.traces_dir())[-args.last:]
+    if not files:
+        print(f"No traces in {paths.traces_dir()}; record one with --trace")
+        return
+    durations = load_durations(files)
+    rows = summarize(durations)
+    print(f"{len(files)} trace(s)")
+    print(f"{'stage':<16} {'n':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for stage, count, *seconds in rows:
+        print(f"{stage:<16} {count:>6} " + " ".join(f"{s * 1000:>9.2f}" for s in seconds))
+
+    if args.budget is not None:
+        row = next((row for row in rows if row[0] == args.stage), None)
+        if row is None:
+            print(f"No '{args.stage}' timings in the traces")
+            return 1
+        over = sum(value * 1000 > args.budget for value in durations[args.stage])
+        print(f"{args.stage}: p95 {row[4] * 1000:.2f} ms, {over}/{row[1]} prompts over the {args.budget:g} ms budget")
+        return 1 if row[4] * 1000 > args.budget else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sctools", description="Speedcubing Tools")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report import times before the first prompt")
+    # Also accepted after the subcommand name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--profile-startup', action='store_true', default=argparse.SUPPRESS,
+                        help="Report import times before the first prompt")
+    common.add_argument('--enter', action='store_true',
+                        help="Read answers with input() instead of raw keypresses")
+    common.add_argument('--trace', nargs='?', const="", default=None, metavar="FILE",
+                        help="Record per-stage timings of every prompt as a Chrome trace "
+                             "(default file: <logs>/traces/<session>_<time>.json)")
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+
+    recognition = subparsers.add_parser('recognition', parents=[common], help="BLD Cube Piece Recognition Trainer")
+    recognition.add_argument('-t', '--type', choices=['c', 'e'], required=True,
+                             help="Piece type: 'c' for corners, 'e' for edges")
+    recognition.add_argument('--no-log', action='store_true',
+                             help="Disable logging for this session")
+    recognition.add_argument('--srs', action='store_true',
+                             help="Pick pieces with the spaced repetition scheduler")
+    recognition.add_argument('--seed', type=int, default=None,
+                             help="Seed for the prompt sequence, to replay a session")
+    recognition.add_argument('--orientation', nargs=2, default=None, metavar=("TOP", "FRONT"),
+                             help="Colors held on top and in front, e.g. 'white green'")
+    recognition.add_argument('--letters', default="ABCDEFGHIJKLMNOPQRSTUVWX",
+                             help="Letter scheme: 24 letters in Speffz order")
+    recognition.add_argument('--keep-open', action='store_true',
+                             help="Keep the window open and start another session when one ends")
+    recognition.set_defaults(func=_recognition)
+
+    pairs = subparsers.add_parser('pairs', parents=[common], help="BLD Pairs Drilling Program")
+    pairs.add_argument("--n_master", type=int, default=3, help="Number of correct answers required for mastery")
+    pairs.add_argument("--no-log", action="store_true", help="Disable logging for this session")
+    pairs.add_argument("--excel", default=None,
+                       help="Path to the pairs spreadsheet (default: <home>/docs/groups/Bld Pairs.xlsx)")
+    pairs.add_argument("--groups", default=None, help="Groups file from 'sctools groups' (instead of --excel)")
+    pairs.add_argument("--match", choices=['exact', 'prefix', 'edit'], default='exact',
+                       help="How closely answers must match an image")
+    pairs.add_argument("--aliases", default=None, help="CSV of extra accepted answers (letter_pair, alias)")
+    pairs.set_defaults(func=_pairs)
+
+    serve = subparsers.add_parser('serve', parents=[common], help="Multi-user drill server with a web client")
+    serve.add_argument('--host', default="127.0.0.1", help="Address to listen on")
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--excel', default=None, help="Pairs spreadsheet; enables the pairs drill")
+    serve.add_argument("--n_master", type=int, default=3, help="Number of correct answers required for mastery")
+    serve.add_argument('--no-log', action='store_true', help="Disable logging")
+    serve.add_argument("--match", choices=['exact', 'prefix', 'edit'], default='exact',
+                       help="How closely answers must match an image")
+    serve.add_argument("--aliases", default=None, help="CSV of extra accepted answers (letter_pair, alias)")
+    serve.set_defaults(func=_serve)
+
+    memo = subparsers.add_parser('memo', help="Batch BLD memo generator")
+    memo.add_argument('input', help="Text file with one scramble per line")
+    memo.add_argument('output', help="Output CSV file")
+    memo.add_argument('--workers', type=int, default=None,
+                      help="Number of worker processes (default: all cores)")
+    memo.add_argument('--chunk-size', type=int, default=10000,
+                      help="Scrambles per worker task")
+    memo.add_argument('--edges-buffer', default=None, help="Edges buffer, e.g. 'UF'")
+    memo.add_argument('--corners-buffer', default=None, help="Corners buffer, e.g. 'UFR'")
+    memo.set_defaults(func=_memo)
+
+    diagrams = subparsers.add_parser('diagrams', help="Batch cube diagram export")
+    diagrams.add_argument('input', help="Text file with one scramble per line")
+    diagrams.add_argument('output', help="Output directory")
+    diagrams.add_argument('--view', choices=['net', 'isometric'], default='net')
+    diagrams.add_argument('--size', type=int, default=360, help="Image width in pixels")
+    diagrams.add_argument('--highlight', nargs='+', default=None, metavar="PIECE",
+                          help="Piece slots to keep at full color, e.g. UF UFR")
+    diagrams.add_argument('--sheet', nargs=2, type=int, default=None, metavar=("COLUMNS", "ROWS"),
+                          help="Tile diagrams onto PNG sheets of COLUMNS x ROWS")
+    diagrams.add_argument('--svg', action='store_true', help="Write SVG files instead of PNG")
+    diagrams.add_argument('--orientation', nargs=2, default=None, metavar=("TOP", "FRONT"),
+                          help="Colors held on top and in front, e.g. 'white green'")
+    diagrams.add_argument('--workers', type=int, default=None,
+                          help="Number of worker processes (default: all cores)")
+    diagrams.set_defaults(func=_diagrams)
+
+    groups = subparsers.add_parser('groups', help="Batch pair group builder, one spreadsheet per member")
+    groups.add_argument('sheets_dir', help="Directory with one pairs spreadsheet per member")
+    groups.add_argument('output', nargs='?', default=None,
+                        help="Directory for the <member>_groups.csv files (default: <home>/docs/groups)")
+    groups.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: all cores)")
+    groups.add_argument('--no-cache', action='store_true', help="Rebuild every sheet, even unchanged ones")
+    groups.set_defaults(func=_groups)
+
+    import_logs = subparsers.add_parser('import-logs', help="Import legacy CSV session logs into the log store")
+    import_logs.add_argument('--logs-dir', default=None, help="Directory with the session CSVs")
+    import_logs.add_argument('--store', default=None, help="Log store directory (default: <logs>/store)")
+    import_logs.add_argument('--workers', type=int, default=None,
+                             help="Number of worker processes (default: all cores)")
+    import_logs.set_defaults(func=_import_logs)
+
+    analytics = subparsers.add_parser('analytics', help="Training log analytics")
+    analytics.add_argument('command', choices=['rebuild', 'slowest', 'accuracy'])
+    analytics.add_argument('-k', '--kind', choices=['edge', 'corner', 'pairs'], default='corner')
+    analytics.add_argument('-n', type=int, default=20, help="Number of items to show")
+    analytics.add_argument('--by', choices=['mean_time', 'median_time', 'ewma'], default='mean_time')
+    analytics.add_argument('--since', default=None, help="First month to include, e.g. 2024-07")
+    analytics.add_argument('--until', default=None, help="Last month to include, e.g. 2024-12")
+    analytics.add_argument('--min-count', type=int, default=1, help="Ignore items with fewer attempts")
+    analytics.add_argument('--logs-dir', default=None, help="Logs directory")
+    analytics.set_defaults(func=_analytics)
+
+    report = subparsers.add_parser('report', help="HTML/PNG dashboard of the training logs")
+    report.add_argument('--output', default=None, help="Report directory (default: <home>/report)")
+    report.add_argument('--per-user', action='store_true', help="Also write one report per drill server user")
+    report.add_argument('--force', action='store_true', help="Re-render every panel")
+    report.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: all cores)")
+    report.add_argument('--logs-dir', default=None, help="Logs directory")
+    report.add_argument('--store', default=None, help="Log store directory (default: <logs>/store)")
+    report.set_defaults(func=_report)
+
+    regrade = subparsers.add_parser('regrade', help="Re-grade logged pairs answers under a match policy")
+    regrade.add_argument('--excel', required=True, help="Path to the pairs spreadsheet")
+    regrade.add_argument('--match', choices=['exact', 'prefix', 'edit'], default='exact')
+    regrade.add_argument('--aliases', default=None, help="CSV of extra accepted answers (letter_pair, alias)")
+    regrade.add_argument('-n', type=int, default=20, help="Number of changed answers to show")
+    regrade.add_argument('--apply', action='store_true',
+                         help="Write the new grades to the log store and rebuild the analytics index")
+    regrade.add_argument('--logs-dir', default=None, help="Logs directory")
+    regrade.set_defaults(func=_regrade)
+
+    algs = subparsers.add_parser('algs', help="3-style algorithm database")
+    algs_commands = algs.add_subparsers(dest="command", required=True)
+    algs_build = algs_commands.add_parser('build', help="Generate and verify every algorithm")
+    algs_build.add_argument('--buffers', nargs='+', default=None,
+                            help="Buffers to build, e.g. UF UFR (default: every sticker)")
+    algs_build.add_argument('--import', dest='import_csv', default=None,
+                            help="CSV of algorithms to verify and use (type, buffer, pair, alg)")
+    algs_build.add_argument('--workers', type=int, default=None,
+                            help="Number of worker processes (default: all cores)")
+    algs_build.add_argument('--db', default=None, help="Database directory (default: <cache>/algs)")
+    algs_build.set_defaults(func=_algs_build)
+    algs_show = algs_commands.add_parser('show', help="Look up the algorithms of letter pairs")
+    algs_show.add_argument('pairs', nargs='+', help="Letter pairs, e.g. AB CD")
+    algs_show.add_argument('-t', '--type', choices=['c', 'e'], default='e',
+                           help="Piece type: 'c' for corners, 'e' for edges")
+    algs_show.add_argument('--buffer', default=None, help="Buffer sticker or letter (default: the configured buffer)")
+    algs_show.add_argument('--db', default=None, help="Database directory (default: <cache>/algs)")
+    algs_show.set_defaults(func=_algs_show)
+
+    traces = subparsers.add_parser('traces', help="p50/p95/p99 of every drill stage from --trace recordings")
+    traces.add_argument('files', nargs='*', help="Trace files (default: the latest in <logs>/traces)")
+    traces.add_argument('--last', type=int, default=1, help="Number of latest traces to summarize")
+    traces.add_argument('--stage', default="render", help="Stage checked against --budget")
+    traces.add_argument('--budget', type=float, default=None,
+                        help="Latency budget in ms; exits 1 when the stage's p95 is over it")
+    traces.set_defaults(func=_traces)
+
+    simulate = subparsers.add_parser('simulate', help="Time-to-mastery of simulated drill sessions")
+    simulate.add_argument('-k', '--kind', choices=['edge', 'corner', 'pairs'], default='pairs',
+                          help="Attempts the learner model is fitted to")
+    simulate.add_argument('--strategy', nargs='+', choices=['srs', 'random', 'weighted'], default=['srs'])
+    simulate.add_argument('--n_master', nargs='+', type=int, default=[3],
+                          help="Numbers of correct answers required for mastery to compare")
+    simulate.add_argument('--sessions', type=int, default=1000, help="Sessions per strategy and n_master")
+    simulate.add_argument('--items', type=int, default=24, help="New items per session")
+    simulate.add_argument('--overhead', type=float, default=1.0, help="Seconds per prompt besides answering")
+    simulate.add_argument('--max-prompts', type=int, default=None, help="Give up on a session after this many")
+    simulate.add_argument('--seed', type=int, default=0)
+    simulate.add_argument('--workers', type=int, default=None,
+                          help="Number of worker processes (default: all cores)")
+    simulate.add_argument('--default-model', action='store_true', help="Do not fit the model to the logs")
+    simulate.add_argument('--logs-dir', default=None, help="Logs directory")
+    simulate.set_defaults(func=_simulate)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+import numpy as np
+from typing import Iterable, List, Sequence, Union
+
+from sctools.bld import BLD_CFG, FACE_VECTORS
+
+
+# A state is an array of 20 piece codes: 8 corner slots followed by 12 edge
+# slots. Each code is ``piece * n + orientation`` (n = 3 for corners, 2 for
+# edges), where orientation is the index of the piece sticker sitting on the
+# slot's reference (U/D, or F/B for E-slice edges) sticker. Sticker names
+# rotate clockwise, matching ``BLD_CFG["corners_memo_schema"]``.
+CORNER_SLOTS = ["ULB", "UBR", "URF", "UFL", "DLF", "DFR", "DRB", "DBL"]
+EDGE_SLOTS = ["UB", "UR", "UF", "UL", "DF", "DR", "DB", "DL", "FR", "FL", "BR", "BL"]
+
+N_CORNERS = len(CORNER_SLOTS)
+N_EDGES = len(EDGE_SLOTS)
+N_SLOTS = N_CORNERS + N_EDGES
+
+FACES = "URFDLB"
+MOVE_NAMES = [f + suffix for f in FACES for suffix in ("", "2", "'")]
+MOVE_INDEX = {name: i for i, name in enumerate(MOVE_NAMES)}
+IDENTITY = len(MOVE_NAMES)
+
+SOLVED = np.array(
+    [p * 3 for p in range(N_CORNERS)] + [p * 2 for p in range(N_EDGES)],
+    dtype=np.uint8,
+)
+
+_SLOT_ARANGE = np.arange(N_SLOTS)
+
+
+def _rotations(name: str) -> List[str]:
+    return [name[i:] + name[:i] for i in range(len(name))]
+
+
+def _slot_orders() -> np.ndarray:
+    return np.array([3] * N_CORNERS + [2] * N_EDGES)
+
+
+def _sticker_geometry(name: str):
+    pos = tuple(sum(FACE_VECTORS[f][k] for f in name) for k in range(3))
+    return pos, FACE_VECTORS[name[0]]
+
+
+def _quarter_turn(face: str):
+    """Slot sources and orientation deltas of a clockwise turn of ``face``."""
+    axis = np.array(FACE_VECTORS[face])
+
+    locations = {}
+    for slot, name in enumerate(CORNER_SLOTS + EDGE_SLOTS):
+        for t, sticker in enumerate(_rotations(name)):
+            pos, normal = _sticker_geometry(sticker)
+            locations[(pos, normal)] = (slot, t)
+
+    def rotate(v):
+        # Clockwise (seen from the face) is -90 degrees about its normal
+        v = np.array(v)
+        return tuple(int(x) for x in -np.cross(axis, v) + axis * (axis @ v))
+
+    src = np.arange(N_SLOTS)
+    delta = np.zeros(N_SLOTS, dtype=int)
+    for (pos, normal), (slot, t) in locations.items():
+        if np.dot(pos, axis) != 1:
+            continue
+        target_slot, target_t = locations[(rotate(pos), rotate(normal))]
+        if target_t == 0:
+            src[target_slot] = slot
+            delta[target_slot] = t
+
+    return src, delta
+
+
+def _orientation_lut(delta: np.ndarray) -> np.ndarray:
+    """(20, 24) table mapping an incoming code to its code in the new slot."""
+    orders = _slot_orders()
+    codes = np.arange(24)
+    pieces = codes[None, :] // orders[:, None]
+    orients = codes[None, :] % orders[:, None]
+    return (pieces * orders[:, None] + (orients + delta[:, None]) % orders[:, None]).astype(np.uint8)
+
+
+def _compose(first, second):
+    """Tables equivalent to applying ``first`` and then ``second``."""
+    src1, lut1 = first
+    src2, lut2 = second
+    return src1[src2], lut2[_SLOT_ARANGE[:, None], lut1[src2]]
+
+
+def _build_move_tables():
+    identity = (np.arange(N_SLOTS), _orientation_lut(np.zeros(N_SLOTS, dtype=int)))
+    srcs, luts = [], []
+    for face in FACES:
+        src, delta = _quarter_turn(face)
+        quarter = (src, _orientation_lut(delta))
+        half = _compose(quarter, quarter)
+        prime = _compose(half, quarter)
+        for tables in (quarter, half, prime):
+            srcs.append(tables[0])
+            luts.append(tables[1])
+    srcs.append(identity[0])
+    luts.append(identity[1])
+    return np.stack(srcs), np.stack(luts)
+
+
+# MOVE_SRC[m] (21 x 20) and MOVE_LUT[m] (21 x 20 x 24); the last entry is the
+# identity, used to pad scrambles of different lengths in batched mode.
+MOVE_SRC, MOVE_LUT = _build_move_tables()
+
+
+def parse_scramble(scramble: Union[str, Sequence[str]]) -> np.ndarray:
+    tokens = scramble.split() if isinstance(scramble, str) else scramble
+    moves = []
+    for token in tokens:
+        token = token.replace("2'", "2").replace("’", "'")
+        if token not in MOVE_INDEX:
+            raise ValueError(f"Unsupported move: {token!r}")
+        moves.append(MOVE_INDEX[token])
+    return np.array(moves, dtype=np.int64)
+
+
+def invert_scramble(scramble: Union[str, Sequence[str]]) -> str:
+    moves = parse_scramble(scramble)
+    inverse = [MOVE_NAMES[(m // 3) * 3 + 2 - m % 3] for m in moves[::-1]]
+    return " ".join(inverse)
+
+
+def compile_moves(moves: Iterable[int]):
+    """Collapse a move sequence into one (src, lut) gather."""
+    tables = (MOVE_SRC[IDENTITY], MOVE_LUT[IDENTITY])
+    for m in moves:
+        tables = _compose(tables, (MOVE_SRC[m], MOVE_LUT[m]))
+    return tables
+
+
+def apply_compiled(states: np.ndarray, tables) -> np.ndarray:
+    src, lut = tables
+    return lut[_SLOT_ARANGE, states[..., src]]
+
+
+def apply_moves(states: np.ndarray, moves: Union[str, Sequence[str], np.ndarray]) -> np.ndarray:
+    """Apply one scramble to a single (20,) state or an (N, 20) batch."""
+    if not isinstance(moves, np.ndarray):
+        moves = parse_scramble(moves)
+    return apply_compiled(np.asarray(states, dtype=np.uint8), compile_moves(moves))
+
+
+def encode_scrambles(scrambles: Sequence[Union[str, Sequence[str]]]) -> np.ndarray:
+    """(N, L) move indices, padded with the identity move."""
+    parsed = [parse_scramble(s) for s in scrambles]
+    length = max((len(p) for p in parsed), default=0)
+    encoded = np.full((len(parsed), length), IDENTITY, dtype=np.int64)
+    for row, moves in enumerate(parsed):
+        encoded[row, :len(moves)] = moves
+    return encoded
+
+
+def apply_scrambles(states: np.ndarray, scrambles: Union[np.ndarray, Sequence[str]]) -> np.ndarray:
+    """Apply a different scramble to each row of an (N, 20) state tensor."""
+    if not isinstance(scrambles, np.ndarray):
+        scrambles = encode_scrambles(scrambles)
+    states = np.array(states, dtype=np.uint8)
+    rows = np.arange(len(states))[:, None]
+    for step in scrambles.T:
+        gathered = states[rows, MOVE_SRC[step]]
+        states = MOVE_LUT[step[:, None], _SLOT_ARANGE, gathered]
+    return states
+
+
+def solved_states(n: int) -> np.ndarray:
+    return np.tile(SOLVED, (n, 1))
+
+
+def _permutation_parity(perm: np.ndarray) -> np.ndarray:
+    inversions = perm[:, :, None] > perm[:, None, :]
+    upper = np.triu(np.ones(perm.shape[1:] * 2, dtype=bool), k=1)
+    return (inversions & upper).sum(axis=(1, 2)) % 2
+
+
+def random_states(n: int, seed=None) -> np.ndarray:
+    """Uniformly random solvable states."""
+    rng = np.random.default_rng(seed)
+
+    cp = np.argsort(rng.random((n, N_CORNERS)), axis=1)
+    ep = np.argsort(rng.random((n, N_EDGES)), axis=1)
+    mismatch = _permutation_parity(cp) != _permutation_parity(ep)
+    ep[mismatch, -2:] = ep[mismatch, -2:][:, ::-1]
+
+    co = rng.integers(0, 3, (n, N_CORNERS))
+    co[:, -1] = -co[:, :-1].sum(axis=1) % 3
+    eo = rng.integers(0, 2, (n, N_EDGES))
+    eo[:, -1] = eo[:, :-1].sum(axis=1) % 2
+
+    return np.hstack([cp * 3 + co, ep * 2 + eo]).astype(np.uint8)
+
+
+def is_valid(states: np.ndarray) -> np.ndarray:
+    """Batched check that states are reachable from solved."""
+    states = np.atleast_2d(states).astype(np.int64)
+    cp, co = states[:, :N_CORNERS] // 3, states[:, :N_CORNERS] % 3
+    ep, eo = states[:, N_CORNERS:] // 2, states[:, N_CORNERS:] % 2
+
+    is_perm = (
+        (np.sort(cp, axis=1) == np.arange(N_CORNERS)).all(axis=1)
+        & (np.sort(ep, axis=1) == np.arange(N_EDGES)).all(axis=1)
+    )
+    return (
+        is_perm
+        & (co.sum(axis=1) % 3 == 0)
+        & (eo.sum(axis=1) % 2 == 0)
+        & (_permutation_parity(cp) == _permutation_parity(ep))
+    )
+
+
+def is_solved(states: np.ndarray) -> np.ndarray:
+    return (np.atleast_2d(states) == SOLVED).all(axis=1)
+
+
+def _facelet_tables(slots: List[str], schema: List[str]) -> np.ndarray:
+    """table[slot, code, t] = memo index of the sticker seen at location t."""
+    n = len(slots[0])
+    letter = {name: i for i, name in enumerate(schema)}
+    table = np.zeros((len(slots), 24, n), dtype=np.uint8)
+    for slot in range(len(slots)):
+        for code in range(len(slots) * n):
+            piece, orient = divmod(code, n)
+            for t in range(n):
+                table[slot, code, t] = letter[_rotations(slots[piece])[(orient + t) % n]]
+    return table
+
+
+def _location_tables(slots: List[str], schema: List[str]) -> np.ndarray:
+    letter = {name: i for i, name in enumerate(schema)}
+    return np.array([[letter[s] for s in _rotations(name)] for name in slots])
+
+
+_CORNER_FACELETS = _facelet_tables(CORNER_SLOTS, BLD_CFG["corners_memo_schema"])
+_EDGE_FACELETS = _facelet_tables(EDGE_SLOTS, BLD_CFG["edges_memo_schema"])
+CORNER_LOCATIONS = _location_tables(CORNER_SLOTS, BLD_CFG["corners_memo_schema"])
+EDGE_LOCATIONS = _location_tables(EDGE_SLOTS, BLD_CFG["edges_memo_schema"])
+
+
+def facelets(states: np.ndarray):
+    """Sticker view of (N, 20) states as two (N, 24) arrays (edges, corners).
+
+    Entry ``[k, i]`` is the memo index of the sticker currently sitting at
+    memo location ``i``, so a solved cube maps every location to itself.
+    """
+    states = np.atleast_2d(states)
+    n = len(states)
+
+    corners = np.empty((n, 24), dtype=np.uint8)
+    corners[:, CORNER_LOCATIONS] = _CORNER_FACELETS[np.arange(N_CORNERS), states[:, :N_CORNERS]]
+
+    edges = np.empty((n, 24), dtype=np.uint8)
+    edges[:, EDGE_LOCATIONS] = _EDGE_FACELETS[np.arange(N_EDGES), states[:, N_CORNERS:]]
+
+    return edges, corners
+
+
+class CubeState:
+    """A single cube, backed by a (20,) array of piece codes."""
+
+    def __init__(self, state: np.ndarray = None):
+        self.state = SOLVED.copy() if state is None else np.asarray(state, dtype=np.uint8)
+
+    @classmethod
+    def from_scramble(cls, scramble: Union[str, Sequence[str]]) -> "CubeState":
+        return cls().apply(scramble)
+
+    @property
+    def cp(self) -> np.ndarray:
+        return self.state[:N_CORNERS] // 3
+
+    @property
+    def co(self) -> np.ndarray:
+        return self.state[:N_CORNERS] % 3
+
+    @property
+    def ep(self) -> np.ndarray:
+        return self.state[N_CORNERS:] // 2
+
+    @property
+    def eo(self) -> np.ndarray:
+        return self.state[N_CORNERS:] % 2
+
+    def apply(self, moves: Union[str, Sequence[str], np.ndarray]) -> "CubeState":
+        return CubeState(apply_moves(self.state, moves))
+
+    def copy(self) -> "CubeState":
+        return CubeState(self.state.copy())
+
+    def is_solved(self) -> bool:
+        return bool(is_solved(self.state)[0])
+
+    def is_valid(self) -> bool:
+        return bool(is_valid(self.state)[0])
+
+    def facelets(self):
+        edges, corners = facelets(self.state)
+        return edges[0], corners[0]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CubeState) and np.array_equal(self.state, other.state)
+
+    def __repr__(self) -> str:
+        return f"CubeState({self.state.tolist()})"
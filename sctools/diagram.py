@@ -0,0 +1,251 @@
+import os
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+from sctools.bld import BLD_CFG, DEFAULT_SCHEME, FACE_VECTORS, Scheme
+from sctools.cube import FACES, CubeState, apply_scrambles, facelets, solved_states
+from sctools.memo import chunks
+from sctools.parallel import bounded_map
+from sctools.render import encode_png, format_svg, label_map, palette, svg_template, to_rgba
+
+# Facelets are numbered face * 9 + row * 3 + col, faces in FACES order, each
+# face seen from the outside: (right, up) directions in cube coordinates.
+_FACE_BASIS = {
+    "U": ((1, 0, 0), (0, 0, -1)),
+    "R": ((0, 0, -1), (0, 1, 0)),
+    "F": ((1, 0, 0), (0, 1, 0)),
+    "D": ((1, 0, 0), (0, 0, 1)),
+    "L": ((0, 0, 1), (0, 1, 0)),
+    "B": ((-1, 0, 0), (0, 1, 0)),
+}
+N_FACELETS = 54
+
+# Face positions (column, row) in the unfolded net, in face units
+_NET_LAYOUT = {"U": (1, 0), "L": (0, 1), "F": (1, 1), "R": (2, 1), "B": (3, 1), "D": (1, 2)}
+
+# Blend of unhighlighted stickers towards white
+DIM = 0.65
+
+VIEWS = ("net", "isometric")
+
+
+def _facelet(name: str) -> int:
+    """Facelet index of the sticker at location ``name`` (e.g. "FU" or "UFL")."""
+    face = name[0]
+    pos = np.sum([FACE_VECTORS[f] for f in name], axis=0)
+    right, up = _FACE_BASIS[face]
+    col, row = int(pos @ right) + 1, 1 - int(pos @ up)
+    return FACES.index(face) * 9 + row * 3 + col
+
+
+_EDGE_FACELETS = np.array([_facelet(name) for name in BLD_CFG["edges_memo_schema"]])
+_CORNER_FACELETS = np.array([_facelet(name) for name in BLD_CFG["corners_memo_schema"]])
+_CENTER_FACELETS = np.arange(len(FACES)) * 9 + 4
+
+# Face each memo sticker belongs to, and the color of each face
+_EDGE_FACE = np.array([FACES.index(name[0]) for name in BLD_CFG["edges_memo_schema"]])
+_CORNER_FACE = np.array([FACES.index(name[0]) for name in BLD_CFG["corners_memo_schema"]])
+
+
+def facelet_faces(states: np.ndarray) -> np.ndarray:
+    """(N, 54) face index of the sticker shown at every facelet of (N, 20) states."""
+    edges, corners = facelets(states)
+    faces = np.empty((len(edges), N_FACELETS), dtype=np.uint8)
+    faces[:, _CENTER_FACELETS] = np.arange(len(FACES))
+    faces[:, _EDGE_FACELETS] = _EDGE_FACE[edges]
+    faces[:, _CORNER_FACELETS] = _CORNER_FACE[corners]
+    return faces
+
+
+def highlight_mask(pieces: Optional[Iterable[str]]) -> np.ndarray:
+    """Facelets of the named piece slots ("UF", "FU", "UFR", ...); all of them if None."""
+    if pieces is None:
+        return np.ones(N_FACELETS, dtype=bool)
+    wanted = {frozenset(p.upper()) for p in pieces}
+    mask = np.zeros(N_FACELETS, dtype=bool)
+    for schema, table in (("edges_memo_schema", _EDGE_FACELETS), ("corners_memo_schema", _CORNER_FACELETS)):
+        for name, facelet in zip(BLD_CFG[schema], table):
+            if frozenset(name) in wanted:
+                mask[facelet] = True
+    return mask
+
+
+def _sticker_corners(face: str, row: int, col: int) -> np.ndarray:
+    """3D corners of a sticker on a cube of side 3 centered at the origin."""
+    normal = np.array(FACE_VECTORS[face])
+    right, up = (np.array(v) for v in _FACE_BASIS[face])
+    center = normal * 1.5 + right * (col - 1) + up * (1 - row)
+    return np.array([center + (dx * right + dy * up) / 2 for dx, dy in ((-1, -1), (1, -1), (1, 1), (-1, 1))])
+
+
+def _net_shapes():
+    shapes = []
+    for f, face in enumerate(FACES):
+        fx, fy = _NET_LAYOUT[face]
+        for row in range(3):
+            for col in range(3):
+                x, y = fx * 3 + col, -(fy * 3 + row)
+                shapes.append((f * 9 + row * 3 + col, [(x, y - 1), (x + 1, y - 1), (x + 1, y), (x, y)]))
+    return shapes, (0.0, 12.0, -9.0, 0.0)
+
+
+def _isometric_shapes():
+    """U, F and R seen from the front-right-top corner."""
+    cos30 = np.cos(np.pi / 6)
+    shapes = []
+    for face in "UFR":
+        f = FACES.index(face)
+        for row in range(3):
+            for col in range(3):
+                corners = _sticker_corners(face, row, col)
+                x = (corners[:, 0] - corners[:, 2]) * cos30
+                y = corners[:, 1] - (corners[:, 0] + corners[:, 2]) / 2
+                shapes.append((f * 9 + row * 3 + col, [(float(a), float(b)) for a, b in zip(x, y)]))
+    extent = 3 * cos30
+    return shapes, (-extent, extent, -3.0, 3.0)
+
+
+_GEOMETRY = {"net": _net_shapes, "isometric": _isometric_shapes}
+
+
+def _as_states(states) -> np.ndarray:
+    if isinstance(states, CubeState):
+        return states.state[None]
+    if isinstance(states, str):
+        return CubeState.from_scramble(states).state[None]
+    return np.atleast_2d(np.asarray(states, dtype=np.uint8))
+
+
+class CubeDiagram:
+    """Net or isometric diagrams of cube states, as RGBA arrays or SVG.
+
+    Stickers outside ``highlight`` (piece slot names) are drawn faded. Raster
+    pixels are labelled once per view, so a batch of states is one palette
+    lookup per image.
+    """
+
+    def __init__(self, view: str = "net", backend: str = "raster", size: int = 360,
+                 highlight: Optional[Iterable[str]] = None, background=(255, 255, 255, 255),
+                 scheme: Scheme = None):
+        if view not in _GEOMETRY:
+            raise ValueError(f"Unknown view {view!r}; expected one of {', '.join(VIEWS)}")
+        if backend not in ("raster", "svg"):
+            raise ValueError(f"Unknown backend {backend!r}; expected 'raster' or 'svg'")
+        self.view = view
+        self.backend = backend
+        shapes, limits = _GEOMETRY[view]()
+        xmin, xmax, ymin, ymax = limits
+        self.width = size
+        self.height = int(round(size * (ymax - ymin) / (xmax - xmin)))
+
+        mask = highlight_mask(highlight)
+        normal = [to_rgba((scheme or DEFAULT_SCHEME).start[face]) for face in FACES]
+        faded = [tuple(int(round(v + (255 - v) * DIM)) for v in c[:3]) + (255,) for c in normal]
+        # Color table rows: face colors, then their faded versions
+        self._color_index = np.where(mask, 0, len(FACES))
+        self._colors = palette(normal + faded, background)[1:-1]
+        self._background, self._outline = palette([], background)
+
+        if backend == "raster":
+            self._labels = label_map(shapes, limits, self.width, self.height, line_width=1.0,
+                                     margin=0.03, n_stickers=N_FACELETS)
+        else:
+            self._svg = svg_template(shapes, limits, self.width, self.height, stroke_width=0.04)
+            self._css = ["#%02x%02x%02x" % c[:3] for c in normal + faded]
+
+    def draw_batch(self, states) -> Union[np.ndarray, List[str]]:
+        """(N, H, W, 4) images, or N SVG documents, of (N, 20) states."""
+        colors = facelet_faces(_as_states(states)) + self._color_index
+        if self.backend == "svg":
+            return [format_svg(self._svg, [self._css[c] for c in row]) for row in colors.tolist()]
+
+        palettes = np.empty((len(colors), N_FACELETS + 2), dtype=np.uint32)
+        palettes[:, 0] = self._background
+        palettes[:, 1:-1] = self._colors[colors]
+        palettes[:, -1] = self._outline
+        images = np.empty((len(colors), self.height, self.width), dtype=np.uint32)
+        for image, row in zip(images, palettes):
+            row.take(self._labels, out=image)
+        return images.view(np.uint8).reshape(len(colors), self.height, self.width, 4)
+
+    def draw(self, state=None) -> Union[np.ndarray, str]:
+        """Diagram of one state (a CubeState, a (20,) array or a scramble); solved if None."""
+        return self.draw_batch(solved_states(1) if state is None else state)[0]
+
+
+def contact_sheet(images: np.ndarray, columns: int, padding: int = 4,
+                  background=(255, 255, 255, 255)) -> np.ndarray:
+    """Tile (N, H, W, 4) images into one sheet, ``columns`` per row."""
+    n, height, width = images.shape[:3]
+    rows = -(-n // columns)
+    sheet = np.empty((rows * (height + padding) + padding, columns * (width + padding) + padding, 4),
+                     dtype=np.uint8)
+    sheet[:] = to_rgba(background)
+    for i, image in enumerate(images):
+        r, c = divmod(i, columns)
+        y, x = padding + r * (height + padding), padding + c * (width + padding)
+        sheet[y:y + height, x:x + width] = image
+    return sheet
+
+
+_DIAGRAMS = {}
+
+
+def _export_chunk(start: int, scrambles: List[str], output_dir: str, options: dict,
+                  sheet_columns: Optional[int] = None, page: int = 0) -> int:
+    """Render one chunk of scrambles in a worker and write it to ``output_dir``."""
+    # Schemes arrive as new copies with every chunk: key them by content
+    key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v.key if isinstance(v, Scheme) else v)
+                       for k, v in options.items()))
+    if key not in _DIAGRAMS:
+        _DIAGRAMS[key] = CubeDiagram(**options)
+    diagram = _DIAGRAMS[key]
+
+    states = apply_scrambles(solved_states(len(scrambles)), scrambles)
+    drawn = diagram.draw_batch(states)
+    if sheet_columns:
+        path = os.path.join(output_dir, f"sheet_{page + 1:04d}.png")
+        with open(path, 'wb') as file:
+            file.write(encode_png(contact_sheet(drawn, sheet_columns)))
+        return len(scrambles)
+
+    ext = "svg" if diagram.backend == "svg" else "png"
+    for i, image in enumerate(drawn, start):
+        mode, data = ('w', image) if ext == "svg" else ('wb', encode_png(image))
+        with open(os.path.join(output_dir, f"{i:06d}.{ext}"), mode) as file:
+            file.write(data)
+    return len(scrambles)
+
+
+def export_diagrams(scrambles: Iterable[str],
+                    output_dir: str,
+                    view: str = "net",
+                    backend: str = "raster",
+                    size: int = 360,
+                    highlight: Optional[Sequence[str]] = None,
+                    sheet: Optional[Sequence[int]] = None,
+                    workers: int = None,
+                    chunk_size: int = 256,
+                    scheme: Scheme = None) -> int:
+    """Render a diagram of every scramble into ``output_dir`` using a process pool.
+
+    Files are numbered by scramble (``000000.png`` or ``.svg``). With
+    ``sheet=(columns, rows)`` the diagrams are tiled onto numbered PNG sheets
+    instead, e.g. printable flashcard pages. Stickers take the colors of
+    ``scheme`` (default: the repository scheme).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    options = dict(view=view, backend=backend, size=size, highlight=list(highlight) if highlight else None,
+                   scheme=scheme or DEFAULT_SCHEME)
+    sheet_columns = None
+    if sheet:
+        if backend != "raster":
+            raise ValueError("Sheets need the raster backend")
+        sheet_columns, rows = sheet
+        chunk_size = sheet_columns * rows
+
+    # Every chunk but the last is full, so a chunk starts at its number times chunk_size
+    jobs = ((i * chunk_size, chunk, output_dir, options, sheet_columns, i)
+            for i, chunk in enumerate(chunks(scrambles, chunk_size)))
+    return sum(bounded_map(_export_chunk, jobs, workers))
@@ -0,0 +1,171 @@
+import os
+import ast
+import csv
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from sctools.bld import encode_piece
+from sctools.pairs import encode_pair
+from sctools.parallel import bounded_map
+
+# Session type of a legacy CSV log, by filename prefix
+SESSION_PREFIXES = {
+    "bld_pairs_session_": "pairs",
+    "edge_rec_session_": "edge",
+    "edges_rec_session_": "edge",
+    "corner_rec_session_": "corner",
+    "corners_rec_session_": "corner",
+}
+
+# The drilled item was logged as "Piece", or as "Edge"/"Corner" by older versions
+PIECE_COLUMNS = ("Piece", "Edge", "Corner")
+
+
+class Attempt(NamedTuple):
+    """One normalized row of any legacy log."""
+    kind: str
+    timestamp: datetime
+    item: int               # piece index, or letter pair index for "pairs"
+    answer: str
+    correct: bool
+    response_time: float
+    source: str
+
+
+class LogFile(NamedTuple):
+    """Columns of one legacy log, with the rows that could not be parsed skipped."""
+    source: str
+    kind: str
+    started: Optional[datetime]
+    timestamps: List[datetime]
+    items: List[int]
+    answers: List[str]
+    correct: List[bool]
+    response_times: List[float]
+    skipped: int
+
+    def attempts(self) -> Iterator[Attempt]:
+        for row in zip(self.timestamps, self.items, self.answers, self.correct, self.response_times):
+            yield Attempt(self.kind, *row, self.source)
+
+
+def session_kind(filename: str) -> Optional[str]:
+    """"edge", "corner" or "pairs" from a log filename; None if it is not a log."""
+    filename = os.path.basename(filename)
+    if not filename.endswith(".csv"):
+        return None
+    for prefix, kind in SESSION_PREFIXES.items():
+        if filename.startswith(prefix):
+            return kind
+    return None
+
+
+def session_start(filename: str) -> Optional[datetime]:
+    """Start time from the ``_YYYYmmdd_HHMMSS.csv`` filename suffix."""
+    try:
+        return datetime.strptime(os.path.basename(filename)[-19:-4], "%Y%m%d_%H%M%S")
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _piece_item(text: str, kind: str) -> int:
+    """Piece index of a stringified color tuple like "('white', 'red')"."""
+    return encode_piece(ast.literal_eval(text), kind)
+
+
+def _parse_row(row: dict, kind: str):
+    answer = row["User Input"]
+    timestamp = datetime.fromisoformat(row["Timestamp"])
+    response_time = float(row["Response Time (s)"])
+    if kind == "pairs":
+        return timestamp, encode_pair(row["Letter Pair"]), answer, row["Is Correct"] == "True", response_time
+    piece = next(row[column] for column in PIECE_COLUMNS if row.get(column))
+    correct = row["Reference"].lower() == answer.lower()
+    return timestamp, _piece_item(piece, kind), answer, correct, response_time
+
+
+def iter_rows(path: str, strict: bool = False) -> Iterator[tuple]:
+    """Lazily parse a log into (timestamp, item, answer, correct, response_time) rows.
+
+    Header-only and empty files yield nothing. Rows that cannot be parsed
+    (e.g. a line cut short when a session crashed) yield None, or raise
+    ``ValueError`` with ``strict``.
+    """
+    kind = session_kind(path)
+    if kind is None:
+        raise ValueError(f"Unknown session type for {os.path.basename(path)}")
+    with open(path, 'r', newline='') as file:
+        for line, row in enumerate(csv.DictReader(file), start=2):
+            try:
+                yield _parse_row(row, kind)
+            except (KeyError, TypeError, ValueError, SyntaxError, StopIteration, AttributeError) as error:
+                if strict:
+                    raise ValueError(f"{os.path.basename(path)}:{line}: cannot parse row {row}") from error
+                yield None
+
+
+def read_file(path: str, strict: bool = False) -> LogFile:
+    """Parse one log into columns."""
+    columns = ([], [], [], [], [])
+    skipped = 0
+    for row in iter_rows(path, strict):
+        if row is None:
+            skipped += 1
+            continue
+        for column, value in zip(columns, row):
+            column.append(value)
+    source = os.path.basename(path)
+    return LogFile(source, session_kind(source), session_start(source), *columns, skipped)
+
+
+def log_files(logs_dir: str) -> List[str]:
+    """Paths of every legacy log in ``logs_dir``, oldest session first."""
+    names = [name for name in os.listdir(logs_dir) if session_kind(name)]
+    return [os.path.join(logs_dir, name) for name in sorted(names, key=lambda n: (n[-19:], n))]
+
+
+def _apply(func: Callable, path: str, strict: bool):
+    return func(read_file(path, strict))
+
+
+def map_files(func: Callable[[LogFile], object],
+              paths: Iterable[str],
+              workers: Optional[int] = None,
+              strict: bool = False) -> Iterator:
+    """``func(read_file(path))`` for every path on a process pool, in order.
+
+    Only a few files per worker are in flight at a time, so memory does not
+    grow with the number of logs. ``func`` must be picklable (a module-level
+    function); ``workers=1`` runs in this process.
+    """
+    return bounded_map(_apply, ((func, path, strict) for path in paths), workers, per_worker=4)
+
+
+def _identity(log: LogFile) -> LogFile:
+    return log
+
+
+def read_files(paths: Iterable[str], workers: Optional[int] = None, strict: bool = False) -> Iterator[LogFile]:
+    """``read_file`` of every path, parsed in parallel and yielded in order."""
+    return map_files(_identity, paths, workers, strict)
+
+
+def read_logs(logs_dir: str, workers: Optional[int] = None, strict: bool = False) -> Iterator[LogFile]:
+    """Every log in ``logs_dir``, parsed in parallel and yielded one file at a time."""
+    return read_files(log_files(logs_dir), workers, strict)
+
+
+def iter_attempts(logs_dir: str, workers: Optional[int] = None, kind: Optional[str] = None) -> Iterator[Attempt]:
+    """Every attempt in ``logs_dir`` (of ``kind``, if given), oldest session first."""
+    paths = [path for path in log_files(logs_dir) if kind is None or session_kind(path) == kind]
+    for log in read_files(paths, workers):
+        yield from log.attempts()
+
+
+def to_dataframe(attempts: Iterable[Attempt]):
+    """A pandas DataFrame of normalized attempts, e.g. for the notebooks."""
+    import pandas as pd
+
+    return pd.DataFrame.from_records(list(attempts), columns=Attempt._fields)
@@ -0,0 +1,264 @@
+import os
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sctools.bld import Scheme, encode_letters
+from sctools.logs import LogFile, log_files, read_file, read_files
+
+
+# One fixed-size, packed record per attempt. Records are appended to
+# ``attempts.dat`` in chunks and read back with a memory map; free text (what
+# the user typed) lives in the ``text.dat`` heap.
+ATTEMPT_DTYPE = np.dtype([
+    ("timestamp", "<i8"),       # milliseconds since the epoch
+    ("session", "<u4"),
+    ("kind", "u1"),             # index into KINDS
+    ("item", "<u2"),            # piece index, or letter pair index for "pairs"
+    ("answer", "u1"),           # memo index of a one-letter answer, 255 otherwise
+    ("correct", "u1"),
+    ("response_time", "<f4"),   # seconds
+    ("text_offset", "<u8"),
+    ("text_length", "<u2"),
+    ("render_time", "<f4"),     # seconds from drawing the prompt to it being on screen
+    ("reaction_time", "<f4"),   # seconds from display to the first keystroke
+])
+
+# Record layout before the render and reaction times were logged
+_ATTEMPT_DTYPE_V1 = np.dtype([(name, ATTEMPT_DTYPE[name]) for name in ATTEMPT_DTYPE.names[:9]])
+
+KINDS = ("edge", "corner", "pairs")
+
+STORE_VERSION = 2
+
+# Longest answer text a record can point at (``text_length`` is a u2)
+MAX_TEXT_LENGTH = np.iinfo(ATTEMPT_DTYPE["text_length"]).max
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on ``path`` shared by every process using the store."""
+    with open(path, 'a+b') as file:
+        if os.name == "nt":
+            import msvcrt
+
+            # Locks the first byte; LK_LOCK retries for up to 10 seconds
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class LogStore:
+    """Append-only, columnar store for every drill attempt."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._records_path = os.path.join(path, "attempts.dat")
+        self._text_path = os.path.join(path, "text.dat")
+        self._meta_path = os.path.join(path, "meta.json")
+        self._lock_path = os.path.join(path, "lock")
+        # Under the lock, a partial trailing record is crash debris, not a write in progress
+        with _file_lock(self._lock_path):
+            self.meta = self._load_meta()
+            self._repair()
+
+    def _load_meta(self) -> dict:
+        if not os.path.exists(self._meta_path):
+            return {"version": STORE_VERSION, "sessions": []}
+        with open(self._meta_path, 'r') as file:
+            meta = json.load(file)
+        if meta["version"] == 1:
+            meta = self._migrate_v1(meta)
+        if meta["version"] != STORE_VERSION:
+            raise ValueError(f"Unsupported log store version: {meta['version']}")
+        return meta
+
+    def _migrate_v1(self, meta: dict) -> dict:
+        """Rewrite version 1 records with NaN render and reaction times."""
+        if os.path.exists(self._records_path):
+            old = np.fromfile(self._records_path, dtype=np.uint8)
+            old = old[:len(old) - len(old) % _ATTEMPT_DTYPE_V1.itemsize].view(_ATTEMPT_DTYPE_V1)
+            records = np.zeros(len(old), dtype=ATTEMPT_DTYPE)
+            for name in _ATTEMPT_DTYPE_V1.names:
+                records[name] = old[name]
+            records["render_time"] = np.nan
+            records["reaction_time"] = np.nan
+            tmp_path = self._records_path + ".tmp"
+            records.tofile(tmp_path)
+            os.replace(tmp_path, self._records_path)
+
+        self.meta = dict(meta, version=STORE_VERSION)
+        self._save_meta()
+        return self.meta
+
+    def _save_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.meta, file, indent=1)
+        os.replace(tmp_path, self._meta_path)
+
+    def _repair(self):
+        """Drop a partially written trailing record left by a crash."""
+        if not os.path.exists(self._records_path):
+            return
+        size = os.path.getsize(self._records_path)
+        if size % ATTEMPT_DTYPE.itemsize:
+            with open(self._records_path, 'r+b') as file:
+                file.truncate(size - size % ATTEMPT_DTYPE.itemsize)
+
+    def locked(self):
+        """Context manager holding the store lock, e.g. to read a consistent snapshot."""
+        return _file_lock(self._lock_path)
+
+    @property
+    def sessions(self) -> List[dict]:
+        return self.meta["sessions"]
+
+    def new_session(self, kind: str, started: Optional[datetime] = None, source: str = None) -> int:
+        started = started or datetime.now()
+        with _file_lock(self._lock_path):
+            # Another process may have started sessions since the meta was loaded
+            self.meta = self._load_meta()
+            session_id = len(self.sessions)
+            self.sessions.append({
+                "id": session_id,
+                "kind": kind,
+                "started": started.isoformat(timespec="seconds"),
+                "source": source,
+            })
+            self._save_meta()
+        return session_id
+
+    def append(self, records: np.ndarray, texts: Optional[Sequence[str]] = None):
+        """Append a chunk of ATTEMPT_DTYPE records (and their answer texts).
+
+        Raises ValueError, before writing anything, if a text is longer than
+        MAX_TEXT_LENGTH bytes.
+        """
+        records = np.array(records, dtype=ATTEMPT_DTYPE, copy=True)
+        encoded = None
+        if texts is not None:
+            encoded = [t.encode("utf-8") for t in texts]
+            lengths = np.array([len(t) for t in encoded], dtype=np.uint64)
+            if len(lengths) and lengths.max() > MAX_TEXT_LENGTH:
+                raise ValueError(f"Answer text longer than {MAX_TEXT_LENGTH} bytes")
+
+        with _file_lock(self._lock_path):
+            if encoded is not None:
+                # The heap offset is only stable while the lock is held
+                offset = os.path.getsize(self._text_path) if os.path.exists(self._text_path) else 0
+                records["text_offset"] = offset + np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.uint64)
+                records["text_length"] = lengths
+                with open(self._text_path, 'ab') as file:
+                    file.write(b"".join(encoded))
+
+            with open(self._records_path, 'ab') as file:
+                file.write(records.tobytes())
+
+    def read(self) -> np.ndarray:
+        """Memory-mapped view of every attempt."""
+        if not os.path.exists(self._records_path) or os.path.getsize(self._records_path) == 0:
+            return np.zeros(0, dtype=ATTEMPT_DTYPE)
+        return np.memmap(self._records_path, dtype=ATTEMPT_DTYPE, mode='r')
+
+    def update(self, positions: np.ndarray, field: str, values) -> None:
+        """Overwrite ``field`` of the records at ``positions`` in place (e.g. after re-grading)."""
+        records = np.memmap(self._records_path, dtype=ATTEMPT_DTYPE, mode='r+')
+        records[field][positions] = values
+        records.flush()
+        del records
+
+    def texts(self, records: np.ndarray) -> List[str]:
+        if not len(records) or not os.path.exists(self._text_path):
+            return [""] * len(records)
+        heap = np.memmap(self._text_path, dtype=np.uint8, mode='r')
+        return [
+            bytes(heap[offset:offset + length]).decode("utf-8")
+            for offset, length in zip(records["text_offset"].tolist(), records["text_length"].tolist())
+        ]
+
+    def __len__(self) -> int:
+        if not os.path.exists(self._records_path):
+            return 0
+        return os.path.getsize(self._records_path) // ATTEMPT_DTYPE.itemsize
+
+
+def make_records(session: int,
+                 kind: str,
+                 timestamps: Sequence[datetime],
+                 items: Sequence[int],
+                 answers: Sequence[str],
+                 correct: Sequence[bool],
+                 response_times: Sequence[float],
+                 render_times: Optional[Sequence[float]] = None,
+                 reaction_times: Optional[Sequence[float]] = None,
+                 scheme: Optional[Scheme] = None) -> np.ndarray:
+    """Attempt records; ``answers`` are letters of ``scheme`` (Speffz by default).
+
+    Answers are stored as memo positions, so attempts drilled in different
+    letter schemes compare (and land in the confusion matrix) alike.
+    """
+    records = np.zeros(len(items), dtype=ATTEMPT_DTYPE)
+    records["timestamp"] = [int(t.timestamp() * 1000) for t in timestamps]
+    records["session"] = session
+    records["kind"] = KINDS.index(kind)
+    records["item"] = items
+    records["answer"] = encode_letters(np.array(answers, dtype=str), scheme) if len(answers) else []
+    records["correct"] = correct
+    records["response_time"] = response_times
+    records["render_time"] = np.nan if render_times is None else render_times
+    records["reaction_time"] = np.nan if reaction_times is None else reaction_times
+    return records
+
+
+def record_attempt(store: LogStore, session: int, kind: str, item: int,
+                   answer: str, correct: bool, response_time: float,
+                   timestamp: Optional[datetime] = None,
+                   render_time: float = float("nan"),
+                   reaction_time: float = float("nan"),
+                   scheme: Optional[Scheme] = None) -> np.ndarray:
+    """Append a single attempt and return its record."""
+    records = make_records(session, kind, [timestamp or datetime.now()], [item],
+                           [answer], [correct], [response_time],
+                           [render_time], [reaction_time], scheme)
+    store.append(records, texts=[answer])
+    return records
+
+
+def _append_log(store: LogStore, log: LogFile) -> int:
+    session = store.new_session(log.kind, started=log.started, source=log.source)
+    if log.items:
+        store.append(make_records(session, log.kind, log.timestamps, log.items, log.answers,
+                                  log.correct, log.response_times), texts=log.answers)
+    return len(log.items)
+
+
+def import_csv(store: LogStore, path: str) -> int:
+    """Copy one legacy per-session CSV into the store as a new session."""
+    return _append_log(store, read_file(path))
+
+
+def import_csv_logs(store: LogStore, logs_dir: str, workers: Optional[int] = None) -> Dict[str, int]:
+    """Import every legacy CSV in ``logs_dir`` that is not in the store yet.
+
+    Files are parsed on a process pool and appended in session order.
+    """
+    imported = {s["source"] for s in store.sessions}
+    paths = [path for path in log_files(logs_dir) if os.path.basename(path) not in imported]
+    return {log.source: _append_log(store, log) for log in read_files(paths, workers)}
@@ -0,0 +1,185 @@
+import atexit
+import signal
+import threading
+import traceback
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+from sctools.logstore import ATTEMPT_DTYPE, MAX_TEXT_LENGTH, LogStore
+
+
+_OPEN_WRITERS = weakref.WeakSet()
+_HANDLED_SIGNALS = ("SIGTERM", "SIGHUP", "SIGBREAK")
+_previous_handlers = {}
+# Signals that arrived while the main thread was inside a writer
+_deferred_signals = []
+
+
+def _flush_on_signal(signum, frame):
+    """Flush every open writer, then let the previous handler deal with the signal.
+
+    The writer locks are not reentrant: a signal that interrupts the main
+    thread inside a writer is raised again once that writer releases them.
+    """
+    writers = list(_OPEN_WRITERS)
+    if any(writer._main_depth for writer in writers):
+        _deferred_signals.append(signum)
+        return
+    for writer in writers:
+        try:
+            writer.flush()
+        except Exception:
+            traceback.print_exc()
+    previous = _previous_handlers.get(signum, signal.SIG_DFL)
+    if callable(previous):
+        previous(signum, frame)
+    elif previous == signal.SIG_DFL:
+        signal.signal(signum, signal.SIG_DFL)
+        signal.raise_signal(signum)
+
+
+def _install_signal_handlers():
+    if _previous_handlers or threading.current_thread() is not threading.main_thread():
+        return
+    for name in _HANDLED_SIGNALS:
+        signum = getattr(signal, name, None)
+        if signum is not None:
+            _previous_handlers[signum] = signal.signal(signum, _flush_on_signal)
+
+
+class LogWriter:
+    """Batches attempts in memory and appends them to a LogStore on a background thread.
+
+    A batch is written once ``max_rows`` attempts are pending or ``flush_interval``
+    seconds have passed, and on ``flush``/``close``, at interpreter exit and on
+    SIGTERM/SIGHUP. Use it as a context manager to close it deterministically.
+
+    ``on_flush`` is called with each batch of records once it is on disk, in
+    write order, from whichever thread wrote it.
+
+    A batch the store fails to append is put back in front of the queue and
+    retried on the next write; the background thread prints the error and
+    keeps it in ``error``, while ``flush`` and ``close`` raise it.
+    """
+
+    def __init__(self, store: LogStore, flush_interval: float = 1.0, max_rows: int = 256,
+                 on_flush: Optional[Callable[[np.ndarray], None]] = None):
+        self.store = store
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self._pending = []
+        self._pending_rows = 0
+        self._closed = False
+        self.error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()   # keeps batches in order on disk
+        self._main_depth = 0               # lock sections the main thread is in
+        self._thread = threading.Thread(target=self._run, name="sctools-log-writer", daemon=True)
+        self._thread.start()
+
+        _OPEN_WRITERS.add(self)
+        _install_signal_handlers()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def _locked(self, lock):
+        # Counted before acquiring, so a signal cannot slip in between
+        main = threading.current_thread() is threading.main_thread()
+        if main:
+            self._main_depth += 1
+        try:
+            with lock:
+                yield
+        finally:
+            if main:
+                self._main_depth -= 1
+                if not self._main_depth and _deferred_signals:
+                    signal.raise_signal(_deferred_signals.pop(0))
+
+    def write(self, records: np.ndarray, texts: Optional[Sequence[str]] = None):
+        """Queue ATTEMPT_DTYPE records (and their answer texts) for writing."""
+        if self._closed:
+            raise ValueError("write to a closed LogWriter")
+        records = np.array(records, dtype=ATTEMPT_DTYPE, copy=True)
+        texts = list(texts) if texts is not None else [""] * len(records)
+        # Rejected here, where the caller sees it, rather than on the writer thread
+        if any(len(text.encode("utf-8")) > MAX_TEXT_LENGTH for text in texts):
+            raise ValueError(f"Answer text longer than {MAX_TEXT_LENGTH} bytes")
+        with self._locked(self._cond):
+            self._pending.append((records, texts))
+            self._pending_rows += len(records)
+            if self._pending_rows >= self.max_rows:
+                self._cond.notify()
+
+    def _take(self):
+        with self._locked(self._cond):
+            batch, self._pending, self._pending_rows = self._pending, [], 0
+        return batch
+
+    def _write_pending(self):
+        with self._locked(self._io_lock):
+            batch = self._take()
+            if batch:
+                records = np.concatenate([records for records, _ in batch])
+                texts = [text for _, chunk in batch for text in chunk]
+                try:
+                    self.store.append(records, texts=texts)
+                except Exception as e:
+                    with self._locked(self._cond):
+                        self._pending[:0] = batch
+                        self._pending_rows += len(records)
+                    self.error = e
+                    raise
+                self.error = None
+                if self.on_flush is not None:
+                    self.on_flush(records)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # After a failed append, wait out the interval rather than retry at once
+                self._cond.wait_for(lambda: self._closed or (self._pending_rows >= self.max_rows
+                                                             and self.error is None),
+                                    timeout=self.flush_interval)
+                closed = self._closed
+            failing = self.error is not None
+            try:
+                self._write_pending()
+            except Exception:
+                # Once per run of failures, not on every retry
+                if not failing:
+                    traceback.print_exc()
+            if closed:
+                return
+
+    def flush(self):
+        """Write every queued attempt now, from the calling thread; raises if the store fails."""
+        self._write_pending()
+
+    def close(self):
+        """Write the queued attempts and stop the thread; raises if the store fails.
+
+        Attempts that could not be written stay queued, so ``flush`` may retry them.
+        """
+        if self._closed:
+            return
+        with self._locked(self._cond):
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        try:
+            self._write_pending()
+        finally:
+            _OPEN_WRITERS.discard(self)
+            atexit.unregister(self.close)
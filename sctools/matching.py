@@ -0,0 +1,176 @@
+import csv
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Accepted images of one pair are written in one cell, e.g. "Bulma / Goku"
+IMAGE_SEPARATORS = "/;|"
+
+POLICIES = ("exact", "prefix", "edit")
+
+# Shortest answer accepted as a prefix of an image
+MIN_PREFIX = 2
+
+# Largest edit distance the index is built for
+MAX_DISTANCE = 2
+
+
+@lru_cache(maxsize=4096)
+def normalize(text: str) -> str:
+    """Casefolded letters and digits of ``text``, accents stripped ("Álvaro's" -> "alvaros")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if c.isalnum() and not unicodedata.combining(c))
+
+
+def split_images(cell: str) -> List[str]:
+    """The accepted images of a spreadsheet cell."""
+    for separator in IMAGE_SEPARATORS[1:]:
+        cell = cell.replace(separator, IMAGE_SEPARATORS[0])
+    return [image.strip() for image in cell.split(IMAGE_SEPARATORS[0]) if image.strip()]
+
+
+def allowed_distance(form: str) -> int:
+    """Typos tolerated in an answer for ``form``: none up to 3 letters, then 1, then 2 from 8."""
+    return 0 if len(form) <= 3 else 1 if len(form) <= 7 else 2
+
+
+def edit_distance(a: str, b: str, limit: int = MAX_DISTANCE) -> int:
+    """Levenshtein distance with adjacent transpositions, or ``limit + 1`` once above ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def _deletes(form: str, depth: int) -> Set[str]:
+    """Every string left after deleting up to ``depth`` characters of ``form``."""
+    variants = level = {form}
+    for _ in range(depth):
+        level = {text[:i] + text[i + 1:] for text in level for i in range(len(text))}
+        variants = variants | level
+    return variants
+
+
+class AnswerIndex:
+    """Accepted answers of every letter pair, normalized and indexed once.
+
+    Each pair accepts its images (several per cell, see ``split_images``)
+    plus any aliases. ``exact`` and ``prefix`` answers are one set lookup;
+    ``edit`` uses deletion neighborhoods (two strings within distance d share
+    a string reachable by at most d deletions from each), so only a few
+    candidates get a real edit distance check.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, str]],
+                 aliases: Optional[Dict[str, Sequence[str]]] = None,
+                 policy: str = "exact"):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.policy = policy
+        self.images: Dict[str, str] = {}
+        self.forms: Dict[str, Set[str]] = {}
+        for pair, cell in pairs:
+            pair = pair.strip().upper()
+            self.images[pair] = cell
+            self.forms.setdefault(pair, set()).update(normalize(image) for image in split_images(cell))
+        for pair, names in (aliases or {}).items():
+            self.forms.setdefault(pair.strip().upper(), set()).update(normalize(name) for name in names)
+        for forms in self.forms.values():
+            forms.discard("")
+        self._prefixes: Dict[str, Set[str]] = {}
+        self._deletes: Dict[str, Dict[str, Set[str]]] = {}
+
+    @classmethod
+    def from_groups(cls, groups: Dict[str, List[Tuple[str, str]]], **kwargs) -> "AnswerIndex":
+        return cls((pair for group in groups.values() for pair in group), **kwargs)
+
+    @classmethod
+    def from_word_pairs(cls, word_pairs: dict, **kwargs) -> "AnswerIndex":
+        return cls(((pair, entry['image']) for pair, entry in word_pairs.items()), **kwargs)
+
+    def _prefix_set(self, pair: str) -> Set[str]:
+        if pair not in self._prefixes:
+            self._prefixes[pair] = {form[:n] for form in self.forms.get(pair, ())
+                                    for n in range(min(MIN_PREFIX, len(form)), len(form) + 1)}
+        return self._prefixes[pair]
+
+    def _delete_map(self, pair: str) -> Dict[str, Set[str]]:
+        if pair not in self._deletes:
+            index = {}
+            for form in self.forms.get(pair, ()):
+                for variant in _deletes(form, allowed_distance(form)):
+                    index.setdefault(variant, set()).add(form)
+            self._deletes[pair] = index
+        return self._deletes[pair]
+
+    def prepare(self, policy: Optional[str] = None):
+        """Build the lookup tables of ``policy`` for every pair now rather than on first use."""
+        policy = policy or self.policy
+        for pair in self.forms:
+            if policy == "prefix":
+                self._prefix_set(pair)
+            elif policy == "edit":
+                self._delete_map(pair)
+        return self
+
+    def match(self, pair: str, answer: str, policy: Optional[str] = None) -> bool:
+        """Whether ``answer`` is accepted for ``pair`` under ``policy`` (the index default if None)."""
+        pair = pair.upper()
+        policy = policy or self.policy
+        answer = normalize(answer)
+        if not answer:
+            return False
+        if answer in self.forms.get(pair, ()):
+            return True
+        if policy == "prefix":
+            return answer in self._prefix_set(pair)
+        if policy == "edit":
+            index = self._delete_map(pair)
+            candidates = set()
+            for variant in _deletes(answer, MAX_DISTANCE):
+                candidates.update(index.get(variant, ()))
+            return any(edit_distance(answer, form) <= allowed_distance(form) for form in candidates)
+        return False
+
+    def reference(self, pair: str) -> str:
+        """The images of ``pair`` as written in the spreadsheet."""
+        return self.images.get(pair.upper(), "")
+
+
+def load_aliases(path: str) -> Dict[str, List[str]]:
+    """``{letter_pair: [alias, ...]}`` from a CSV with "letter_pair" and "alias" columns."""
+    aliases = {}
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            aliases.setdefault(row["letter_pair"].strip().upper(), []).extend(split_images(row["alias"]))
+    return aliases
+
+
+def regrade(store, index: AnswerIndex, policy: Optional[str] = None):
+    """Re-grade every logged pairs attempt: (positions, old, new) correct arrays.
+
+    Each distinct (pair, answer) is matched once, however often it was typed.
+    """
+    import numpy as np
+    from sctools.logstore import KINDS
+    from sctools.pairs import decode_pair
+
+    records = store.read()
+    positions = np.flatnonzero(records["kind"] == KINDS.index("pairs"))
+    selected = records[positions]
+    grades = {}
+    new = np.empty(len(selected), dtype=bool)
+    for i, key in enumerate(zip(selected["item"].tolist(), store.texts(selected))):
+        if key not in grades:
+            grades[key] = index.match(decode_pair(key[0]), key[1], policy)
+        new[i] = grades[key]
+    return positions, selected["correct"].astype(bool), new
@@ -0,0 +1,178 @@
+import csv
+import string
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Union
+
+import numpy as np
+
+from sctools.bld import BLD_CFG
+from sctools import cube
+from sctools.parallel import bounded_map
+
+
+class Memo(NamedTuple):
+    edges: str
+    corners: str
+    flips: str
+    twists: str
+    parity: bool
+
+
+MEMO_HEADER = ["Scramble", "Edges", "Corners", "Flips", "Twists", "Parity"]
+
+
+def _piece_tables(locations: np.ndarray):
+    piece_of = np.zeros(24, dtype=int)
+    for slot, stickers in enumerate(locations):
+        piece_of[stickers] = slot
+    # Cycle breaks go to the unsolved piece holding the lowest letter
+    order = sorted(range(len(locations)), key=lambda slot: locations[slot].min())
+    return piece_of.tolist(), locations.tolist(), order
+
+
+_EDGE_TABLES = _piece_tables(cube.EDGE_LOCATIONS)
+_CORNER_TABLES = _piece_tables(cube.CORNER_LOCATIONS)
+
+
+def _trace(stickers: List[int], tables, buffer: int):
+    """Follow the sticker cycles starting from ``buffer``.
+
+    Returns the target letters (with cycle breaks) and the letters of the
+    pieces that are in place but misoriented.
+    """
+    piece_of, locations, order = tables
+    buffer_slot = piece_of[buffer]
+
+    visited = [False] * len(locations)
+    visited[buffer_slot] = True
+    misoriented = []
+    for slot, locs in enumerate(locations):
+        if slot == buffer_slot:
+            continue
+        if piece_of[stickers[locs[0]]] == slot:
+            visited[slot] = True
+            if stickers[locs[0]] != locs[0]:
+                # Where the piece's reference sticker currently sits
+                misoriented.append(next(loc for loc in locs if stickers[loc] == locs[0]))
+
+    targets = []
+    loc = buffer
+    cycle_start = buffer_slot
+    while True:
+        target = stickers[loc]
+        piece = piece_of[target]
+        if piece == cycle_start:
+            if cycle_start != buffer_slot:
+                targets.append(target)
+            pending = [slot for slot in order if not visited[slot]]
+            if not pending:
+                break
+            cycle_start = pending[0]
+            visited[cycle_start] = True
+            loc = min(locations[cycle_start])
+            targets.append(loc)
+            continue
+        targets.append(target)
+        visited[piece] = True
+        loc = target
+
+    return targets, misoriented
+
+
+def _letters(indices: Iterable[int]) -> str:
+    return "".join(string.ascii_uppercase[i] for i in indices)
+
+
+def _buffer_index(schema_key: str, buffer: str) -> int:
+    return BLD_CFG[schema_key].index(buffer)
+
+
+def memo_states(states: np.ndarray,
+                edges_buffer: str = None,
+                corners_buffer: str = None) -> List[Memo]:
+    """Memo of every row of an (N, 20) state tensor."""
+    edge_buffer = _buffer_index("edges_memo_schema", edges_buffer or BLD_CFG["edges_buffer"])
+    corner_buffer = _buffer_index("corners_memo_schema", corners_buffer or BLD_CFG["corners_buffer"])
+
+    edges, corners = cube.facelets(states)
+    memos = []
+    for edge_stickers, corner_stickers in zip(edges.tolist(), corners.tolist()):
+        edge_targets, flips = _trace(edge_stickers, _EDGE_TABLES, edge_buffer)
+        corner_targets, twists = _trace(corner_stickers, _CORNER_TABLES, corner_buffer)
+        memos.append(Memo(
+            edges=_letters(edge_targets),
+            corners=_letters(corner_targets),
+            flips=_letters(flips),
+            twists=_letters(twists),
+            parity=len(edge_targets) % 2 == 1,
+        ))
+    return memos
+
+
+def memo(scramble: Union[str, "cube.CubeState"], **kwargs) -> Memo:
+    """Memo for a single scramble or cube state."""
+    if isinstance(scramble, cube.CubeState):
+        state = scramble.state
+    else:
+        state = cube.apply_moves(cube.SOLVED, scramble)
+    return memo_states(state[None, :], **kwargs)[0]
+
+
+def memo_scrambles(scrambles: Sequence[str], **kwargs) -> List[Memo]:
+    states = cube.apply_scrambles(cube.solved_states(len(scrambles)), scrambles)
+    return memo_states(states, **kwargs)
+
+
+def format_letters(letters: str) -> str:
+    """Group letters into pairs, e.g. "ABCDE" -> "AB CD E"."""
+    return " ".join(letters[i:i + 2] for i in range(0, len(letters), 2))
+
+
+def _memo_rows(scrambles: List[str], kwargs: dict) -> List[List[str]]:
+    rows = []
+    for scramble, m in zip(scrambles, memo_scrambles(scrambles, **kwargs)):
+        rows.append([
+            scramble, format_letters(m.edges), format_letters(m.corners),
+            m.flips, m.twists, str(m.parity),
+        ])
+    return rows
+
+
+def chunks(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Non-blank lines of ``lines``, stripped, in lists of ``chunk_size`` (the last may be shorter)."""
+    chunk = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(line)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_memo_rows(scrambles: Iterable[str],
+                   workers: int = None,
+                   chunk_size: int = 10000,
+                   **kwargs) -> Iterator[List[str]]:
+    """Stream memo rows for a (possibly huge) iterable of scrambles.
+
+    Chunks are solved in a process pool with a bounded number of chunks in
+    flight, so memory stays flat and rows come out in input order.
+    """
+    jobs = ((chunk, kwargs) for chunk in chunks(scrambles, chunk_size))
+    for rows in bounded_map(_memo_rows, jobs, workers):
+        yield from rows
+
+
+def memo_file(input_path: str, output_path: str, **kwargs) -> int:
+    """Write the memo of every scramble in ``input_path`` (one per line) as CSV."""
+    count = 0
+    with open(input_path, 'r') as src, open(output_path, 'w', newline='') as dst:
+        writer = csv.writer(dst)
+        writer.writerow(MEMO_HEADER)
+        for row in iter_memo_rows(src, **kwargs):
+            writer.writerow(row)
+            count += 1
+    return count
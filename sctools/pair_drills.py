@@ -0,0 +1,152 @@
+import os
+import csv
+from datetime import datetime
+
+from sctools import paths, trace
+from sctools.matching import AnswerIndex, load_aliases
+from sctools.pairs import build_groups, encode_pair, load_groups, read_groups
+from sctools.sessionlog import SessionLog
+from sctools.srs import Scheduler, all_keys, pair_key, quality
+from sctools.timing import PromptTimer, read_answer
+
+DEFAULT_SHEET = "Bld Pairs.xlsx"
+
+def create_groups(excel_path: str, output_directory: str):
+    """Create individual groups CSVs"""
+    for letter, pairs in build_groups(excel_path).items():
+        file_path = os.path.join(output_directory, f"bld_pairs_{letter}.csv")
+        with open(file_path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["letter_pair", "image"])
+            writer.writerows(pairs)
+
+def load_csv_files(directory):
+    csv_files = {}
+    for filename in os.listdir(directory):
+        if filename.startswith("bld_pairs_") and filename.endswith(".csv"):
+            letter = filename.split("_")[-1][0]
+            csv_files[letter] = os.path.join(directory, filename)
+    return csv_files
+
+def load_word_pairs(file_paths):
+    word_pairs = {}
+    for file_path in file_paths:
+        with open(file_path, 'r') as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                letter_pair = row['letter_pair'].strip()
+                image = row['image'].strip()
+                word_pairs[letter_pair] = {'image': image, 'counter': 0}
+    return word_pairs
+
+def group_word_pairs(groups, selected):
+    word_pairs = {}
+    for group in selected:
+        for letter_pair, image in groups[group]:
+            word_pairs[letter_pair] = {'image': image, 'counter': 0}
+    return word_pairs
+
+def count_answer(word_pairs, pair, is_correct, n_master):
+    """Update the run of correct answers for ``pair``; True when it reaches ``n_master``."""
+    if not is_correct:
+        word_pairs[pair]['counter'] = 0
+        return False
+    word_pairs[pair]['counter'] += 1
+    return word_pairs[pair]['counter'] == n_master
+
+def drill_groups(word_pairs, n_master, log=None, scheduler=None, raw=True, answers=None):
+    answers = answers or AnswerIndex.from_word_pairs(word_pairs)
+    keys = {pair_key(pair): pair for pair in word_pairs}
+    queue = (scheduler or Scheduler()).session(keys)
+    while len(queue):
+        trace.next_prompt()
+        timer = PromptTimer()
+        timer.start_render()
+        with trace.span("render"):
+            with trace.span("sample"):
+                key = queue.next()
+                pair = keys[key]
+            with trace.span("display"):
+                print(f"\nLetter pair: {pair}", flush=True)
+        timer.displayed()
+        
+        with trace.span("answer"):
+            user_answer, _ = read_answer("Your answer: ", timer, raw=raw)
+        user_answer = user_answer.strip()
+        
+        response_time = timer.response_time
+        timestamp = datetime.now()
+        
+        if user_answer.lower() == 'quit':
+            return
+        
+        correct_answer = word_pairs[pair]['image']
+        with trace.span("grade"):
+            is_correct = answers.match(pair, user_answer)
+            queue.review(key, quality(is_correct, response_time))
+        
+        if is_correct:
+            print(f"Correct! (t: {response_time:.1f}s)")
+        else:
+            print(f"Incorrect. The correct answer is: {correct_answer} (t: {response_time:.1f}s)")
+        if count_answer(word_pairs, pair, is_correct, n_master):
+            print(f"You've mastered '{pair}'!")
+            queue.retire(key)
+        
+        if log:
+            with trace.span("log"):
+                log.record(encode_pair(pair), user_answer, is_correct, response_time, timestamp=timestamp,
+                           render_time=timer.render_latency, reaction_time=timer.reaction_time)
+
+
+def main(args):
+    excel_path = args.excel or os.path.join(paths.groups_dir(), DEFAULT_SHEET)
+    
+    if args.trace is not None:
+        trace.start("bld_pairs_session")
+    # Compiled groups, only rebuilt when the spreadsheet changes
+    with trace.span("setup.groups"):
+        if args.groups:
+            groups = read_groups(args.groups)
+        else:
+            groups = load_groups(excel_path, paths.cache_dir())
+        aliases = load_aliases(args.aliases) if args.aliases else None
+        answers = AnswerIndex.from_groups(groups, aliases=aliases, policy=args.match).prepare()
+    
+    print(f"Mastery requires {args.n_master} correct answers")
+
+    scheduler = Scheduler(paths.srs_state_path(), keys=all_keys())
+    print(f"Items due for review: {scheduler.due_count()}")
+    
+    log = None
+    if not args.no_log:
+        # Opened on the first answer; the store modules load in the background
+        log = SessionLog("pairs")
+        print(f"Logging this session to: {log.path}")
+    else:
+        print("Logging is disabled for this session.")
+    
+    while True:
+        print("\nAvailable groups:", ", ".join(sorted(groups.keys())))
+        group_input = input("Select group(s) to drill (space-separated, or 'exit' to quit): ").upper()
+        
+        if group_input == 'EXIT':
+            break
+        
+        selected_groups = group_input.split()
+        valid_groups = [group for group in selected_groups if group in groups]
+        
+        if not valid_groups:
+            print("No valid groups selected. Please try again.")
+            continue
+        
+        print(f"Drilling groups: {', '.join(valid_groups)}")
+        
+        word_pairs = group_word_pairs(groups, valid_groups)
+        drill_groups(word_pairs, args.n_master, log, scheduler, raw=not args.enter, answers=answers)
+        scheduler.save()
+
+    if log:
+        log.close()
+    if trace.active():
+        print(f"Wrote per-stage timings to {trace.finish(args.trace, log and log.session)}")
@@ -0,0 +1,188 @@
+import os
+import csv
+import pickle
+import string
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CACHE_VERSION = 1
+
+LEARN_LAST_LETTERS = "AER"
+
+PAIR_LETTERS = string.ascii_uppercase
+
+Groups = Dict[str, List[Tuple[str, str]]]
+
+# Columns of a consolidated groups file: every group of one member, in learning order
+GROUPS_HEADER = ["group", "letter_pair", "image"]
+
+SHEET_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+
+
+def build_groups(excel_path: str) -> Groups:
+    """Read the pair spreadsheet and split it into drill groups.
+
+    Returns ``{first_letter: [(letter_pair, image), ...]}`` in learning order,
+    with every pair containing a learn-last letter in group "Z".
+    """
+    import pandas as pd
+
+    pairs = pd.read_excel(excel_path, index_col=0)
+
+    pairs_long = (
+        pairs
+        .melt(ignore_index=False)
+        .reset_index()
+        .dropna()
+        .assign(letter_pair=lambda df: df["index"].astype(str) + df["variable"].astype(str))
+        .rename(columns={"value": "image"})
+        .pipe(lambda df: df[["letter_pair", "image"]])
+        .pipe(lambda df: df[df.image != "."])
+    )
+    return group_pairs(pairs_long)
+
+
+def group_pairs(pairs_long) -> Groups:
+    """Rank a (letter_pair, image) frame and split it into groups."""
+    learn_last = pairs_long["letter_pair"].str.contains(f"[{LEARN_LAST_LETTERS}]")
+    rank = pairs_long["letter_pair"].rank()
+
+    pair_groups = (
+        pairs_long
+        .assign(learn_last=learn_last)
+        .assign(rank=rank.where(~learn_last, rank * 100).rank())
+        .sort_values("rank", kind="stable")
+        .assign(group=lambda df: df["letter_pair"].str[0].where(~df["learn_last"], "Z"))
+    )
+
+    groups = {}
+    for pair, image, group in zip(pair_groups["letter_pair"], pair_groups["image"], pair_groups["group"]):
+        groups.setdefault(group, []).append((pair.strip(), str(image).strip()))
+    return groups
+
+
+def encode_pair(pair: str) -> int:
+    pair = pair.strip().upper()
+    return PAIR_LETTERS.index(pair[0]) * len(PAIR_LETTERS) + PAIR_LETTERS.index(pair[1])
+
+
+def decode_pair(idx: int) -> str:
+    first, second = divmod(int(idx), len(PAIR_LETTERS))
+    return PAIR_LETTERS[first] + PAIR_LETTERS[second]
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path_for(excel_path: str, cache_dir: str) -> str:
+    name = hashlib.sha1(os.path.abspath(excel_path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"pair_groups_v{CACHE_VERSION}_{name}.pkl")
+
+
+def _read_cache(path: str):
+    try:
+        with open(path, 'rb') as file:
+            cache = pickle.load(file)
+    except Exception:
+        # A damaged or foreign pickle can raise nearly anything (AttributeError,
+        # ImportError, ValueError, ...); any of them just means a rebuild
+        return None
+    return cache if isinstance(cache, dict) and cache.get("version") == CACHE_VERSION else None
+
+
+def _write_cache(path: str, cache: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def load_groups(excel_path: str, cache_dir: str) -> Groups:
+    """Groups for ``excel_path``, rebuilt only when the spreadsheet changed.
+
+    A matching size and mtime hits the cache without reading the spreadsheet;
+    otherwise its content hash decides whether it really needs rebuilding.
+    """
+    path = cache_path_for(excel_path, cache_dir)
+    stat = os.stat(excel_path)
+    cache = _read_cache(path)
+
+    if cache and (cache["size"], cache["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+        return cache["groups"]
+
+    digest = _file_digest(excel_path)
+    if cache and cache["sha1"] == digest:
+        groups = cache["groups"]
+    else:
+        groups = build_groups(excel_path)
+
+    _write_cache(path, {
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha1": digest,
+        "groups": groups,
+    })
+    return groups
+
+
+def write_groups(path: str, groups: Groups):
+    """Write every group to one CSV (see ``GROUPS_HEADER``), replacing ``path`` atomically."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(GROUPS_HEADER)
+        for group, pairs in groups.items():
+            writer.writerows((group, pair, image) for pair, image in pairs)
+    os.replace(tmp_path, path)
+
+
+def read_groups(path: str) -> Groups:
+    """Groups from a file written by ``write_groups``."""
+    groups = {}
+    with open(path, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            groups.setdefault(row["group"], []).append((row["letter_pair"], row["image"]))
+    return groups
+
+
+def sheet_files(directory: str) -> List[str]:
+    """Paths of every pair spreadsheet in ``directory`` (one per member), by name."""
+    names = [name for name in os.listdir(directory)
+             if name.lower().endswith(SHEET_EXTENSIONS) and not name.startswith("~$")]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+
+def member_name(excel_path: str) -> str:
+    return os.path.splitext(os.path.basename(excel_path))[0]
+
+
+def _member_groups(excel_path: str, output_dir: str, cache_dir: Optional[str]) -> Tuple[str, str, int]:
+    groups = load_groups(excel_path, cache_dir) if cache_dir else build_groups(excel_path)
+    path = os.path.join(output_dir, f"{member_name(excel_path)}_groups.csv")
+    write_groups(path, groups)
+    return member_name(excel_path), path, sum(len(pairs) for pairs in groups.values())
+
+
+def build_all_groups(sheets_dir: str,
+                     output_dir: str,
+                     cache_dir: Optional[str] = None,
+                     workers: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+    """Build the groups of every spreadsheet in ``sheets_dir`` on a process pool.
+
+    Each member's groups go to one ``<member>_groups.csv`` in ``output_dir``.
+    With a ``cache_dir``, sheets that did not change since the last build are
+    not read again. Yields (member, path, number of pairs) in sheet order.
+    """
+    # Imported here, so drills that only read groups start without the pool
+    from sctools.parallel import bounded_map
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = ((excel_path, output_dir, cache_dir) for excel_path in sheet_files(sheets_dir))
+    yield from bounded_map(_member_groups, jobs, workers)
@@ -0,0 +1,36 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+
+def default_workers() -> int:
+    """Worker count when none is given: one per CPU, as ProcessPoolExecutor picks."""
+    workers = os.cpu_count() or 1
+    # ProcessPoolExecutor cannot wait on more handles than this on Windows
+    return min(workers, 61) if os.name == "nt" else workers
+
+
+def bounded_map(fn: Callable, items: Iterable[tuple], workers: Optional[int] = None,
+                per_worker: int = 2) -> Iterator:
+    """``fn(*args)`` for every ``args`` tuple of ``items`` on a process pool, in order.
+
+    At most ``per_worker`` tasks per worker are in flight, so ``items`` may be
+    a lazy iterable of any length and memory stays flat. ``fn`` must be
+    picklable (a module-level function); ``workers=1`` runs in this process.
+    """
+    workers = workers or default_workers()
+    if workers == 1:
+        for args in items:
+            yield fn(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_pending = per_worker * workers
+        pending = deque()
+        for args in items:
+            pending.append(executor.submit(fn, *args))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
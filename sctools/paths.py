@@ -0,0 +1,54 @@
+import os
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def home() -> str:
+    """Directory holding logs/ and cache/.
+
+    ``SCTOOLS_HOME`` wins; otherwise a source checkout uses the repository
+    root and an installed package uses the working directory.
+    """
+    if "SCTOOLS_HOME" in os.environ:
+        return os.environ["SCTOOLS_HOME"]
+    if os.path.exists(os.path.join(_ROOT, "setup.py")):
+        return _ROOT
+    return os.getcwd()
+
+
+def logs_dir() -> str:
+    return os.path.join(home(), "logs")
+
+
+def cache_dir() -> str:
+    return os.path.join(home(), "cache")
+
+
+def algs_dir() -> str:
+    return os.path.join(cache_dir(), "algs")
+
+
+def groups_dir() -> str:
+    """Pairs spreadsheets and the group CSVs built from them."""
+    return os.path.join(home(), "docs", "groups")
+
+
+def report_dir() -> str:
+    return os.path.join(home(), "report")
+
+
+def store_dir() -> str:
+    return os.path.join(logs_dir(), "store")
+
+
+def traces_dir() -> str:
+    return os.path.join(logs_dir(), "traces")
+
+
+def srs_state_path() -> str:
+    return os.path.join(logs_dir(), "srs_state.json")
+
+
+def user_srs_state_path(user: str) -> str:
+    """Scheduler state of one drill server user."""
+    return os.path.join(logs_dir(), "srs", f"{user}.json")
@@ -0,0 +1,156 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from collections import defaultdict
+
+from sctools import paths, trace
+from sctools.bld import BLD_CFG, Trainer, PieceAtlas, PieceDisplay, encode_piece, decode_piece, encode_letters, get_scheme
+from sctools.sessionlog import SessionLog
+from sctools.srs import Scheduler, all_keys, piece_key, quality
+from sctools.timing import PromptTimer, read_answer
+
+
+class Prefetcher:
+    """Prepares the next prompt on a background thread while the user answers.
+
+    ``submit`` starts ``func(*args)``; ``result`` returns what it produced,
+    or runs ``func`` now if nothing was submitted. One prompt is in flight at
+    a time, so the prompt sequence of a seed does not change.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sctools-prefetch")
+        self._future = None
+
+    def submit(self, func, *args):
+        self._future = self._executor.submit(func, *args)
+
+    def result(self, func, *args):
+        future, self._future = self._future, None
+        return future.result() if future is not None else func(*args)
+
+    def close(self):
+        self._future = None
+        self._executor.shutdown(wait=True)
+
+
+def _next_prompt(trainer, atlas, piece_type, scheme, queue=None):
+    """(scheduler key, piece, atlas image) of the next prompt."""
+    key = None
+    if queue is not None:
+        key = queue.next()
+        # Scheduler keys use Speffz letters whatever the letter scheme
+        piece = decode_piece(encode_letters(key.split(":")[1]), ptype=piece_type, scheme=scheme)
+    else:
+        piece = trainer.get_random_piece(ptype=piece_type)
+    return key, piece, atlas.image(piece, piece_type)
+
+
+def run_session(args, piece_type, trainer, scheme, display, scheduler=None):
+    """Drill ``piece_type`` in ``display`` until the user quits."""
+    if args.trace is not None:
+        trace.start(f"{piece_type}_rec_session", {"seed": trainer.seed})
+
+    log = None
+    if not args.no_log:
+        log = SessionLog(piece_type)
+        log.open()
+        print(f"Logging this session to: {log.path} (session {log.session})")
+    else:
+        print("Logging is disabled for this session.")
+
+    session_stats = defaultdict(int)
+
+    queue = None
+    if scheduler:
+        queue = scheduler.session(piece_key(piece_type, i) for i in range(24))
+
+    prefetcher = Prefetcher()
+    prompt_args = (trainer, display.atlas, piece_type, scheme, queue)
+    while True:
+        trace.next_prompt()
+        timer = PromptTimer()
+        timer.start_render()
+        # "render": prompt start to the piece being on screen
+        with trace.span("render"):
+            with trace.span("sample"):
+                key, piece, image = prefetcher.result(_next_prompt, *prompt_args)
+            with trace.span("display"):
+                display.show_image(image)
+        timer.displayed()
+        # Random prompts do not depend on the answer: prepare the next one now
+        if queue is None:
+            prefetcher.submit(_next_prompt, *prompt_args)
+
+        with trace.span("answer"):
+            user_input, _ = read_answer(f"Which {piece_type} is this? (Esc to quit)\n", timer,
+                                        single_key=True, raw=not args.enter)
+        user_input = user_input.lower()
+
+        response_time = timer.response_time
+        timestamp = datetime.now()
+
+        if user_input == 'quit':
+            session_stats["total"] = session_stats["correct"] + session_stats["incorrect"]
+            stats = (
+                "*** Session Stats ***\n"
+                f"Correct: {session_stats['correct']}/{session_stats['total']}\n"
+            )
+            print(stats)
+            break
+
+        with trace.span("grade"):
+            is_correct = trainer.check_piece_memo_letter(piece, user_input, ptype=piece_type)
+            if queue is not None:
+                queue.review(key, quality(is_correct, response_time))
+                prefetcher.submit(_next_prompt, *prompt_args)
+        if is_correct:
+            print(f"Correct! (t: {response_time:.3f})")
+            session_stats["correct"] += 1
+        else:
+            print(f"Incorrect! (t: {response_time:.3f})")
+            session_stats["incorrect"] += 1
+
+        if log:
+            with trace.span("log"):
+                log.record(encode_piece(piece, piece_type, scheme), user_input, is_correct, response_time,
+                           timestamp=timestamp, render_time=timer.render_latency,
+                           reaction_time=timer.reaction_time, scheme=scheme)
+
+    prefetcher.close()
+    if scheduler:
+        scheduler.save()
+    if log:
+        log.close()
+    if trace.active():
+        print(f"Wrote per-stage timings to {trace.finish(args.trace, log and log.session)}")
+
+
+def main(args):
+    piece_type = "corner" if args.type == 'c' else "edge"
+    seed = args.seed if args.seed is not None else int.from_bytes(os.urandom(4), "little")
+    top, front = args.orientation or (None, None)
+    scheme = get_scheme(colors=BLD_CFG["start"], top=top, front=front, letters=args.letters)
+    trainer = Trainer(seed=seed, scheme=scheme)
+    print(f"Session seed: {seed} (replay with --seed {seed})")
+    display = PieceDisplay(PieceAtlas.load(paths.cache_dir(), scheme=scheme))
+
+    scheduler = None
+    if args.srs:
+        scheduler = Scheduler(paths.srs_state_path(), keys=all_keys())
+
+    while True:
+        run_session(args, piece_type, trainer, scheme, display, scheduler)
+        if not args.keep_open:
+            break
+        # The window, atlas and imports stay warm for the next session
+        choice, _ = read_answer("Enter: new session, c/e: switch to corners/edges, Esc: exit\n",
+                                PromptTimer(), single_key=True, raw=not args.enter)
+        choice = choice.lower()
+        if choice == "quit" or choice not in ("", "c", "e"):
+            break
+        if choice:
+            piece_type = "corner" if choice == 'c' else "edge"
+
+    print("Exiting the program.")
+    display.close()
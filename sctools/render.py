@@ -0,0 +1,242 @@
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+Colors = Sequence[str]
+
+# Piece geometry in data coordinates: (sticker index, polygon) in drawing order,
+# and the (xmin, xmax, ymin, ymax) view. Edges show the U/D sticker below the
+# other one; corners are drawn as an isometric cube corner.
+EDGE_SHAPES = [
+    (1, [(0, 0), (1, 0), (1, 1), (0, 1)]),
+    (0, [(0, -1), (1, -1), (1, 0), (0, 0)]),
+]
+EDGE_LIMITS = (0.0, 1.0, -1.0, 1.0)
+
+CORNER_SHAPES = [
+    (0, [(0.5, 1), (1, 0.75), (0.5, 0.5), (0, 0.75)]),    # top
+    (1, [(1, 0.75), (1, 0.25), (0.5, 0), (0.5, 0.5)]),    # right
+    (2, [(0, 0.75), (0.5, 0.5), (0.5, 0), (0, 0.25)]),    # left
+]
+CORNER_LIMITS = (-0.1, 1.1, -0.1, 1.1)
+
+GEOMETRY = {"edge": (EDGE_SHAPES, EDGE_LIMITS), "corner": (CORNER_SHAPES, CORNER_LIMITS)}
+
+NAMED_COLORS = {
+    "white": (255, 255, 255), "yellow": (255, 255, 0), "red": (255, 0, 0),
+    "orange": (255, 165, 0), "blue": (0, 0, 255), "green": (0, 128, 0),
+    "black": (0, 0, 0), "gray": (128, 128, 128), "grey": (128, 128, 128),
+}
+
+
+def to_rgba(color: Union[str, Tuple[int, ...]]) -> Tuple[int, int, int, int]:
+    """RGBA bytes of a color name, a "#rrggbb" string or an RGB(A) tuple."""
+    if isinstance(color, str):
+        if color.startswith("#") and len(color) == 7:
+            return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5)) + (255,)
+        if color.lower() in NAMED_COLORS:
+            return NAMED_COLORS[color.lower()] + (255,)
+        raise ValueError(f"Unknown color: {color}")
+    color = tuple(int(c) for c in color)
+    return color + (255,) * (4 - len(color))
+
+
+class Renderer:
+    """Draws a piece from its sticker colors; backends choose the output type."""
+
+    name = None
+
+    def edge(self, colors: Colors):
+        return self.draw(colors, "edge")
+
+    def corner(self, colors: Colors):
+        return self.draw(colors, "corner")
+
+    def draw(self, colors: Colors, ptype: str):
+        raise NotImplementedError
+
+
+class MatplotlibRenderer(Renderer):
+    """``matplotlib.figure.Figure`` per piece (the original drawing)."""
+
+    name = "matplotlib"
+
+    def edge(self, colors: Colors):
+        import matplotlib.patches as patches
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(2, 2))
+        ax = fig.add_subplot(111)
+
+        for sticker, vertices in EDGE_SHAPES:
+            ax.add_patch(patches.Polygon(vertices, closed=True, edgecolor='black', facecolor=colors[sticker]))
+
+        ax.set_axis_off()
+
+        ax.set_xlim(*EDGE_LIMITS[:2])
+        ax.set_ylim(*EDGE_LIMITS[2:])
+
+        ax.set_aspect('equal', adjustable='box')  # Ensures equal aspect ratio
+
+        return fig
+
+    def corner(self, colors: Colors):
+        from matplotlib.patches import Polygon
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(2, 2))
+        ax = fig.add_subplot(111)
+
+        # Draw each face
+        for sticker, vertices in CORNER_SHAPES:
+            ax.add_patch(Polygon(vertices, closed=True, edgecolor='black', facecolor=colors[sticker], alpha=1))
+
+        # Remove axis ticks
+        ax.set_xticks([])
+        ax.set_yticks([])
+
+        # Set axis limits
+        ax.set_xlim(*CORNER_LIMITS[:2])
+        ax.set_ylim(*CORNER_LIMITS[2:])
+
+        # Ensure equal aspect ratio
+        ax.set_aspect('equal', adjustable='box')
+
+        return fig
+
+    def draw(self, colors: Colors, ptype: str):
+        return self.edge(colors) if ptype == "edge" else self.corner(colors)
+
+
+def svg_template(shapes, limits, width: int, height: int, stroke_width: float = 0.01):
+    """Pre-formatted SVG parts for ``shapes``; see ``format_svg``."""
+    xmin, xmax, ymin, ymax = limits
+    head = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="{xmin:g} {-ymax:g} {xmax - xmin:g} {ymax - ymin:g}">'
+        f'<g stroke="black" stroke-width="{stroke_width:g}" stroke-linejoin="round">'
+    )
+    # SVG's y axis points down: draw at -y
+    polygons = [
+        (sticker, '<polygon points="' + " ".join(f"{x:g},{-y:g}" for x, y in vertices) + '" fill="')
+        for sticker, vertices in shapes
+    ]
+    return head, polygons, "</g></svg>"
+
+
+def format_svg(template, colors: Colors) -> str:
+    """SVG document of a template with ``colors[sticker]`` filled in."""
+    head, polygons, tail = template
+    return head + "".join(f'{polygon}{colors[sticker]}"/>' for sticker, polygon in polygons) + tail
+
+
+def label_map(shapes, limits, width: int, height: int, line_width: float = 1.5,
+              margin: float = 0.05, n_stickers: int = None) -> np.ndarray:
+    """Pixel labels of ``shapes`` drawn into a (height, width) image.
+
+    0 is the background, 1 + sticker a sticker and 1 + n_stickers the outline
+    (n_stickers defaults to the highest sticker index + 1).
+    """
+    xmin, xmax, ymin, ymax = limits
+    scale = (1 - 2 * margin) * min(width / (xmax - xmin), height / (ymax - ymin))
+    # Pixel centers in data coordinates, the view centered in the image
+    x = (np.arange(width) + 0.5 - width / 2) / scale + (xmin + xmax) / 2
+    y = (height / 2 - np.arange(height) - 0.5) / scale + (ymin + ymax) / 2
+    px, py = np.meshgrid(x, y)
+
+    labels = np.zeros((height, width), dtype=np.intp)
+    outline = np.zeros((height, width), dtype=bool)
+    half_width = line_width / 2 / scale
+    for sticker, vertices in shapes:
+        v = np.asarray(vertices, dtype=float)
+        a, b = v, np.roll(v, -1, axis=0)
+        cross = np.stack([(bx - ax) * (py - ay) - (by - ay) * (px - ax)
+                          for (ax, ay), (bx, by) in zip(a, b)])
+        inside = (cross >= 0).all(axis=0) | (cross <= 0).all(axis=0)
+        labels[inside] = 1 + sticker
+        for (ax, ay), (bx, by) in zip(a, b):
+            dx, dy = bx - ax, by - ay
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy), 0, 1)
+            outline |= np.hypot(px - ax - t * dx, py - ay - t * dy) <= half_width
+    if n_stickers is None:
+        n_stickers = 1 + max(sticker for sticker, _ in shapes)
+    labels[outline] = 1 + n_stickers
+    return labels
+
+
+def palette(colors: Sequence, background=(255, 255, 255, 255)) -> np.ndarray:
+    """uint32-packed RGBA palette for a label map: background, stickers, outline."""
+    rgba = [to_rgba(background)] + [to_rgba(c) for c in colors] + [to_rgba("black")]
+    return np.array(rgba, dtype=np.uint8).view(np.uint32).ravel()
+
+
+def encode_png(image: np.ndarray, level: int = 6) -> bytes:
+    """PNG bytes of an (H, W, 4) uint8 RGBA array, with only zlib."""
+    import zlib
+    import struct
+
+    height, width = image.shape[:2]
+    # Filter type 0 (none) in front of every row
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = np.ascontiguousarray(image, dtype=np.uint8).reshape(height, -1)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + chunk(b"IEND", b""))
+
+
+class SVGRenderer(Renderer):
+    """SVG document string per piece; only the fill colors change between pieces."""
+
+    name = "svg"
+
+    def __init__(self, size: int = 200, stroke_width: float = 0.01):
+        self.size = size
+        self._templates = {ptype: svg_template(*GEOMETRY[ptype], size, size, stroke_width) for ptype in GEOMETRY}
+
+    def draw(self, colors: Colors, ptype: str) -> str:
+        return format_svg(self._templates[ptype], colors)
+
+
+class RasterRenderer(Renderer):
+    """(size, size, 4) uint8 RGBA array per piece.
+
+    Every pixel is labelled once per piece type (background, sticker or
+    outline), so drawing a piece is a single lookup into a palette of RGBA
+    colors packed as uint32.
+    """
+
+    name = "raster"
+
+    def __init__(self, size: int = 200, line_width: float = 1.5, margin: float = 0.05,
+                 background=(255, 255, 255, 255)):
+        self.size = size
+        self.background = background
+        self._labels = {ptype: label_map(*GEOMETRY[ptype], size, size, line_width, margin) for ptype in GEOMETRY}
+        self._palettes: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+
+    def _palette(self, colors: Colors, ptype: str) -> np.ndarray:
+        key = (ptype, tuple(colors))
+        if key not in self._palettes:
+            self._palettes[key] = palette(colors, self.background)
+        return self._palettes[key]
+
+    def draw(self, colors: Colors, ptype: str) -> np.ndarray:
+        pixels = self._palette(colors, ptype).take(self._labels[ptype])
+        return pixels.view(np.uint8).reshape(self.size, self.size, 4)
+
+
+RENDERERS = {cls.name: cls for cls in (MatplotlibRenderer, SVGRenderer, RasterRenderer)}
+
+
+def get_renderer(renderer: Union[str, Renderer] = "matplotlib", **kwargs) -> Renderer:
+    """A renderer instance from a backend name (``RENDERERS``), or the instance itself."""
+    if isinstance(renderer, Renderer):
+        return renderer
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}; expected one of {', '.join(RENDERERS)}")
+    return RENDERERS[renderer](**kwargs)
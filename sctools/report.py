@@ -0,0 +1,414 @@
+import os
+import io
+import json
+import html
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from sctools.bld import MEMO_LETTERS
+from sctools.logstore import KINDS, LogStore
+from sctools.pairs import PAIR_LETTERS
+from sctools.parallel import bounded_map
+
+REPORT_VERSION = 1
+
+# Per-session aggregates, cached between runs; only changed sessions are recomputed
+SESSION_DTYPE = np.dtype([
+    ("session", "<u4"),
+    ("kind", "u1"),
+    ("started", "<i8"),         # milliseconds since the epoch (first attempt)
+    ("count", "<u4"),
+    ("correct", "<u4"),
+    ("time_sum", "<f8"),
+    ("median_time", "<f4"),
+])
+ITEM_DTYPE = np.dtype([
+    ("session", "<u4"),
+    ("kind", "u1"),
+    ("item", "<u2"),
+    ("count", "<u4"),
+    ("correct", "<u4"),
+    ("time_sum", "<f8"),
+])
+# Piece drills only: memo letter of the piece vs the one-letter answer
+CONFUSION_DTYPE = np.dtype([
+    ("session", "<u4"),
+    ("kind", "u1"),
+    ("expected", "u1"),
+    ("answer", "u1"),
+    ("count", "<u4"),
+])
+
+NO_ANSWER = 255
+
+PANELS = ("trend", "items", "confusion")
+
+
+def session_user(session: dict) -> Optional[str]:
+    """Drill server user of a log store session; None for local drills and imported logs."""
+    source = session.get("source") or ""
+    return source[len("server:"):] if source.startswith("server:") else None
+
+
+def fingerprints(records: np.ndarray) -> Dict[int, str]:
+    """Digest of every session's records, so edited (e.g. re-graded) sessions count as changed."""
+    if not len(records):
+        return {}
+    sessions, inverse = np.unique(records["session"], return_inverse=True)
+    columns = [np.bincount(inverse)]
+    for name in ("item", "answer", "correct", "response_time", "timestamp"):
+        # Position-weighted sums, so reordered or edited values change the digest
+        columns.append(np.bincount(inverse, weights=records[name].astype(np.float64)
+                                   * (1 + np.arange(len(records)) % 7919)))
+    table = np.column_stack(columns)
+    return {int(s): hashlib.sha1(row.tobytes()).hexdigest()[:16] for s, row in zip(sessions.tolist(), table)}
+
+
+def aggregate(records: np.ndarray):
+    """(sessions, items, confusion) aggregate rows of ``records``."""
+    sessions, inverse = np.unique(records["session"], return_inverse=True)
+    kinds = np.zeros(len(sessions), dtype=np.uint8)
+    kinds[inverse] = records["kind"]
+    times = records["response_time"].astype(np.float64)
+
+    session_rows = np.zeros(len(sessions), dtype=SESSION_DTYPE)
+    session_rows["session"] = sessions
+    session_rows["kind"] = kinds
+    session_rows["started"] = np.full(len(sessions), np.iinfo(np.int64).max)
+    np.minimum.at(session_rows["started"], inverse, records["timestamp"])
+    session_rows["count"] = np.bincount(inverse, minlength=len(sessions))
+    session_rows["correct"] = np.bincount(inverse, weights=records["correct"], minlength=len(sessions))
+    session_rows["time_sum"] = np.bincount(inverse, weights=times, minlength=len(sessions))
+    order = np.lexsort((times, inverse))
+    starts = np.searchsorted(inverse[order], np.arange(len(sessions)))
+    ends = np.append(starts[1:], len(order))
+    sorted_times = times[order]
+    # Median of each session's slice of the (session, time) sorted times
+    lo, hi = (starts + ends - 1) // 2, (starts + ends) // 2
+    session_rows["median_time"] = (sorted_times[lo] + sorted_times[hi]) / 2
+
+    keys = np.stack([records["session"].astype(np.int64), records["kind"], records["item"]], axis=1)
+    item_keys, item_inverse = np.unique(keys, axis=0, return_inverse=True)
+    item_inverse = item_inverse.ravel()
+    item_rows = np.zeros(len(item_keys), dtype=ITEM_DTYPE)
+    item_rows["session"], item_rows["kind"], item_rows["item"] = item_keys.T
+    item_rows["count"] = np.bincount(item_inverse, minlength=len(item_keys))
+    item_rows["correct"] = np.bincount(item_inverse, weights=records["correct"], minlength=len(item_keys))
+    item_rows["time_sum"] = np.bincount(item_inverse, weights=times, minlength=len(item_keys))
+
+    pieces = (records["kind"] != KINDS.index("pairs")) & (records["answer"] != NO_ANSWER)
+    selected = records[pieces]
+    keys = np.stack([selected["session"].astype(np.int64), selected["kind"],
+                     selected["item"], selected["answer"]], axis=1)
+    confusion_keys, counts = np.unique(keys.reshape(-1, 4), axis=0, return_counts=True)
+    confusion_rows = np.zeros(len(confusion_keys), dtype=CONFUSION_DTYPE)
+    if len(confusion_keys):
+        (confusion_rows["session"], confusion_rows["kind"],
+         confusion_rows["expected"], confusion_rows["answer"]) = confusion_keys.T
+    confusion_rows["count"] = counts
+    return session_rows, item_rows, confusion_rows
+
+
+class ReportCache:
+    """Per-session aggregates of a log store plus the fingerprint of each session."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.fingerprints: Dict[int, str] = {}
+        self.sessions = np.zeros(0, dtype=SESSION_DTYPE)
+        self.items = np.zeros(0, dtype=ITEM_DTYPE)
+        self.confusion = np.zeros(0, dtype=CONFUSION_DTYPE)
+
+    @classmethod
+    def load(cls, path: str) -> "ReportCache":
+        cache = cls(path)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if int(data["version"]) == REPORT_VERSION:
+                    cache.sessions, cache.items, cache.confusion = data["sessions"], data["items"], data["confusion"]
+                    cache.fingerprints = dict(zip(data["fp_sessions"].tolist(), data["fp_digests"].tolist()))
+        return cache
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path, version=REPORT_VERSION, sessions=self.sessions, items=self.items,
+            confusion=self.confusion, fp_sessions=np.array(list(self.fingerprints), dtype=np.int64),
+            fp_digests=np.array(list(self.fingerprints.values()), dtype="U16"),
+        )
+        os.replace(tmp_path, path)
+
+    def sync(self, store: LogStore) -> set:
+        """Re-aggregate the sessions whose records changed; returns their ids."""
+        records = store.read()
+        current = fingerprints(records)
+        changed = {s for s, digest in current.items() if self.fingerprints.get(s) != digest}
+        changed |= set(self.fingerprints) - set(current)
+        if not changed:
+            return changed
+
+        stale = np.array(sorted(changed), dtype=np.int64)
+        keep = lambda rows: rows[~np.isin(rows["session"], stale)]
+        new = aggregate(np.asarray(records[np.isin(records["session"], stale)]))
+        self.sessions, self.items, self.confusion = (
+            np.sort(np.concatenate([keep(old), rows]), order="session")
+            for old, rows in zip((self.sessions, self.items, self.confusion), new)
+        )
+        self.fingerprints = current
+        return changed
+
+
+def item_labels(kind: str) -> List[str]:
+    if kind == "pairs":
+        return list(PAIR_LETTERS)
+    return [str(letter) for letter in MEMO_LETTERS]
+
+
+def panel_data(cache: ReportCache, kind: str, sessions: Optional[Sequence[int]] = None) -> dict:
+    """Everything the panels of ``kind`` draw, restricted to ``sessions`` if given."""
+    k = KINDS.index(kind)
+    select = lambda rows: rows[(rows["kind"] == k) & (np.isin(rows["session"], sessions)
+                                                      if sessions is not None else True)]
+    session_rows = np.sort(select(cache.sessions), order="started")
+    item_rows = select(cache.items)
+    confusion_rows = select(cache.confusion)
+
+    n = len(PAIR_LETTERS) ** 2 if kind == "pairs" else len(MEMO_LETTERS)
+    count = np.bincount(item_rows["item"], weights=item_rows["count"], minlength=n)[:n]
+    correct = np.bincount(item_rows["item"], weights=item_rows["correct"], minlength=n)[:n]
+    time_sum = np.bincount(item_rows["item"], weights=item_rows["time_sum"], minlength=n)[:n]
+    confusion = np.zeros((len(MEMO_LETTERS), len(MEMO_LETTERS)))
+    np.add.at(confusion, (confusion_rows["expected"], confusion_rows["answer"]), confusion_rows["count"])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return dict(
+            kind=kind,
+            labels=item_labels(kind),
+            started=session_rows["started"],
+            session_accuracy=session_rows["correct"] / session_rows["count"],
+            session_median=session_rows["median_time"].astype(np.float64),
+            session_count=session_rows["count"],
+            count=count,
+            accuracy=correct / count,
+            mean_time=time_sum / count,
+            confusion=confusion,
+        )
+
+
+def _digest(cache: ReportCache, kind: str, sessions: Optional[Sequence[int]]) -> str:
+    k = KINDS.index(kind)
+    ids = cache.sessions["session"][cache.sessions["kind"] == k].tolist()
+    if sessions is not None:
+        ids = sorted(set(ids) & set(sessions))
+    digest = hashlib.sha1(f"v{REPORT_VERSION}".encode())
+    for s in ids:
+        digest.update(f"{s}:{cache.fingerprints.get(s)};".encode())
+    return digest.hexdigest()[:16]
+
+
+def _png(fig) -> bytes:
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig).print_png(buffer)
+    return buffer.getvalue()
+
+
+def _draw_trend(data: dict):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(8, 4.5), layout="constrained")
+    acc_ax, time_ax = fig.subplots(2, 1, sharex=True)
+    # One point per session, evenly spaced: sessions cluster on training days
+    x = np.arange(1, len(data["started"]) + 1)
+    acc_ax.plot(x, data["session_accuracy"] * 100, marker="o", markersize=3)
+    acc_ax.set_ylabel("accuracy (%)")
+    acc_ax.set_ylim(0, 105)
+    time_ax.plot(x, data["session_median"], marker="o", markersize=3, color="tab:orange")
+    time_ax.set_ylabel("median time (s)")
+    time_ax.set_xlabel("session")
+    dates = data["started"].astype("datetime64[D]")
+    if len(x):
+        acc_ax.set_title(f"{data['kind']}: per session ({dates[0]} to {dates[-1]})")
+    return fig
+
+
+def _draw_items(data: dict):
+    from matplotlib.figure import Figure
+
+    if data["kind"] == "pairs":
+        fig = Figure(figsize=(11, 5), layout="constrained")
+        axes = fig.subplots(1, 2)
+        n = len(PAIR_LETTERS)
+        for ax, values, title, cmap in ((axes[0], data["accuracy"] * 100, "accuracy (%)", "RdYlGn"),
+                                        (axes[1], data["mean_time"], "mean time (s)", "viridis")):
+            image = ax.imshow(values.reshape(n, n), cmap=cmap)
+            ax.set_xticks(range(n), data["labels"], fontsize=6)
+            ax.set_yticks(range(n), data["labels"], fontsize=6)
+            ax.set_xlabel("second letter")
+            ax.set_ylabel("first letter")
+            ax.set_title(f"pairs: {title}")
+            fig.colorbar(image, ax=ax, shrink=0.8)
+        return fig
+
+    fig = Figure(figsize=(8, 4.5), layout="constrained")
+    acc_ax, time_ax = fig.subplots(2, 1, sharex=True)
+    x = np.arange(len(data["labels"]))
+    acc_ax.bar(x, data["accuracy"] * 100)
+    acc_ax.set_ylabel("accuracy (%)")
+    acc_ax.set_ylim(0, 105)
+    time_ax.bar(x, data["mean_time"], color="tab:orange")
+    time_ax.set_ylabel("mean time (s)")
+    time_ax.set_xticks(x, data["labels"])
+    acc_ax.set_title(f"{data['kind']}: per piece")
+    return fig
+
+
+def _draw_confusion(data: dict):
+    from matplotlib.figure import Figure
+
+    confusion = data["confusion"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = confusion / confusion.sum(axis=1, keepdims=True)
+    # Hide correct answers so the confusions stand out
+    np.fill_diagonal(rates, np.nan)
+
+    fig = Figure(figsize=(6, 5.5), layout="constrained")
+    ax = fig.subplots()
+    image = ax.imshow(rates * 100, cmap="Reds", vmin=0)
+    labels = data["labels"]
+    ax.set_xticks(range(len(labels)), labels, fontsize=7)
+    ax.set_yticks(range(len(labels)), labels, fontsize=7)
+    ax.set_xlabel("answered")
+    ax.set_ylabel("expected")
+    ax.set_title(f"{data['kind']}: wrong answers (% of attempts)")
+    fig.colorbar(image, ax=ax, shrink=0.8)
+    return fig
+
+
+_DRAW = {"trend": _draw_trend, "items": _draw_items, "confusion": _draw_confusion}
+
+
+def _render_panel(panel: str, data: dict, path: str) -> str:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as file:
+        file.write(_png(_DRAW[panel](data)))
+    os.replace(tmp_path, path)
+    return path
+
+
+def _panels(kind: str) -> List[str]:
+    return [panel for panel in PANELS if not (panel == "confusion" and kind == "pairs")]
+
+
+def _summary_rows(data: dict, n: int = 10) -> List[tuple]:
+    """The ``n`` slowest items with at least one attempt as (label, count, accuracy, mean time)."""
+    times = np.where(data["count"] > 0, data["mean_time"], -np.inf)
+    labels = (lambda i: data["labels"][i // len(PAIR_LETTERS)] + data["labels"][i % len(PAIR_LETTERS)]
+              if data["kind"] == "pairs" else data["labels"][i])
+    return [(labels(i), int(data["count"][i]), float(data["accuracy"][i]), float(data["mean_time"][i]))
+            for i in np.argsort(-times, kind="stable")[:n] if data["count"][i] > 0]
+
+
+def _write_html(path: str, title: str, sections: List[dict]):
+    parts = [f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>",
+             "<style>body{font-family:sans-serif;margin:2em}img{max-width:100%}"
+             "table{border-collapse:collapse}td,th{padding:2px 8px;text-align:right}</style></head><body>",
+             f"<h1>{html.escape(title)}</h1><p>Generated {datetime.now():%Y-%m-%d %H:%M}</p>"]
+    for section in sections:
+        data = section["data"]
+        attempts = int(data["count"].sum())
+        accuracy = np.nansum(data["accuracy"] * data["count"]) / max(attempts, 1)
+        parts.append(f"<h2>{html.escape(data['kind'])}</h2><p>{len(data['started'])} sessions, "
+                     f"{attempts} attempts, {accuracy:.1%} correct</p>")
+        for panel, digest in section["panels"]:
+            parts.append(f"<img src='{html.escape(data['kind'])}_{panel}.png?v={digest[:8]}' alt='{panel}'>")
+        parts.append("<table><tr><th>slowest</th><th>n</th><th>accuracy</th><th>mean (s)</th></tr>")
+        for label, count, item_accuracy, mean_time in _summary_rows(data):
+            parts.append(f"<tr><td>{html.escape(label)}</td><td>{count}</td>"
+                         f"<td>{item_accuracy:.0%}</td><td>{mean_time:.2f}</td></tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write("\n".join(parts))
+    os.replace(tmp_path, path)
+
+
+def write_report(cache: ReportCache,
+                 output_dir: str,
+                 title: str = "Training report",
+                 sessions: Optional[Sequence[int]] = None,
+                 force: bool = False,
+                 workers: Optional[int] = None) -> Dict[str, int]:
+    """Write ``index.html`` and the panel PNGs of ``sessions`` (all by default) to ``output_dir``.
+
+    A panel is only re-rendered when the digest of the sessions it shows
+    changed since the last run (kept in ``manifest.json``), or with
+    ``force``. Changed panels are rendered on a process pool.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+
+    sections, jobs = [], []
+    for kind in KINDS:
+        data = panel_data(cache, kind, sessions)
+        if not len(data["started"]):
+            continue
+        digest = _digest(cache, kind, sessions)
+        panels = []
+        for panel in _panels(kind):
+            name = f"{kind}_{panel}"
+            path = os.path.join(output_dir, f"{name}.png")
+            if manifest.get(name) != digest or not os.path.exists(path):
+                jobs.append((name, panel, data, path))
+            manifest[name] = digest
+            panels.append((panel, digest))
+        sections.append({"data": data, "panels": panels})
+
+    # A pool is not worth starting for a single panel
+    for _ in bounded_map(_render_panel, ((panel, data, path) for _, panel, data, path in jobs),
+                         workers if len(jobs) > 1 else 1):
+        pass
+
+    _write_html(os.path.join(output_dir, "index.html"), title, sections)
+    with open(manifest_path, 'w') as file:
+        json.dump(manifest, file, indent=1)
+    return {"panels": sum(len(section["panels"]) for section in sections), "rendered": len(jobs)}
+
+
+def build_reports(store: LogStore,
+                  output_dir: str,
+                  per_user: bool = False,
+                  force: bool = False,
+                  workers: Optional[int] = None) -> Dict[str, Dict[str, int]]:
+    """Sync the aggregate cache of ``store`` and write its report(s).
+
+    The report of every session goes to ``output_dir``; with ``per_user``,
+    each drill server user also gets one in ``output_dir/<user>``.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = ReportCache.load(os.path.join(output_dir, "aggregates.npz"))
+    changed = cache.sync(store)
+    if changed:
+        cache.save()
+
+    results = {"": write_report(cache, output_dir, force=force, workers=workers)}
+    if per_user:
+        users = {}
+        for session in store.sessions:
+            user = session_user(session)
+            if user is not None:
+                users.setdefault(user, []).append(session["id"])
+        for user, ids in sorted(users.items()):
+            results[user] = write_report(cache, os.path.join(output_dir, user), title=f"Training report: {user}",
+                                         sessions=ids, force=force, workers=workers)
+    return results
@@ -0,0 +1,131 @@
+import numpy as np
+from typing import Optional, Sequence
+
+
+class PieceSampler:
+    """Seedable, weighted prompt queue over ``n`` items (24 pieces by default).
+
+    Prompts are drawn ahead of time in blocks of ``block_size`` from a
+    ``numpy.random.Generator``, so ``next()`` is a list pop. The same seed and
+    weights always give the same prompt sequence.
+    """
+
+    def __init__(self,
+                 n: int = 24,
+                 weights: Optional[Sequence[float]] = None,
+                 seed: Optional[int] = None,
+                 block_size: int = 1024,
+                 avoid_repeats: bool = True):
+        self.n = n
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy % 2**32)
+        self.block_size = block_size
+        self.avoid_repeats = avoid_repeats and n > 1
+        self.rng = np.random.default_rng(self.seed)
+        self._last = None
+        self._queue = []
+        self.set_weights(weights)
+
+    def set_weights(self, weights: Optional[Sequence[float]]):
+        """Change the sampling weights; prompts already queued are discarded."""
+        if weights is None:
+            self.p = None
+        else:
+            p = np.asarray(weights, dtype=float)
+            if p.shape != (self.n,) or not np.isfinite(p).all() or (p < 0).any() or p.sum() <= 0:
+                raise ValueError(f"Expected {self.n} non-negative weights with a positive sum")
+            self.p = p / p.sum()
+        self._queue = []
+
+    def _can_avoid_repeats(self) -> bool:
+        # With a single possible item every redraw would repeat it again
+        return self.avoid_repeats and (self.p is None or np.count_nonzero(self.p) >= 2)
+
+    def _draw_except(self, excluded: np.ndarray) -> np.ndarray:
+        """One prompt per entry of ``excluded``, drawn with that item's weight zeroed."""
+        u = self.rng.random(len(excluded))
+        if self.p is None:
+            draws = (u * (self.n - 1)).astype(np.int64)
+            return draws + (draws >= excluded)
+        # Invert the CDF of the weights with the excluded item's mass cut out
+        cdf = np.cumsum(self.p)
+        mass = self.p[excluded]
+        u *= 1 - mass
+        before = u < cdf[excluded] - mass
+        draws = np.where(before, np.searchsorted(cdf, u, side="right"),
+                         np.searchsorted(cdf, u + mass, side="right"))
+        return np.minimum(draws, np.flatnonzero(self.p)[-1])
+
+    def _draw(self, size: int) -> np.ndarray:
+        block = self.rng.choice(self.n, size=size, p=self.p)
+        if self._can_avoid_repeats():
+            # Redraw repeats with the previous prompt excluded. In a run of
+            # repeats only every other one is redrawn, its neighbours staying
+            # the repeated item, so a pass leaves at most one new repeat per run
+            # however skewed the weights are.
+            while True:
+                prev = np.concatenate([[-1 if self._last is None else self._last], block[:-1]])
+                repeats = np.flatnonzero(block == prev)
+                if len(repeats) == 0:
+                    break
+                starts = np.flatnonzero(np.diff(repeats, prepend=-2) > 1)
+                run_start = np.repeat(repeats[starts], np.diff(np.append(starts, len(repeats))))
+                redraw = repeats[(repeats - run_start) % 2 == 0]
+                block[redraw] = self._draw_except(prev[redraw])
+
+        if size:
+            self._last = int(block[-1])
+        return block
+
+    def sample(self, size: int) -> np.ndarray:
+        """The next ``size`` prompts as an array of indices.
+
+        Draws whole blocks, so mixing ``sample`` and ``next`` calls yields the
+        same sequence as calling either one alone.
+        """
+        queued = np.array(self._queue[::-1], dtype=np.int64)
+        missing = size - len(queued)
+        if missing > 0:
+            n_blocks = -(-missing // self.block_size)
+            queued = np.concatenate([queued] + [self._draw(self.block_size) for _ in range(n_blocks)])
+        self._queue = queued[size:][::-1].tolist()
+        return queued[:size]
+
+    def next(self) -> int:
+        if not self._queue:
+            self._queue = self._draw(self.block_size)[::-1].tolist()
+        return self._queue.pop()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        return self.next()
+
+
+def history_weights(attempts: Sequence[int],
+                    errors: Sequence[int],
+                    mean_times: Optional[Sequence[float]] = None,
+                    prior: float = 1.0,
+                    time_exponent: float = 1.0,
+                    floor: float = 0.05) -> np.ndarray:
+    """Sampling weights that favor pieces with high error rates or slow answers.
+
+    Error rates are smoothed with ``prior`` pseudo-attempts (half of them
+    wrong) so unseen pieces still come up; ``floor`` more pseudo-errors
+    nudge pieces with few attempts further up (an unseen piece weighs
+    ``0.5 + floor``). Response times scale the weights relative to the median, raised to
+    ``time_exponent``.
+    """
+    attempts = np.asarray(attempts, dtype=float)
+    errors = np.asarray(errors, dtype=float)
+    weights = (errors + prior / 2 + floor) / (attempts + prior)
+
+    if mean_times is not None:
+        times = np.asarray(mean_times, dtype=float)
+        seen = np.isfinite(times) & (times > 0)
+        if seen.any():
+            median = np.median(times[seen])
+            times = np.where(seen, times, median)
+            weights = weights * (times / median) ** time_exponent
+
+    return weights
@@ -0,0 +1,414 @@
+import io
+import os
+import re
+import json
+import math
+import time
+import uuid
+import asyncio
+import functools
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from sctools import paths
+from sctools.bld import (BLD_CFG, MEMO_LETTERS, SPEFFZ, Scheme, Trainer, PieceAtlas,
+                         decode_piece, encode_piece, encode_letters, get_scheme)
+from sctools.matching import AnswerIndex, load_aliases
+from sctools.pair_drills import count_answer, group_word_pairs
+from sctools.pairs import encode_pair
+from sctools.srs import Scheduler, all_keys, pair_key, piece_key, quality
+
+CLIENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "drill.html")
+
+USER_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+MAX_BODY = 1 << 16
+
+# Client-reported times outside this range (seconds) fall back to the server's
+MAX_CLIENT_TIME = 600.0
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or _REASONS[status])
+        self.status = status
+
+
+def encode_atlas_png(atlas: PieceAtlas) -> Dict[str, list]:
+    """PNG bytes of every atlas image, so prompts never render or encode."""
+    from matplotlib.image import imsave
+
+    pngs = {}
+    for ptype, images in atlas.images.items():
+        pngs[ptype] = []
+        for image in images:
+            buffer = io.BytesIO()
+            imsave(buffer, image, format="png")
+            pngs[ptype].append(buffer.getvalue())
+    return pngs
+
+
+def _render_pngs(scheme: Scheme) -> Dict[str, list]:
+    return encode_atlas_png(PieceAtlas.build(Trainer(renderer="raster", scheme=scheme)))
+
+
+def _load_scheduler(user: str) -> Scheduler:
+    path = paths.user_srs_state_path(user)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return Scheduler(path, keys=all_keys())
+
+
+def _client_time(value, fallback: float) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return fallback
+    return value if math.isfinite(value) and 0 <= value <= MAX_CLIENT_TIME else fallback
+
+
+class DrillSession:
+    """One driller's in-memory session: a due-ordered queue and the open prompt."""
+
+    def __init__(self, session_id: str, user: str, kind: str, queue, trainer: Trainer,
+                 word_pairs: Optional[dict], n_master: int, log_session: Optional[int]):
+        self.id = session_id
+        self.user = user
+        self.kind = kind
+        self.queue = queue
+        self.trainer = trainer
+        self.word_pairs = word_pairs
+        self.n_master = n_master
+        self.log_session = log_session
+        self.prompt = None
+        self.prompt_sent = None   # perf_counter_ns when the prompt went out
+        self.prompts = 0
+        self.stats = {"correct": 0, "incorrect": 0}
+        self.last_seen = time.monotonic()
+
+
+class DrillServer:
+    """Drill sessions for many users over HTTP, served by one asyncio loop.
+
+    Piece images are PNG-encoded once from the atlas cache, per color
+    scheme (other schemes than the atlas' are drawn with the raster renderer).
+    Every user has their own scheduler state; all sessions log through one
+    shared LogWriter. Scheduler files and new store sessions are read and
+    written on one I/O thread, off the event loop and in request order.
+    """
+
+    def __init__(self, atlas: PieceAtlas, groups: Optional[dict] = None, log: bool = True,
+                 store_path: Optional[str] = None, n_master: int = 3, session_ttl: float = 3600.0,
+                 answers: Optional[AnswerIndex] = None):
+        self.pngs = {PieceAtlas.cache_key(scheme=atlas.scheme): encode_atlas_png(atlas)}
+        self._rendering: Dict[str, asyncio.Future] = {}
+        self.groups = groups or {}
+        self.answers = answers or AnswerIndex.from_groups(self.groups).prepare()
+        self.n_master = n_master
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, DrillSession] = {}
+        self.schedulers: Dict[str, Scheduler] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._io = ThreadPoolExecutor(max_workers=1)
+        with open(CLIENT_PATH, 'rb') as file:
+            self.client = file.read()
+
+        self.store = self.index = self.writer = None
+        if log:
+            from sctools.analytics import AnalyticsIndex
+            from sctools.logstore import LogStore
+            from sctools.logwriter import LogWriter
+
+            self.store = LogStore(store_path or paths.store_dir())
+            self.index = AnalyticsIndex.for_store(self.store)
+            self.index.sync(self.store)
+            self.writer = LogWriter(self.store, on_flush=lambda records: self.index.sync(self.store))
+
+    async def scheme_pngs(self, scheme: Scheme) -> Dict[str, list]:
+        """Atlas PNGs of ``scheme``, rendered off the event loop the first time it is asked for."""
+        key = PieceAtlas.cache_key(scheme=scheme)
+        if key not in self.pngs:
+            if key not in self._rendering:
+                # Concurrent requests for the same scheme wait on one render
+                loop = asyncio.get_running_loop()
+                self._rendering[key] = loop.run_in_executor(None, _render_pngs, scheme)
+            try:
+                self.pngs[key] = await self._rendering[key]
+            finally:
+                self._rendering.pop(key, None)
+        return self.pngs[key]
+
+    # Sessions
+
+    async def _run_io(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io, functools.partial(func, *args, **kwargs))
+
+    async def scheduler(self, user: str) -> Scheduler:
+        """``user``'s scheduler, loaded off the event loop the first time it is asked for."""
+        if user not in self.schedulers:
+            if user not in self._loading:
+                # Concurrent sessions of a new user wait on one load
+                self._loading[user] = asyncio.ensure_future(self._run_io(_load_scheduler, user))
+            try:
+                self.schedulers[user] = await self._loading[user]
+            finally:
+                self._loading.pop(user, None)
+        return self.schedulers[user]
+
+    async def create_session(self, body: dict) -> dict:
+        user = str(body.get("user", ""))
+        kind = body.get("kind")
+        if not USER_PATTERN.match(user):
+            raise HTTPError(400, "user must be 1-32 letters, digits, '-' or '_'")
+
+        try:
+            top, front = body.get("orientation") or (None, None)
+            scheme = get_scheme(colors=BLD_CFG["start"], top=top, front=front,
+                                letters=str(body.get("letters") or SPEFFZ))
+        except (TypeError, ValueError) as e:
+            raise HTTPError(400, f"invalid scheme: {e}")
+
+        scheduler = await self.scheduler(user)
+        word_pairs = None
+        if kind in ("edge", "corner"):
+            keys = [piece_key(kind, i) for i in range(len(MEMO_LETTERS))]
+        elif kind == "pairs":
+            selected = [g for g in body.get("groups", []) if g in self.groups]
+            if not selected:
+                raise HTTPError(400, f"no valid groups; available: {' '.join(sorted(self.groups))}")
+            word_pairs = group_word_pairs(self.groups, selected)
+            keys = [pair_key(pair) for pair in word_pairs]
+        else:
+            raise HTTPError(400, "kind must be 'edge', 'corner' or 'pairs'")
+
+        log_session = None
+        if self.store is not None:
+            log_session = await self._run_io(self.store.new_session, kind, source=f"server:{user}")
+        session = DrillSession(uuid.uuid4().hex, user, kind, scheduler.session(keys),
+                               Trainer(scheme=scheme), word_pairs, self.n_master, log_session)
+        self.sessions[session.id] = session
+        return {"session": session.id, "items": len(keys)}
+
+    def get_session(self, session_id: str) -> DrillSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise HTTPError(404, "unknown session")
+        session.last_seen = time.monotonic()
+        return session
+
+    def next_prompt(self, session: DrillSession) -> dict:
+        key = session.queue.next()
+        if key is None:
+            return {"done": True, "stats": session.stats}
+
+        session.prompt = key
+        session.prompt_sent = time.perf_counter_ns()
+        session.prompts += 1
+        item = key.split(":")[1]
+        if session.kind == "pairs":
+            return {"done": False, "kind": "pairs", "pair": item}
+        # A per-prompt URL, so the image name does not give the answer away
+        return {"done": False, "kind": session.kind,
+                "image": f"/api/sessions/{session.id}/image?n={session.prompts}"}
+
+    async def prompt_image(self, session: DrillSession) -> bytes:
+        if session.prompt is None or session.kind == "pairs":
+            raise HTTPError(404, "no open image prompt")
+        # Read before awaiting: the prompt may be answered while the atlas renders
+        item = encode_letters(session.prompt.split(":")[1])
+        pngs = await self.scheme_pngs(session.trainer.scheme)
+        return pngs[session.kind][item]
+
+    def answer(self, session: DrillSession, body: dict) -> dict:
+        if session.prompt is None:
+            raise HTTPError(400, "no open prompt")
+        received = time.perf_counter_ns()
+        key, session.prompt = session.prompt, None
+        item = key.split(":")[1]
+        answer = str(body.get("answer", "")).strip()
+
+        server_time = (received - session.prompt_sent) / 1e9
+        response_time = _client_time(body.get("response_time"), server_time)
+        render_time = _client_time(body.get("render_time"), float("nan"))
+        reaction_time = _client_time(body.get("reaction_time"), float("nan"))
+
+        if session.kind == "pairs":
+            reference = session.word_pairs[item]["image"]
+            is_correct = self.answers.match(item, answer)
+            log_item = encode_pair(item)
+        else:
+            scheme = session.trainer.scheme
+            piece = decode_piece(encode_letters(item), ptype=session.kind, scheme=scheme)
+            reference = session.trainer.get_piece_memo_letter(piece, ptype=session.kind)
+            is_correct = bool(session.trainer.check_piece_memo_letter(piece, answer.lower(), ptype=session.kind))
+            log_item = encode_piece(piece, session.kind, scheme)
+
+        session.queue.review(key, quality(is_correct, response_time))
+        session.stats["correct" if is_correct else "incorrect"] += 1
+
+        mastered = False
+        if session.word_pairs is not None and count_answer(session.word_pairs, item, is_correct, session.n_master):
+            session.queue.retire(key)
+            mastered = True
+
+        if self.writer is not None:
+            from sctools.logstore import make_records
+
+            records = make_records(session.log_session, session.kind, [datetime.now()], [log_item],
+                                   [answer], [is_correct], [response_time], [render_time], [reaction_time],
+                                   session.trainer.scheme)
+            self.writer.write(records, texts=[answer])
+
+        return {"correct": is_correct, "reference": reference,
+                "response_time": response_time, "mastered": mastered}
+
+    async def close_session(self, session_id: str) -> dict:
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise HTTPError(404, "unknown session")
+        # Snapshot on the loop, which is the only thread grading cards
+        scheduler = self.schedulers[session.user]
+        await self._run_io(scheduler.save, state=scheduler.state())
+        return {"stats": session.stats}
+
+    async def expire_sessions(self):
+        cutoff = time.monotonic() - self.session_ttl
+        for session_id in [s.id for s in self.sessions.values() if s.last_seen < cutoff]:
+            if session_id in self.sessions:
+                await self.close_session(session_id)
+
+    def close(self):
+        self._io.shutdown()
+        for scheduler in self.schedulers.values():
+            scheduler.save()
+        if self.writer is not None:
+            self.writer.close()
+            self.index.sync(self.store)
+            self.index.save()
+
+    # HTTP
+
+    async def route(self, method: str, path: str, body: dict):
+        """A JSON-able result, or (content type, bytes) for a request."""
+        parts = [p for p in path.split("/") if p]
+        if method == "GET" and not parts:
+            return "text/html; charset=utf-8", self.client
+        if parts[:2] == ["api", "sessions"]:
+            if method == "POST" and len(parts) == 2:
+                return await self.create_session(body)
+            if len(parts) >= 3:
+                session = self.get_session(parts[2])
+                if method == "GET" and parts[3:] == ["next"]:
+                    return self.next_prompt(session)
+                if method == "GET" and parts[3:] == ["image"]:
+                    return "image/png", await self.prompt_image(session)
+                if method == "POST" and parts[3:] == ["answer"]:
+                    return self.answer(session, body)
+                if method == "DELETE" and len(parts) == 3:
+                    return await self.close_session(session.id)
+        raise HTTPError(404)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                except ValueError:
+                    return
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, content_type, payload = 200, "application/json", b""
+                try:
+                    try:
+                        length = int(headers.get("content-length", 0))
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        # Where this body ends is unknown, so the connection cannot be reused
+                        keep_alive = False
+                        raise HTTPError(400, "invalid Content-Length")
+                    if length > MAX_BODY:
+                        raise HTTPError(413)
+                    raw = await reader.readexactly(length) if length else b""
+                    try:
+                        body = json.loads(raw) if raw else {}
+                    except ValueError:
+                        body = None
+                    if not isinstance(body, dict):
+                        raise HTTPError(400, "body must be a JSON object")
+                    result = await self.route(method, urlsplit(target).path, body)
+                    if isinstance(result, tuple):
+                        content_type, payload = result
+                    else:
+                        payload = json.dumps(result).encode()
+                except HTTPError as e:
+                    status, payload = e.status, json.dumps({"error": str(e)}).encode()
+                except Exception:
+                    traceback.print_exc()
+                    status, payload = 500, json.dumps({"error": _REASONS[500]}).encode()
+
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Cache-Control: no-store\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(60)
+            await self.expire_sessions()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        expire = asyncio.create_task(self._expire_loop())
+        print(f"Drill server on http://{host}:{port}/")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expire.cancel()
+
+
+def main(args):
+    groups = None
+    if args.excel:
+        from sctools.pairs import load_groups
+
+        groups = load_groups(args.excel, paths.cache_dir())
+    aliases = load_aliases(args.aliases) if args.aliases else None
+    answers = AnswerIndex.from_groups(groups or {}, aliases=aliases, policy=args.match).prepare()
+
+    server = DrillServer(PieceAtlas.load(paths.cache_dir()), groups=groups, log=not args.no_log,
+                         n_master=args.n_master, answers=answers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        server.close()
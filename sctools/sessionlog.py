@@ -0,0 +1,70 @@
+import importlib
+import threading
+from datetime import datetime
+
+from sctools import paths
+
+
+class SessionLog:
+    """Log store session and analytics index for one drill, opened on first use.
+
+    The NumPy-backed store modules are imported on a background thread as
+    soon as the log is created, so they stay off the startup path. Attempts
+    are written by a LogWriter, so disk I/O stays off the prompt path too.
+    """
+
+    def __init__(self, kind: str, path: str = None):
+        self.kind = kind
+        self.path = path or paths.store_dir()
+        self.store = None
+        self.session = None
+        self.index = None
+        self.writer = None
+        self._preload = threading.Thread(target=self._import_modules, daemon=True)
+        self._preload.start()
+
+    @staticmethod
+    def _import_modules():
+        importlib.import_module("sctools.logstore")
+        importlib.import_module("sctools.analytics")
+        importlib.import_module("sctools.logwriter")
+
+    def open(self):
+        if self.store is not None:
+            return
+        self._preload.join()
+        from sctools.analytics import AnalyticsIndex
+        from sctools.logstore import LogStore
+        from sctools.logwriter import LogWriter
+
+        self.store = LogStore(self.path)
+        self.session = self.store.new_session(self.kind)
+        self.index = AnalyticsIndex.for_store(self.store)
+        self.index.sync(self.store)
+        # The index folds in attempts once they are in the store, other processes' too
+        self.writer = LogWriter(self.store, on_flush=lambda records: self.index.sync(self.store))
+
+    def __enter__(self) -> "SessionLog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record(self, item: int, answer: str, correct: bool, response_time: float,
+               timestamp: datetime = None, render_time: float = float("nan"),
+               reaction_time: float = float("nan"), scheme=None):
+        """Queue one attempt; ``answer`` is in the letters of ``scheme`` (Speffz by default)."""
+        self.open()
+        from sctools.logstore import make_records
+
+        records = make_records(self.session, self.kind, [timestamp or datetime.now()], [item],
+                               [answer], [correct], [response_time], [render_time], [reaction_time], scheme)
+        self.writer.write(records, texts=[answer])
+
+    def close(self):
+        """Flush pending attempts, bring the index up to date with the store and save it."""
+        if self.writer is not None:
+            self.writer.close()
+        if self.index is not None:
+            self.index.sync(self.store)
+            self.index.save()
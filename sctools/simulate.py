@@ -0,0 +1,344 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from sctools.logstore import KINDS, LogStore
+from sctools.pair_drills import count_answer
+from sctools.parallel import bounded_map
+from sctools.sampler import PieceSampler, history_weights
+from sctools.srs import Scheduler, quality
+
+# Fewest attempts (of one kind) a model is fitted from
+MIN_ATTEMPTS = 50
+
+# Least accuracy gain from practice (p_max - p0) that counts as learning
+MIN_LEARNING = 0.01
+
+# Parameters of each behaviour LearnerModel.degenerate reports
+DEGENERATE_PARAMS = {
+    "memory": ("memory",),
+    "item_sigma": ("item_sigma",),
+    "learning": ("p0", "p_max", "rate"),
+}
+
+# One row per simulated session
+SESSION_DTYPE = np.dtype([
+    ("prompts", "<u4"),
+    ("seconds", "<f8"),     # answering time plus the per-prompt overhead
+    ("mastered", "<u2"),    # items mastered before the prompt limit
+    ("correct", "<u4"),
+])
+
+
+class LearnerModel:
+    """Parametric learner: accuracy and response time as a function of practice.
+
+    After ``n`` earlier attempts at an item, the learned accuracy is
+    ``p_max - (p_max - p0) * exp(-n / rate)``. It decays back towards ``p0``
+    as ``exp(-gap / (memory * (1 + n)))`` with the seconds since the item was
+    last seen, so practice also makes memories last longer. Answers take a
+    log-normal time with median ``t0 * (1 + n) ** -t_exponent``. Each item
+    gets a difficulty drawn from N(0, item_sigma) that scales its times by
+    ``exp(difficulty)`` and slows its learning by the same factor.
+    """
+
+    __slots__ = ("p0", "p_max", "rate", "memory", "t0", "t_exponent", "t_sigma", "item_sigma")
+
+    def __init__(self, p0=0.6, p_max=0.97, rate=3.0, memory=300.0, t0=4.0, t_exponent=0.3,
+                 t_sigma=0.4, item_sigma=0.3):
+        self.p0 = p0
+        self.p_max = p_max
+        self.rate = rate
+        self.memory = memory
+        self.t0 = t0
+        self.t_exponent = t_exponent
+        self.t_sigma = t_sigma
+        self.item_sigma = item_sigma
+
+    def __repr__(self) -> str:
+        params = ", ".join(f"{name}={getattr(self, name):.3g}" for name in self.__slots__)
+        return f"LearnerModel({params})"
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def accuracy(self, n: int, difficulty: float = 0.0, gap: float = 0.0) -> float:
+        learned = self.p_max - (self.p_max - self.p0) * math.exp(-n * math.exp(-difficulty) / self.rate)
+        return self.p0 + (learned - self.p0) * math.exp(-gap / (self.memory * (1 + n)))
+
+    def median_time(self, n: int, difficulty: float = 0.0) -> float:
+        return self.t0 * (1 + n) ** -self.t_exponent * math.exp(difficulty)
+
+    def degenerate(self) -> List[str]:
+        """Fitted behaviours the strategies cannot be told apart by, if any.
+
+        Without forgetting (infinite ``memory``), differences between items
+        (``item_sigma`` of 0) or learning (``p_max`` at ``p0``), when an item
+        comes up next matters little, so every strategy masters the items in
+        about as many prompts. Logs that do not show a behaviour fit it this way.
+        """
+        return [name for name, missing in (("memory", not math.isfinite(self.memory)),
+                                           ("item_sigma", self.item_sigma <= 0),
+                                           ("learning", self.p_max - self.p0 < MIN_LEARNING))
+                if missing]
+
+    def with_prior(self, prior: Optional["LearnerModel"] = None) -> "LearnerModel":
+        """A copy with the ``degenerate`` behaviours taken from ``prior`` (default: the defaults)."""
+        prior = prior or LearnerModel()
+        model = LearnerModel(*self.__getstate__())
+        for behaviour in self.degenerate():
+            for name in DEGENERATE_PARAMS[behaviour]:
+                setattr(model, name, getattr(prior, name))
+        return model
+
+    @classmethod
+    def fit(cls, records: np.ndarray, kind: Optional[str] = None) -> "LearnerModel":
+        """Fit the model to log store records (of ``kind``, if given).
+
+        The practice count of an attempt is the number of earlier attempts at
+        the same item, its gap the time since the last one. Accuracy is
+        linear in (p_max, p0) for a given learning rate and memory, so it is
+        fitted by least squares over a grid of both; times by a log-log
+        regression on correct answers.
+        """
+        if kind is not None:
+            records = records[records["kind"] == KINDS.index(kind)]
+        if len(records) < MIN_ATTEMPTS:
+            raise ValueError(f"Need at least {MIN_ATTEMPTS} attempts to fit a learner model, got {len(records)}")
+
+        order = np.lexsort((records["timestamp"], records["kind"], records["item"]))
+        items = records["kind"][order].astype(np.int64) * 65536 + records["item"][order]
+        _, starts, item_ids = np.unique(items, return_index=True, return_inverse=True)
+        n = np.arange(len(items)) - starts[item_ids]
+        correct = records["correct"][order].astype(np.float64)
+        times = records["response_time"][order].astype(np.float64)
+        gaps = np.diff(records["timestamp"][order], prepend=0) / 1000.0
+        gaps[starts] = 0.0
+
+        # accuracy = p_max * (1 - f) + p0 * f with f = 1 - retention * (1 - exp(-n / rate))
+        best = None
+        for memory in np.append(np.geomspace(10.0, 1e6, 21), np.inf):
+            retention = np.exp(-gaps / (memory * (1 + n)))
+            for rate in np.geomspace(0.3, 300.0, 40):
+                f = 1 - retention * (1 - np.exp(-n / rate))
+                X = np.stack([1 - f, f], axis=1)
+                (a, b), *_ = np.linalg.lstsq(X, correct, rcond=None)
+                sse = float(np.sum((X @ (a, b) - correct) ** 2))
+                if best is None or sse < best[0]:
+                    best = (sse, rate, memory, a, b)
+        _, rate, memory, p_max, p0 = best
+        p_max = float(np.clip(p_max, 0.01, 0.999))
+        p0 = float(np.clip(p0, 0.01, p_max))
+
+        fast = (correct > 0) & np.isfinite(times) & (times > 0)
+        if fast.sum() < 2:
+            raise ValueError("Need correct answers with response times to fit a learner model")
+        x, y = np.log1p(n[fast]), np.log(times[fast])
+        slope, intercept = np.polyfit(x, y, 1) if np.ptp(x) > 0 else (0.0, y.mean())
+        residual = y - (intercept + slope * x)
+
+        # Noise is the spread around each item's mean residual; the spread of
+        # those means, less what the noise explains, is the item difficulty
+        counts = np.bincount(item_ids[fast])
+        means = np.bincount(item_ids[fast], weights=residual) / np.maximum(counts, 1)
+        t_sigma = float((residual - means[item_ids[fast]]).std())
+        enough = counts >= 5
+        item_sigma = 0.0
+        if enough.sum() >= 2:
+            spread = means[enough].var() - t_sigma ** 2 / counts[enough].mean()
+            item_sigma = float(np.sqrt(max(spread, 0.0)))
+
+        return cls(p0=p0, p_max=p_max, rate=float(rate), memory=float(memory), t0=float(np.exp(intercept)),
+                   t_exponent=float(max(-slope, 0.0)), t_sigma=t_sigma, item_sigma=item_sigma)
+
+    @classmethod
+    def from_store(cls, store: LogStore, kind: Optional[str] = None) -> "LearnerModel":
+        return cls.fit(store.read(), kind)
+
+
+class Strategy:
+    """Picks the next item of a simulated session and hears about every answer."""
+
+    name = None
+
+    def __init__(self, n_items: int, rng: np.random.Generator):
+        self.n_items = n_items
+
+    def next(self, now: float) -> int:
+        raise NotImplementedError
+
+    def review(self, item: int, correct: bool, response_time: float, now: float):
+        pass
+
+    def retire(self, item: int):
+        pass
+
+
+class SRSStrategy(Strategy):
+    """The pairs drill: a scheduler session queue, graded with ``quality``."""
+
+    name = "srs"
+
+    def __init__(self, n_items: int, rng: np.random.Generator):
+        super().__init__(n_items, rng)
+        self.queue = Scheduler().session(range(n_items))
+
+    def next(self, now: float) -> int:
+        return self.queue.next()
+
+    def review(self, item: int, correct: bool, response_time: float, now: float):
+        self.queue.review(item, quality(correct, response_time), now)
+
+    def retire(self, item: int):
+        self.queue.retire(item)
+
+
+class RandomStrategy(Strategy):
+    """Uniform prompts over the items not mastered yet, no immediate repeats."""
+
+    name = "random"
+    # Retiring an item redraws the queued block
+    block_size = 16
+
+    def __init__(self, n_items: int, rng: np.random.Generator):
+        super().__init__(n_items, rng)
+        self.active = np.ones(n_items)
+        self.sampler = PieceSampler(n_items, seed=int(rng.integers(2 ** 32)), block_size=self.block_size)
+
+    def next(self, now: float) -> int:
+        return self.sampler.next()
+
+    def weights(self) -> np.ndarray:
+        return self.active
+
+    def retire(self, item: int):
+        self.active[item] = 0
+        remaining = int(self.active.sum())
+        if remaining:
+            # A single item left has to repeat
+            self.sampler.avoid_repeats = remaining > 1
+            self.sampler.set_weights(self.weights())
+
+
+class WeightedStrategy(RandomStrategy):
+    """Trainer-style weighted sampling, reweighted by ``history_weights`` after every answer."""
+
+    name = "weighted"
+
+    def __init__(self, n_items: int, rng: np.random.Generator):
+        super().__init__(n_items, rng)
+        self.attempts = np.zeros(n_items)
+        self.errors = np.zeros(n_items)
+        self.time_sum = np.zeros(n_items)
+
+    def weights(self) -> np.ndarray:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_times = self.time_sum / self.attempts
+        return history_weights(self.attempts, self.errors, mean_times) * self.active
+
+    def review(self, item: int, correct: bool, response_time: float, now: float):
+        self.attempts[item] += 1
+        self.errors[item] += not correct
+        self.time_sum[item] += response_time
+        self.sampler.set_weights(self.weights())
+
+
+STRATEGIES = {cls.name: cls for cls in (SRSStrategy, RandomStrategy, WeightedStrategy)}
+
+
+def simulate_session(model: LearnerModel,
+                     strategy: str = "srs",
+                     n_items: int = 24,
+                     n_master: int = 3,
+                     seed=None,
+                     max_prompts: Optional[int] = None,
+                     overhead: float = 1.0) -> tuple:
+    """Drill ``n_items`` new items until all are mastered (or ``max_prompts``).
+
+    Mastery follows the pairs drill: ``n_master`` correct answers in a row.
+    ``overhead`` seconds per prompt cover reading the feedback. Returns
+    (prompts, seconds, mastered, correct).
+    """
+    rng = np.random.default_rng(seed)
+    max_prompts = max_prompts or 200 * n_items
+    difficulty = (rng.standard_normal(n_items) * model.item_sigma).tolist()
+    # Random numbers for every prompt up front, as Python floats
+    uniform = rng.random(max_prompts).tolist()
+    noise = (rng.standard_normal(max_prompts) * model.t_sigma).tolist()
+    picker = STRATEGIES[strategy](n_items, rng)
+
+    counters = {item: {'counter': 0} for item in range(n_items)}
+    exposures = [0] * n_items
+    last_seen = [0.0] * n_items
+    clock = 0.0
+    correct = mastered = prompts = 0
+    while prompts < max_prompts and mastered < n_items:
+        item = picker.next(clock)
+        n, d = exposures[item], difficulty[item]
+        is_correct = uniform[prompts] < model.accuracy(n, d, clock - last_seen[item])
+        response_time = model.median_time(n, d) * math.exp(noise[prompts])
+        exposures[item] += 1
+        prompts += 1
+        correct += is_correct
+        clock += response_time + overhead
+        last_seen[item] = clock
+        picker.review(item, is_correct, response_time, clock)
+        if count_answer(counters, item, is_correct, n_master):
+            picker.retire(item)
+            mastered += 1
+    return prompts, clock, mastered, correct
+
+
+def _simulate_chunk(model: LearnerModel, seed: int, start: int, count: int, options: dict) -> np.ndarray:
+    results = np.zeros(count, dtype=SESSION_DTYPE)
+    for i in range(count):
+        # Seeded by session number, so results do not depend on the chunking
+        results[i] = simulate_session(model, seed=(seed, start + i), **options)
+    return results
+
+
+def simulate(model: LearnerModel,
+             n_sessions: int = 1000,
+             strategy: str = "srs",
+             n_items: int = 24,
+             n_master: int = 3,
+             seed: int = 0,
+             max_prompts: Optional[int] = None,
+             overhead: float = 1.0,
+             workers: Optional[int] = None,
+             chunk_size: int = 100) -> np.ndarray:
+    """Run ``n_sessions`` independent sessions on a process pool (``SESSION_DTYPE`` rows).
+
+    ``workers=1`` runs them in this process.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+    options = dict(strategy=strategy, n_items=n_items, n_master=n_master,
+                   max_prompts=max_prompts, overhead=overhead)
+    jobs = ((model, seed, start, min(chunk_size, n_sessions - start), options)
+            for start in range(0, n_sessions, chunk_size))
+    chunks = list(bounded_map(_simulate_chunk, jobs, workers))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=SESSION_DTYPE)
+
+
+def summarize(results: np.ndarray, n_items: int) -> Dict[str, float]:
+    """Time-to-mastery statistics over the sessions that mastered every item."""
+    done = results[results["mastered"] == n_items]
+    summary = dict(
+        sessions=len(results),
+        completed=len(done) / len(results) if len(results) else float("nan"),
+        accuracy=float(results["correct"].sum() / max(results["prompts"].sum(), 1)),
+    )
+    for name, values in (("prompts", done["prompts"]), ("minutes", done["seconds"] / 60)):
+        if len(values):
+            p50, p90 = np.percentile(values, [50, 90])
+            summary.update({f"{name}_mean": float(values.mean()), f"{name}_p50": float(p50),
+                            f"{name}_p90": float(p90)})
+        else:
+            summary.update({f"{name}_{stat}": float("nan") for stat in ("mean", "p50", "p90")})
+    return summary
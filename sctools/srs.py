@@ -0,0 +1,172 @@
+import os
+import json
+import heapq
+import time
+import string
+from typing import Dict, Iterable, List, Optional
+
+
+# Speffz letters; kept as a string so the pairs drill does not import NumPy
+LETTERS = string.ascii_uppercase[:24]
+
+DAY = 86400.0
+
+# Seconds before a missed item comes back within the same session
+RELEARN_DELAY = 60.0
+
+
+def pair_key(pair: str) -> str:
+    return f"pairs:{pair.upper()}"
+
+
+def piece_key(ptype: str, idx: int) -> str:
+    return f"{ptype}:{LETTERS[idx]}"
+
+
+def all_keys() -> List[str]:
+    """Every letter pair of two different Speffz letters, plus every edge and corner."""
+    keys = [pair_key(a + b) for a in LETTERS for b in LETTERS if a != b]
+    keys += [piece_key(ptype, i) for ptype in ("edge", "corner") for i in range(len(LETTERS))]
+    return keys
+
+
+class Card:
+    __slots__ = ("ease", "interval", "reps", "lapses", "due", "last")
+
+    def __init__(self, ease=2.5, interval=0.0, reps=0, lapses=0, due=0.0, last=0.0):
+        self.ease = ease
+        self.interval = interval   # days
+        self.reps = reps
+        self.lapses = lapses
+        self.due = due             # epoch seconds
+        self.last = last
+
+    def to_list(self) -> list:
+        return [self.ease, self.interval, self.reps, self.lapses, self.due, self.last]
+
+
+def quality(correct: bool, response_time: float, fast: float = 2.0, slow: float = 5.0) -> int:
+    """SM-2 grade (0-5) from correctness and how long the answer took."""
+    if not correct:
+        return 1
+    if response_time <= fast:
+        return 5
+    if response_time <= slow:
+        return 4
+    return 3
+
+
+class Scheduler:
+    """SM-2 spaced repetition over drill items, ordered by a due-time heap.
+
+    The heap holds (due, key) entries; updated cards push a new entry and stale
+    ones are skipped when popped, so both picking and grading are O(log n).
+    The heap is rebuilt once stale entries outnumber the cards, as they do
+    when only session queues are popped.
+    """
+
+    def __init__(self, path: Optional[str] = None, keys: Iterable[str] = ()):
+        self.path = path
+        self.cards: Dict[str, Card] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r') as file:
+                self.cards = {k: Card(*v) for k, v in json.load(file)["cards"].items()}
+        for key in keys:
+            self.cards.setdefault(key, Card())
+        self._heap = [(card.due, key) for key, card in self.cards.items()]
+        heapq.heapify(self._heap)
+
+    def state(self) -> dict:
+        """The JSON document ``save`` writes, a snapshot of every card."""
+        return {"cards": {k: c.to_list() for k, c in self.cards.items()}}
+
+    def save(self, path: Optional[str] = None, state: Optional[dict] = None):
+        """Write ``state`` (default: the current one) to ``path`` (default: where it was loaded from)."""
+        path = path or self.path
+        # A fresh home has no logs directory yet
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(state or self.state(), file)
+        os.replace(tmp_path, path)
+
+    def _push(self, key: str):
+        heapq.heappush(self._heap, (self.cards[key].due, key))
+        if len(self._heap) > 2 * len(self.cards):
+            self._heap = [(card.due, k) for k, card in self.cards.items()]
+            heapq.heapify(self._heap)
+
+    def peek(self) -> Optional[str]:
+        """The item due first, dropping stale heap entries on the way."""
+        while self._heap:
+            due, key = self._heap[0]
+            if self.cards[key].due == due:
+                return key
+            heapq.heappop(self._heap)
+        return None
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        return sum(card.due <= now for card in self.cards.values())
+
+    def review(self, key: str, grade: int, now: Optional[float] = None) -> Card:
+        now = time.time() if now is None else now
+        card = self.cards.setdefault(key, Card())
+
+        if grade < 3:
+            card.reps = 0
+            card.lapses += 1
+            card.interval = 0.0
+            card.due = now + RELEARN_DELAY
+        else:
+            card.reps += 1
+            if card.reps == 1:
+                card.interval = 1.0
+            elif card.reps == 2:
+                card.interval = 6.0
+            else:
+                card.interval = card.interval * card.ease
+            card.due = now + card.interval * DAY
+
+        card.ease = max(1.3, card.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+        card.last = now
+        self._push(key)
+        return card
+
+    def session(self, keys: Iterable[str]) -> "SessionQueue":
+        return SessionQueue(self, keys)
+
+
+class SessionQueue:
+    """Due-ordered queue over a subset of the scheduler's items (e.g. selected groups)."""
+
+    def __init__(self, scheduler: Scheduler, keys: Iterable[str]):
+        self.scheduler = scheduler
+        self.keys = set(keys)
+        for key in self.keys:
+            scheduler.cards.setdefault(key, Card())
+        self._heap = [(scheduler.cards[key].due, key) for key in self.keys]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def next(self) -> Optional[str]:
+        """The active item due first (possibly ahead of schedule)."""
+        cards = self.scheduler.cards
+        while self._heap:
+            due, key = self._heap[0]
+            if key in self.keys and cards[key].due == due:
+                return key
+            heapq.heappop(self._heap)
+        return None
+
+    def review(self, key: str, grade: int, now: Optional[float] = None) -> Card:
+        card = self.scheduler.review(key, grade, now)
+        if key in self.keys:
+            heapq.heappush(self._heap, (card.due, key))
+        return card
+
+    def retire(self, key: str):
+        """Drop an item from this session; its heap entry is skipped lazily."""
+        self.keys.discard(key)
@@ -0,0 +1,177 @@
+import os
+import re
+import sys
+import time
+from typing import Optional, Tuple
+
+
+QUIT_KEYS = ("\x1b", "\x04")   # Esc, Ctrl-D
+
+# Arrow, function and other special keys: CSI ("Esc [") and SS3 ("Esc O") sequences
+ESCAPE_SEQUENCE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|O.)")
+
+# Seconds to wait for the rest of a sequence after an Esc ending a read
+ESCAPE_TIMEOUT = 0.05
+
+# Prefixes msvcrt.getwch returns ahead of the scan code of a special key
+_WINDOWS_SPECIAL_KEYS = ("\x00", "\xe0")
+
+
+class PromptTimer:
+    """Monotonic ``perf_counter_ns`` timestamps of one prompt.
+
+    ``render_start`` is taken before the prompt is drawn, ``display_complete``
+    once it is on screen, then ``first_key`` and ``submit`` while answering.
+    Durations are reported in seconds, measured from ``display_complete``.
+    """
+
+    __slots__ = ("render_start", "display_complete", "first_key", "submit")
+
+    def __init__(self):
+        self.render_start = None
+        self.display_complete = None
+        self.first_key = None
+        self.submit = None
+
+    def start_render(self):
+        self.render_start = time.perf_counter_ns()
+
+    def displayed(self):
+        self.display_complete = time.perf_counter_ns()
+        if self.render_start is None:
+            self.render_start = self.display_complete
+
+    def key(self):
+        if self.first_key is None:
+            self.first_key = time.perf_counter_ns()
+
+    def submitted(self):
+        self.submit = time.perf_counter_ns()
+        if self.first_key is None:
+            self.first_key = self.submit
+
+    @staticmethod
+    def _seconds(start: Optional[int], end: Optional[int]) -> float:
+        if start is None or end is None:
+            return float("nan")
+        return (end - start) / 1e9
+
+    @property
+    def render_latency(self) -> float:
+        return self._seconds(self.render_start, self.display_complete)
+
+    @property
+    def reaction_time(self) -> float:
+        """Display to first keystroke."""
+        return self._seconds(self.display_complete, self.first_key)
+
+    @property
+    def response_time(self) -> float:
+        """Display to submit."""
+        return self._seconds(self.display_complete, self.submit)
+
+
+def raw_input_available() -> bool:
+    if not sys.stdin.isatty():
+        return False
+    if os.name == "nt":
+        return True
+    try:
+        import termios  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _read_keys(getch, timer: PromptTimer, single_key: bool) -> str:
+    chars = []
+    while True:
+        ch = getch()
+        timer.key()
+        if ch == "\x03":
+            raise KeyboardInterrupt
+        if ch in QUIT_KEYS:
+            timer.submitted()
+            return "quit"
+        if ch in ("\r", "\n"):
+            break
+        if ch in ("\x7f", "\b"):
+            if chars:
+                chars.pop()
+                sys.stdout.write("\b \b")
+                sys.stdout.flush()
+            continue
+        if not ch.isprintable():
+            continue
+        chars.append(ch)
+        sys.stdout.write(ch)
+        sys.stdout.flush()
+        if single_key:
+            break
+
+    timer.submitted()
+    return "".join(chars)
+
+
+def _read_posix(timer: PromptTimer, single_key: bool) -> str:
+    import select
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    old = termios.tcgetattr(fd)
+    pending = []
+
+    def getch():
+        # A read may return several keys (pastes, escape sequences)
+        while not pending:
+            data = os.read(fd, 32)
+            # Esc on its own quits; an arrow key's sequence follows it at once
+            while data.endswith(b"\x1b") and select.select([fd], [], [], ESCAPE_TIMEOUT)[0]:
+                data += os.read(fd, 32)
+            pending.extend(ESCAPE_SEQUENCE.sub("", data.decode(errors="ignore")))
+        return pending.pop(0)
+
+    try:
+        tty.setcbreak(fd)
+        return _read_keys(getch, timer, single_key)
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old)
+
+
+def _read_windows(timer: PromptTimer, single_key: bool) -> str:
+    import msvcrt
+
+    def getch():
+        ch = msvcrt.getwch()
+        while ch in _WINDOWS_SPECIAL_KEYS:
+            msvcrt.getwch()
+            ch = msvcrt.getwch()
+        return ch
+
+    return _read_keys(getch, timer, single_key)
+
+
+def read_answer(prompt: str, timer: PromptTimer, single_key: bool = False,
+                raw: bool = True) -> Tuple[str, PromptTimer]:
+    """Prompt for an answer, timestamping the first keystroke and the submit.
+
+    With ``raw`` keypress capture (a TTY is required, otherwise this falls back
+    to ``input()``) keys are read as they are typed, and ``single_key``
+    submits on the first printable key. Esc or Ctrl-D answers "quit".
+    """
+    if timer.display_complete is None:
+        timer.displayed()
+
+    if not (raw and raw_input_available()):
+        answer = input(prompt)
+        timer.submitted()
+        return answer, timer
+
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    reader = _read_windows if os.name == "nt" else _read_posix
+    answer = reader(timer, single_key)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    return answer, timer
@@ -0,0 +1,150 @@
+import os
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sctools import paths
+
+# Shared by every span while tracing is off, so a disabled span costs one call
+_NULL_SPAN = nullcontext()
+
+_active = None
+
+PERCENTILES = (50, 95, 99)
+
+
+class _Span:
+    __slots__ = ("tracer", "stage", "start")
+
+    def __init__(self, tracer: "Tracer", stage: str):
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.events.append((self.stage, self.tracer.prompt, self.start, time.perf_counter_ns()))
+
+
+class Tracer:
+    """Per-stage ``perf_counter_ns`` spans of every prompt in a drill session.
+
+    Spans are kept in memory as (stage, prompt, start, end) tuples and
+    written once, as a Chrome trace (``chrome://tracing`` or Perfetto), when
+    the session ends.
+    """
+
+    def __init__(self, name: str, metadata: Optional[dict] = None):
+        self.name = name
+        self.metadata = dict(metadata or {})
+        self.events = []
+        self.prompt = 0
+        self._origin = time.perf_counter_ns()
+        self.started = datetime.now()
+
+    def span(self, stage: str) -> _Span:
+        return _Span(self, stage)
+
+    def next_prompt(self) -> int:
+        self.prompt += 1
+        return self.prompt
+
+    def chrome_trace(self) -> dict:
+        # Chrome trace timestamps are microseconds; nested spans share a thread
+        events = [{"name": stage, "cat": stage.split(".")[0], "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - self._origin) / 1e3, "dur": (end - start) / 1e3, "args": {"prompt": prompt}}
+                  for stage, prompt, start, end in self.events]
+        metadata = dict(self.metadata, name=self.name, started=self.started.isoformat(), prompts=self.prompt)
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": metadata}
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.chrome_trace(), file)
+        return path
+
+
+def start(name: str, metadata: Optional[dict] = None) -> Tracer:
+    """Trace every ``span`` from now on into a new Tracer."""
+    global _active
+    _active = Tracer(name, metadata)
+    return _active
+
+
+def stop() -> Optional[Tracer]:
+    """Stop tracing; returns the tracer that was active."""
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def active() -> Optional[Tracer]:
+    return _active
+
+
+def span(stage: str):
+    """Context manager timing ``stage`` of the current prompt; a shared no-op when tracing is off."""
+    if _active is None:
+        return _NULL_SPAN
+    return _Span(_active, stage)
+
+
+def next_prompt():
+    if _active is not None:
+        _active.next_prompt()
+
+
+def default_path(tracer: Tracer, traces_dir: str) -> str:
+    """``<traces_dir>/<name>[_<session>]_<YYYYmmdd_HHMMSS>.json``, after the legacy log names."""
+    session = tracer.metadata.get("session")
+    name = tracer.name if session is None else f"{tracer.name}_{session}"
+    return os.path.join(traces_dir, f"{name}_{tracer.started:%Y%m%d_%H%M%S}.json")
+
+
+def finish(path: Optional[str] = None, session: Optional[int] = None) -> Optional[str]:
+    """Stop tracing and save the trace to ``path`` (by default, the traces directory).
+
+    ``session`` ties the trace to the log store session of the same drill.
+    """
+    tracer = stop()
+    if tracer is None:
+        return None
+    if session is not None:
+        tracer.metadata["session"] = session
+    return tracer.save(path or default_path(tracer, paths.traces_dir()))
+
+
+def trace_files(traces_dir: str) -> List[str]:
+    """Paths of every trace in ``traces_dir``, oldest first."""
+    if not os.path.isdir(traces_dir):
+        return []
+    names = [name for name in os.listdir(traces_dir) if name.endswith(".json")]
+    return [os.path.join(traces_dir, name) for name in sorted(names, key=lambda n: (n[-20:], n))]
+
+
+def load_durations(paths: Iterable[str]) -> Dict[str, List[float]]:
+    """Seconds spent in each stage across the Chrome traces at ``paths``."""
+    durations = {}
+    for path in paths:
+        with open(path, 'r') as file:
+            events = json.load(file)["traceEvents"]
+        for event in events:
+            if event.get("ph") == "X":
+                durations.setdefault(event["name"], []).append(event["dur"] / 1e6)
+    return durations
+
+
+def summarize(durations: Dict[str, List[float]]) -> List[tuple]:
+    """(stage, count, mean, p50, p95, p99, max) rows in seconds, by stage name."""
+    import numpy as np
+
+    rows = []
+    for stage in sorted(durations):
+        values = np.asarray(durations[stage])
+        rows.append((stage, len(values), float(values.mean()),
+                     *(float(p) for p in np.percentile(values, PERCENTILES)), float(values.max())))
+    return rows
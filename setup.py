@@ -7,10 +7,19 @@ setup(
     url='https://github.com/vicalbiter/sc-tools.git',
     author='Vicente Albíter Alpízar',
     author_email='vic.albiter@gmail.com',
-    packages=find_packages(exclude=['logs', 'notebooks']),
+    packages=find_packages(exclude=['logs', 'notebooks', 'benchmarks', 'benchmarks.*']),
+    package_data={'sctools': ['static/*.html']},
     install_requires=[
         'matplotlib~=3.5.3',
     ],
+    extras_require={
+        'pairs': ['pandas', 'openpyxl'],
+    },
+    entry_points={
+        'console_scripts': [
+            'sctools=sctools.cli:main',
+        ],
+    },
     classifiers=[
         'Programming Language :: Python :: 3.9',
     ],
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from sctools import algs, cube
+from sctools.algs import AlgDB, build, load_imports, parse_alg, sticker_index
+
+
+def _stickers(alg):
+    states = cube.apply_scrambles(cube.solved_states(1), np.array([parse_alg(alg)]))
+    return cube.facelets(states)
+
+
+def test_rotations_turn_the_faces_they_bring_around():
+    assert algs.format_moves(parse_alg("y R y'")) == "B"
+    assert algs.format_moves(parse_alg("x U x'")) == "F"
+    assert algs.format_moves(parse_alg("z U z'")) == "L"
+
+
+def test_slices_match_face_turn_algorithms():
+    h_perm = _stickers("M2 U M2 U2 M2 U M2")
+    for got, expected in zip(h_perm, _stickers("R2 U2 R U2 R2 U2 R2 U2 R U2 R2")):
+        assert (got == expected).all()
+
+
+@pytest.mark.parametrize("alg", ["[M', U2]", "[U R U', M']", "[S, R' F R]", "[R: [E, R2]]"])
+def test_slice_commutators_are_edge_3_cycles(alg):
+    edges, corners = _stickers(alg)
+    assert (edges != np.arange(24)).sum() == 6
+    assert (corners == np.arange(24)).all()
+
+
+def test_wide_moves():
+    assert parse_alg("r") == parse_alg("Rw") == parse_alg("L x")
+    assert parse_alg("Rw2'") == parse_alg("r2")
+
+
+@pytest.mark.parametrize("alg", ["R U Q", "[R, U", "R3"])
+def test_parse_errors(alg):
+    with pytest.raises(ValueError):
+        parse_alg(alg)
+
+
+def test_bad_import_lines_are_rejected(tmp_path):
+    csv_path = tmp_path / "algs.csv"
+    csv_path.write_text("type,buffer,pair,alg\n"
+                        "edge,UF,??,R U\n"
+                        "edge,UF,AB,R U Q\n"
+                        "edge,UF,AB,R U R'\n")
+    imports, errors = load_imports(str(csv_path))
+    assert [line for line, _ in errors] == [2]
+    assert [row[0] for row in imports["edge"]] == [3, 4]
+
+    counts = build(str(tmp_path / "db"), buffers={"edge": [], "corner": []}, imports=imports, workers=1)
+    assert counts["edge"]["rejected"] == 2
+    assert [line for line, _ in counts["edge"]["rejects"]] == [3, 4]
+
+
+def test_build_merges_buffers(tmp_path):
+    path = str(tmp_path / "db")
+    build(path, buffers={"edge": ["UF"], "corner": []}, workers=1)
+    build(path, buffers={"edge": ["UR"], "corner": []}, workers=1)
+    index = AlgDB(path).index("edge")
+    assert index["length"][sticker_index("edge", "UF")].any()
+    assert index["length"][sticker_index("edge", "UR")].any()
+
+
+def test_slice_expansion_cancels():
+    assert algs.format_moves(parse_alg("M M M")) == "R' L"
+    assert algs.format_moves(parse_alg("M2")) == "R2 L2"
+    assert parse_alg("M M'") == []
+    assert algs.simplify(parse_alg("R L R'")) == parse_alg("L")
+
+
+def test_too_long_import_is_rejected(tmp_path):
+    csv_path = tmp_path / "algs.csv"
+    csv_path.write_text("type,buffer,pair,alg\n"
+                        "edge,UR,AC,\"" + "R U " * (algs.MAX_MOVES // 2 + 1) + "\"\n")
+    imports, _ = load_imports(str(csv_path))
+    counts = build(str(tmp_path / "db"), buffers={"edge": [], "corner": []}, imports=imports, workers=1)
+    assert counts["edge"]["rejects"] == [(2, f"longer than {algs.MAX_MOVES} moves")]
+
+
+def test_pool_build_matches_in_process_build(tmp_path):
+    buffers = {"edge": ["UR", "UF"], "corner": ["ULB"]}
+    build(str(tmp_path / "pool"), buffers=buffers, workers=2)
+    build(str(tmp_path / "local"), buffers=buffers, workers=1)
+    for ptype in algs.PTYPES:
+        assert (AlgDB(str(tmp_path / "pool")).index(ptype) == AlgDB(str(tmp_path / "local")).index(ptype)).all()
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import numpy as np
+
+from sctools.analytics import AnalyticsIndex, item_label, rebuild
+from sctools.logstore import LogStore, make_records
+from sctools.sessionlog import SessionLog
+
+
+def _records(items, times, correct=None):
+    n = len(items)
+    return make_records(0, "edge", [datetime(2024, 3, 1)] * n, items, ["b"] * n,
+                        correct if correct is not None else [True] * n, times)
+
+
+def test_missing_and_negative_times():
+    index = AnalyticsIndex()
+    index.update(_records([1, 1, 1, 2], [np.nan, -0.5, 2.0, np.inf], [True, False, True, True]))
+    stats = index.stats("edge")
+    assert stats["count"][1] == 3 and stats["accuracy"][1] == 2 / 3
+    # Only the finite times: -0.5 counts as 0, NaN and inf are left out
+    assert stats["mean_time"][1] == 1.0
+    assert np.isfinite(stats["ewma"][1])
+    assert index.hist[0, 0, 1].sum() == 2 and index.hist[0, 0, 1, 0] == 1
+    assert stats["count"][2] == 1 and np.isnan(stats["mean_time"][2]) and np.isnan(stats["ewma"][2])
+
+
+def test_undecodable_piece_label():
+    assert item_label("edge", 1) == "B"
+    assert item_label("corner", 255) == "?"
+    index = AnalyticsIndex()
+    index.update(_records([255], [1.0]))
+    assert index.slowest("edge") == [("?", 1.0, 1)]
+
+
+def test_two_writers_share_one_index(tmp_path):
+    path = str(tmp_path)
+    with SessionLog("edge", path=path) as first, SessionLog("corner", path=path) as second:
+        for item in range(3):
+            first.record(item, "a", True, 1.0)
+            second.record(item, "a", False, 2.0)
+            first.writer.flush()
+            second.writer.flush()
+        # Each flush folds in everything on disk so far, the other log's attempts too
+        assert first.index.offset == 5 and second.index.offset == 6
+    assert first.index.offset == second.index.offset == 6
+
+    store = LogStore(path)
+    index = AnalyticsIndex.for_store(store)
+    assert index.offset == len(store) == 6
+    assert index.sync(store) == 0
+    assert index.count.sum() == 6
+
+
+def test_save_keeps_the_more_complete_index(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append(_records([1, 2], [1.0, 2.0]))
+    ahead = AnalyticsIndex.for_store(store)
+    ahead.sync(store)
+    ahead.save()
+    behind = AnalyticsIndex.for_store(store)
+    behind.offset = 1
+    behind.save()
+    assert AnalyticsIndex.for_store(store).offset == 2
+
+
+def test_index_ahead_of_the_store_is_rebuilt(tmp_path):
+    store = LogStore(str(tmp_path / "a"))
+    store.append(_records([1, 2, 3], [1.0] * 3))
+    rebuild(store)
+    index = AnalyticsIndex.for_store(store)
+    other = LogStore(str(tmp_path / "b"))
+    other.append(_records([4], [1.0]))
+    assert index.sync(other) == 1
+    assert index.offset == 1 and index.count.sum() == 1
@@ -0,0 +1,75 @@
+import pytest
+
+from benchmarks import runner
+from benchmarks.__main__ import main
+
+
+def _result(median, peak_bytes=1000):
+    return {"best": median, "median": median, "ops": 1 / median, "peak_bytes": peak_bytes, "number": 1}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(runner, "REGISTRY", {})
+    monkeypatch.setattr(runner, "ROUND_TIME", 0.001)
+    return runner.REGISTRY
+
+
+def test_compare_flags_time_and_memory_regressions(capsys):
+    baseline = {"same": _result(1.0), "slower": _result(1.0), "bigger": _result(1.0, 1000),
+                "faster": _result(1.0)}
+    results = {"same": _result(1.05), "slower": _result(1.3), "bigger": _result(1.0, 1300),
+               "faster": _result(0.5), "added": _result(1.0)}
+    assert runner.compare(results, baseline, threshold=0.2) == ["slower"]
+    # Memory may grow by twice the threshold
+    assert runner.compare(results, baseline, threshold=0.1) == ["slower", "bigger"]
+    out = capsys.readouterr().out
+    assert "REGRESSION" in out and "new" in out
+
+
+def test_baselines_round_trip(tmp_path):
+    results = {"a": _result(0.5)}
+    path = runner.save_baseline(results, str(tmp_path / "base.json"))
+    assert path == str(tmp_path / "base.json")
+    assert runner.load_baseline(path) == results
+    assert runner.baseline_path("nightly").endswith("baselines/nightly.json")
+
+
+def test_run_filters_times_and_tears_down(registry, capsys):
+    events = []
+
+    @runner.benchmark("demo.plain")
+    def plain(tmp):
+        return lambda: sum(range(10))
+
+    @runner.benchmark("demo.teardown")
+    def teardown(tmp):
+        events.append("setup")
+        yield lambda: None
+        events.append("teardown")
+
+    @runner.benchmark("other.missing")
+    def missing(tmp):
+        import no_such_module  # noqa: F401
+
+    results = runner.run("demo", repeat=3)
+    assert sorted(results) == ["demo.plain", "demo.teardown"]
+    assert events == ["setup", "teardown"]
+    assert results["demo.plain"]["best"] <= results["demo.plain"]["median"]
+    assert runner.run("missing", repeat=1) == {}
+    assert "skipped" in capsys.readouterr().out
+
+
+def test_main_exits_1_on_regressions(registry, tmp_path, monkeypatch):
+    baseline = str(tmp_path / "base.json")
+    runner.save_baseline({"demo": _result(1.0)}, baseline)
+    monkeypatch.setattr(runner, "run", lambda pattern, repeat: {"demo": _result(1.5)})
+    assert main(["--compare", baseline]) == 1
+    assert main(["--compare", baseline, "--threshold", "0.6"]) == 0
+
+
+def test_format_time_units():
+    assert runner._format_time(2.0).strip() == "2.00 s"
+    assert runner._format_time(0.0042).strip() == "4.20 ms"
+    assert runner._format_time(3e-6).strip() == "3.00 us"
+    assert runner._format_time(5e-8).strip() == "50.0 ns"
@@ -0,0 +1,26 @@
+import numpy as np
+
+from sctools.bld import INVALID_IDX, MEMO_LETTERS, Trainer, encode_letters, encode_piece
+
+
+def test_piece_letters_round_trip():
+    trainer = Trainer(seed=0)
+    for ptype in ("edge", "corner"):
+        for idx in range(24):
+            piece = trainer.scheme.encoders[ptype]["idx_to_tuple"][idx]
+            assert encode_piece(piece, ptype) == idx
+            assert trainer.check_piece_memo_letter(piece, MEMO_LETTERS[idx].lower(), ptype=ptype)
+
+
+def test_invalid_piece_and_answer_are_not_a_match():
+    trainer = Trainer(seed=0)
+    assert encode_piece(("red", "red"), "edge") == INVALID_IDX
+    assert encode_letters("quit") == INVALID_IDX
+    assert not trainer.check_piece_memo_letter(("red", "red"), "quit")
+
+
+def test_batched_check_rejects_invalid_codes():
+    trainer = Trainer(seed=0)
+    pieces = np.array([0, 1, INVALID_IDX], dtype=np.uint8)
+    answers = np.array(["a", "c", "quit"])
+    assert trainer.check_piece_memo_letter(pieces, answers).tolist() == [True, False, False]
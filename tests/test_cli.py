@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from sctools import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def modules(monkeypatch):
+    """Command modules the CLI imports, replaced by recorders of their ``main`` calls."""
+    calls = []
+
+    def import_module(name):
+        return types.SimpleNamespace(main=lambda args: calls.append((name, args)) or 0)
+    monkeypatch.setattr(cli.importlib, "import_module", import_module)
+    return calls
+
+
+@pytest.mark.parametrize("argv, module", [
+    (["recognition", "-t", "e"], "sctools.recognition"),
+    (["pairs", "--no-log"], "sctools.pair_drills"),
+    (["serve", "--port", "0"], "sctools.server"),
+])
+def test_drills_dispatch_to_their_module(modules, argv, module):
+    assert cli.main(argv) == 0
+    (name, args), = modules
+    assert name == module and args.subcommand == argv[0]
+    assert not args.profile_startup and not args.enter and args.trace is None
+
+
+def test_common_options_go_before_or_after_the_command(modules, capsys):
+    cli.main(["--profile-startup", "pairs"])
+    cli.main(["pairs", "--profile-startup", "--enter", "--trace"])
+    (_, before), (_, after) = modules
+    assert before.profile_startup and after.profile_startup
+    assert after.enter and after.trace == ""
+    assert capsys.readouterr().err.count("Startup:") == 2
+
+
+def test_a_command_is_required(capsys):
+    with pytest.raises(SystemExit):
+        cli.main([])
+    with pytest.raises(SystemExit):
+        cli.main(["recognition"])   # -t is required
+
+
+def test_commands_run_in_process(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    assert cli.main(["traces"]) is None
+    assert "No traces in" in capsys.readouterr().out
+
+
+def test_import_profiler_times_top_level_imports():
+    sys.modules.pop("colorsys", None)
+    with cli.ImportProfiler() as profiler:
+        import colorsys  # noqa: F401
+    assert [name for name, _ in profiler.timings] == ["colorsys"]
+
+
+def test_startup_leaves_heavy_modules_out():
+    code = ("import sys; from sctools import cli; cli.build_parser(); "
+            "print([m for m in cli.HEAVY_MODULES if m in sys.modules])")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    assert out.stdout.strip() == "[]"
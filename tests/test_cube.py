@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from sctools import cube
+
+
+def _apply(moves):
+    return cube.apply_moves(cube.SOLVED, moves)
+
+
+@pytest.mark.parametrize("face", list(cube.FACES))
+def test_four_quarter_turns_are_the_identity(face):
+    assert cube.is_solved(_apply([face] * 4))[0]
+    assert not cube.is_solved(_apply([face] * 3))[0]
+
+
+@pytest.mark.parametrize("name", cube.MOVE_NAMES)
+def test_every_move_table_has_its_inverse(name):
+    inverse = cube.invert_scramble(name)
+    assert cube.is_solved(_apply(f"{name} {inverse}"))[0]
+    assert cube.is_valid(_apply(name))[0]
+
+
+def test_half_turns_are_two_quarter_turns():
+    for face in cube.FACES:
+        assert (_apply(f"{face}2") == _apply(f"{face} {face}")).all()
+        assert (_apply(f"{face}'") == _apply(f"{face} {face} {face}")).all()
+
+
+def test_scramble_and_its_inverse_cancel():
+    scramble = "R U2 F' L D B2 R' U L2 F D' B"
+    state = _apply(scramble)
+    assert not cube.is_solved(state)[0]
+    assert cube.is_solved(cube.apply_moves(state, cube.invert_scramble(scramble)))[0]
+
+
+def test_sexy_move_has_order_six():
+    state = cube.SOLVED
+    for i in range(1, 7):
+        state = cube.apply_moves(state, "R U R' U'")
+        assert cube.is_solved(state)[0] == (i == 6)
+
+
+def test_batched_scrambles_match_single_ones():
+    scrambles = ["R U", "F2 D' L", "", "B R2 U' F"]
+    batch = cube.apply_scrambles(cube.solved_states(len(scrambles)), scrambles)
+    for row, scramble in zip(batch, scrambles):
+        assert (row == _apply(scramble)).all()
+
+
+def test_random_states_are_valid():
+    states = cube.random_states(200, seed=0)
+    assert cube.is_valid(states).all()
+    flipped = states.copy()
+    flipped[:, -1] ^= 1   # one edge flipped alone is unreachable
+    assert not cube.is_valid(flipped).any()
+
+
+def test_solved_facelets_are_the_identity():
+    edges, corners = cube.facelets(cube.solved_states(1))
+    assert (edges == np.arange(24)).all() and (corners == np.arange(24)).all()
+
+
+def test_unsupported_move():
+    with pytest.raises(ValueError):
+        cube.parse_scramble("R Q")
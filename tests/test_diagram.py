@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pytest
+
+from sctools.bld import BLD_CFG, DEFAULT_SCHEME, get_scheme
+from sctools.cube import apply_scrambles, solved_states
+from sctools.diagram import CubeDiagram, contact_sheet, export_diagrams, facelet_faces, highlight_mask
+from sctools.render import encode_png, to_rgba
+
+SCRAMBLES = ["R U R' U'", "F2 D L'", "U2", "B' R2"]
+
+# The repository scheme held with another top color
+TURNED = get_scheme(colors=BLD_CFG["start"], top="white", front="red")
+
+
+def _colors(image):
+    return {tuple(int(v) for v in c) for c in image.reshape(-1, 4)}
+
+
+def test_solved_net_shows_every_face_color():
+    image = CubeDiagram(size=120).draw()
+    assert image.shape == (90, 120, 4) and image.dtype == np.uint8
+    assert {to_rgba(color) for color in DEFAULT_SCHEME.start.values()} <= _colors(image)
+
+
+def test_batch_matches_single_draws():
+    diagram = CubeDiagram(view="isometric", size=80)
+    states = apply_scrambles(solved_states(len(SCRAMBLES)), SCRAMBLES)
+    batch = diagram.draw_batch(states)
+    assert all(np.array_equal(image, diagram.draw(s)) for image, s in zip(batch, SCRAMBLES))
+    assert not np.array_equal(batch[0], batch[1])
+
+
+def test_scrambled_facelets_keep_nine_of_each_face():
+    faces = facelet_faces(apply_scrambles(solved_states(len(SCRAMBLES)), SCRAMBLES))
+    assert (np.apply_along_axis(np.bincount, 1, faces, minlength=6) == 9).all()
+
+
+def test_highlight_fades_the_other_stickers():
+    assert highlight_mask(["UF", "UFR"]).sum() == 2 + 3
+    assert highlight_mask(None).all()
+    plain, highlighted = CubeDiagram(size=60).draw(), CubeDiagram(size=60, highlight=["UF"]).draw()
+    assert plain.shape == highlighted.shape and not np.array_equal(plain, highlighted)
+    # Only the two UF stickers keep their full color
+    full = {to_rgba(color) for color in DEFAULT_SCHEME.start.values()}
+    assert full & _colors(highlighted) == {to_rgba(DEFAULT_SCHEME.start[face]) for face in "UF"}
+
+
+def test_svg_uses_the_scheme_colors():
+    svg = CubeDiagram(backend="svg", scheme=TURNED).draw()
+    assert svg.lstrip().startswith("<svg") and svg.count("<polygon") + svg.count("<path") >= 54
+    up = "#%02x%02x%02x" % to_rgba(TURNED.start["U"])[:3]
+    assert up in svg
+
+
+def test_invalid_options():
+    with pytest.raises(ValueError, match="view"):
+        CubeDiagram(view="side")
+    with pytest.raises(ValueError, match="backend"):
+        CubeDiagram(backend="matplotlib")
+    with pytest.raises(ValueError, match="raster"):
+        export_diagrams(SCRAMBLES, "unused", backend="svg", sheet=(2, 2))
+
+
+def test_contact_sheet_tiles_images():
+    images = np.stack([np.full((3, 2, 4), i, dtype=np.uint8) for i in range(3)])
+    sheet = contact_sheet(images, columns=2, padding=1, background=(9, 9, 9, 9))
+    assert sheet.shape == (2 * 4 + 1, 2 * 3 + 1, 4)
+    assert (sheet[1:4, 4:6] == 1).all() and (sheet[5:8, 1:3] == 2).all()
+    assert (sheet[5:8, 4:6] == 9).all()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_writes_numbered_files_in_the_scheme(tmp_path, workers):
+    output = str(tmp_path / "out")
+    count = export_diagrams(iter(SCRAMBLES), output, size=60, workers=workers, chunk_size=3, scheme=TURNED)
+    assert count == len(SCRAMBLES)
+    assert sorted(os.listdir(output)) == [f"{i:06d}.png" for i in range(len(SCRAMBLES))]
+
+    diagram = CubeDiagram(size=60, scheme=TURNED)
+    for i, scramble in enumerate(SCRAMBLES):
+        with open(os.path.join(output, f"{i:06d}.png"), 'rb') as file:
+            assert file.read() == encode_png(diagram.draw(scramble))
+    with open(os.path.join(output, "000002.png"), 'rb') as file:
+        assert file.read() != encode_png(CubeDiagram(size=60).draw(SCRAMBLES[2]))
+
+
+def test_export_svg_and_sheets(tmp_path):
+    export_diagrams(SCRAMBLES, str(tmp_path / "svg"), backend="svg", workers=1)
+    with open(tmp_path / "svg" / "000001.svg") as file:
+        assert file.read() == CubeDiagram(backend="svg").draw(SCRAMBLES[1])
+
+    assert export_diagrams(SCRAMBLES, str(tmp_path / "sheets"), size=40, sheet=(2, 1), workers=1) == 4
+    assert sorted(os.listdir(tmp_path / "sheets")) == ["sheet_0001.png", "sheet_0002.png"]
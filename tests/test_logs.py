@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+
+from sctools.bld import encode_piece
+from sctools.logs import (iter_attempts, iter_rows, log_files, read_file, read_files, session_kind,
+                          session_start, to_dataframe)
+from sctools.logstore import KINDS, LogStore, import_csv_logs
+from sctools.pairs import encode_pair
+
+PAIRS = """Timestamp,Letter Pair,Correct Image,User Input,Is Correct,Response Time (s)
+2024-07-19 14:14:26,BU,Bulma,bulma,True,2.323
+2024-07-19 14:14:30,BN,Banana,bananas,False,3.736
+"""
+
+# Older versions called the piece column "Edge"
+EDGES = """Timestamp,Edge,Reference,User Input,Response Time (s)
+2024-07-06 16:47:42,"('white', 'blue')",L,l,7.637
+2024-07-06 16:47:47,"('yellow', 'blue')",R,x,5.622
+2024-07-06 16:47:50,"('yellow', 'bl"""
+
+CORNERS = """Timestamp,Piece,Reference,User Input,Response Time (s)
+2024-07-12 23:30:20,"('yellow', 'orange', 'green')",T,T,7.586
+"""
+
+HEADER_ONLY = "Timestamp,Piece,Reference,User Input,Response Time (s)\n"
+
+
+@pytest.fixture
+def logs_dir(tmp_path):
+    files = {
+        "bld_pairs_session_20240719_141353.csv": PAIRS,
+        "edges_rec_session_20240706_164734.csv": EDGES,
+        "corner_rec_session_20240712_233012.csv": CORNERS,
+        "edge_rec_session_20240713_020014.csv": HEADER_ONLY,
+        "corner_rec_session_20240714_000000.csv": "",
+        "notes.csv": "not a log",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    return tmp_path
+
+
+def test_session_names():
+    assert session_kind("logs/edges_rec_session_20240706_164734.csv") == "edge"
+    assert session_kind("corner_rec_session_20240712_233012.csv") == "corner"
+    assert session_kind("bld_pairs_session_20240719_141353.txt") is None
+    assert session_start("bld_pairs_session_20240719_141353.csv") == datetime(2024, 7, 19, 14, 13, 53)
+    assert session_start("bld_pairs_session.csv") is None
+
+
+def test_log_files_are_in_session_order(logs_dir):
+    assert [p.split("/")[-1][-19:-4] for p in log_files(str(logs_dir))] == [
+        "20240706_164734", "20240712_233012", "20240713_020014", "20240714_000000", "20240719_141353"]
+
+
+def test_pairs_log(logs_dir):
+    log = read_file(str(logs_dir / "bld_pairs_session_20240719_141353.csv"))
+    assert (log.kind, log.started, log.skipped) == ("pairs", datetime(2024, 7, 19, 14, 13, 53), 0)
+    assert log.items == [encode_pair("BU"), encode_pair("BN")]
+    assert log.answers == ["bulma", "bananas"] and log.correct == [True, False]
+    assert log.response_times == [2.323, 3.736]
+
+
+def test_cut_short_row_is_skipped(logs_dir):
+    path = str(logs_dir / "edges_rec_session_20240706_164734.csv")
+    log = read_file(path)
+    assert log.skipped == 1 and log.correct == [True, False]
+    assert log.items == [encode_piece(("white", "blue"), "edge"), encode_piece(("yellow", "blue"), "edge")]
+    assert list(iter_rows(path))[-1] is None
+    with pytest.raises(ValueError, match=":4: cannot parse row"):
+        read_file(path, strict=True)
+
+
+def test_empty_logs_have_no_attempts(logs_dir):
+    for name in ("edge_rec_session_20240713_020014.csv", "corner_rec_session_20240714_000000.csv"):
+        log = read_file(str(logs_dir / name))
+        assert log.items == [] and log.skipped == 0
+
+
+def test_unknown_file_is_rejected(logs_dir):
+    with pytest.raises(ValueError, match="Unknown session type"):
+        read_file(str(logs_dir / "notes.csv"))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_reads_keep_the_order(logs_dir, workers):
+    paths = log_files(str(logs_dir))
+    assert list(read_files(paths, workers=workers)) == [read_file(path) for path in paths]
+
+
+def test_attempts_and_dataframe(logs_dir):
+    attempts = list(iter_attempts(str(logs_dir), workers=1, kind="corner"))
+    assert len(attempts) == 1 and attempts[0].correct and attempts[0].kind == "corner"
+    frame = to_dataframe(iter_attempts(str(logs_dir), workers=1))
+    assert len(frame) == 5 and frame["correct"].sum() == 3
+
+
+def test_import_into_the_store_once(logs_dir, tmp_path):
+    store = LogStore(str(tmp_path / "store"))
+    imported = import_csv_logs(store, str(logs_dir), workers=1)
+    assert sorted(imported.values()) == [0, 0, 1, 2, 2]
+    assert import_csv_logs(store, str(logs_dir), workers=1) == {}
+
+    records = store.read()
+    assert len(records) == 5 and len(store.sessions) == 5
+    pairs = records[records["kind"] == KINDS.index("pairs")]
+    assert store.texts(pairs) == ["bulma", "bananas"]
+    assert pairs["correct"].tolist() == [True, False]
+    assert store.sessions[0]["source"] == "edges_rec_session_20240706_164734.csv"
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from sctools.logstore import _ATTEMPT_DTYPE_V1, _file_lock, ATTEMPT_DTYPE, MAX_TEXT_LENGTH, STORE_VERSION, LogStore, make_records
+
+
+def _records(session, n):
+    return make_records(session, "edge", [datetime.now()] * n, [1] * n, ["b"] * n, [True] * n, [1.0] * n)
+
+
+def _start_sessions(path, n):
+    store = LogStore(path)
+    ids = []
+    for _ in range(n):
+        ids.append(store.new_session("edge"))
+        store.append(_records(ids[-1], 1), texts=[f"{ids[-1]}"])
+    return ids
+
+
+def test_append_and_reopen(tmp_path):
+    store = LogStore(str(tmp_path))
+    session = store.new_session("edge")
+    records = make_records(session, "edge", [datetime(2024, 5, 1, 12)] * 3, [1, 2, 3], ["b", "x", "carrot"],
+                           [True, False, False], [0.5, 1.5, 2.5], render_times=[0.01] * 3)
+    store.append(records[:2], texts=["b", "x"])
+    store.append(records[2:], texts=["carrot"])
+
+    reopened = LogStore(str(tmp_path))
+    assert reopened.sessions == store.sessions
+    read = reopened.read()
+    assert len(reopened) == 3
+    for name in ("timestamp", "item", "answer", "correct", "response_time", "render_time"):
+        assert (read[name] == records[name]).all()
+    assert np.isnan(read["reaction_time"]).all()
+    assert reopened.texts(read) == ["b", "x", "carrot"]
+
+
+def test_partial_trailing_record_is_dropped(tmp_path):
+    store = LogStore(str(tmp_path))
+    store.append(_records(0, 2))
+    with open(os.path.join(str(tmp_path), "attempts.dat"), 'ab') as file:
+        file.write(b"\0" * (ATTEMPT_DTYPE.itemsize // 2))
+    assert len(LogStore(str(tmp_path))) == 2
+
+
+def test_opening_waits_for_an_append_in_progress(tmp_path):
+    path = str(tmp_path)
+    LogStore(path).append(_records(0, 1))
+    data = _records(0, 1).tobytes()
+    locked = threading.Event()
+
+    def slow_append():
+        with _file_lock(os.path.join(path, "lock")):
+            with open(os.path.join(path, "attempts.dat"), 'ab') as file:
+                file.write(data[:10])
+                file.flush()
+                locked.set()
+                time.sleep(0.2)
+                file.write(data[10:])
+
+    writer = threading.Thread(target=slow_append)
+    writer.start()
+    locked.wait()
+    # Would truncate the half-written record if it did not wait for the lock
+    store = LogStore(path)
+    writer.join()
+    assert len(store) == 2
+    assert (store.read()["item"] == 1).all()
+
+
+def test_version_1_store_is_migrated(tmp_path):
+    path = str(tmp_path)
+    old = np.zeros(2, dtype=_ATTEMPT_DTYPE_V1)
+    old["item"] = [4, 7]
+    old["response_time"] = [1.25, 3.5]
+    old.tofile(os.path.join(path, "attempts.dat"))
+    sessions = [{"id": 0, "kind": "corner", "started": "2023-01-01T10:00:00", "source": None}]
+    with open(os.path.join(path, "meta.json"), 'w') as file:
+        json.dump({"version": 1, "sessions": sessions}, file)
+
+    store = LogStore(path)
+    assert store.meta["version"] == STORE_VERSION and store.sessions == sessions
+    records = store.read()
+    assert list(records["item"]) == [4, 7] and list(records["response_time"]) == [1.25, 3.5]
+    assert np.isnan(records["render_time"]).all() and np.isnan(records["reaction_time"]).all()
+
+    with open(os.path.join(path, "meta.json"), 'r') as file:
+        assert json.load(file)["version"] == STORE_VERSION
+    assert len(LogStore(path)) == 2
+
+
+def test_concurrent_processes_get_distinct_sessions(tmp_path):
+    path = str(tmp_path)
+    LogStore(path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        ids = [i for chunk in executor.map(_start_sessions, [path] * 4, [10] * 4) for i in chunk]
+    assert sorted(ids) == list(range(40))
+
+    store = LogStore(path)
+    records = store.read()
+    assert len(store.sessions) == 40
+    assert store.texts(records) == [str(session) for session in records["session"]]
+
+
+def test_long_answer_is_rejected(tmp_path):
+    store = LogStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.append(_records(0, 2), texts=["b", "x" * (MAX_TEXT_LENGTH + 1)])
+    assert len(store) == 0
+    store.append(_records(0, 1), texts=["x" * MAX_TEXT_LENGTH])
+    assert store.texts(store.read()) == ["x" * MAX_TEXT_LENGTH]
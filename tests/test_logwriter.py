@@ -0,0 +1,89 @@
+import signal
+import time
+from datetime import datetime
+
+import pytest
+
+from sctools import logwriter
+from sctools.logstore import LogStore, make_records
+from sctools.logwriter import LogWriter
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """Route SIGTERM through the writer handler to a recorder instead of the default action."""
+    calls = []
+    monkeypatch.setitem(logwriter._previous_handlers, signal.SIGTERM, lambda signum, frame: calls.append(signum))
+    previous = signal.signal(signal.SIGTERM, logwriter._flush_on_signal)
+    yield calls
+    signal.signal(signal.SIGTERM, previous)
+
+
+def _records(n):
+    return make_records(0, "edge", [datetime.now()] * n, [1] * n, ["b"] * n, [True] * n, [1.0] * n)
+
+
+def test_signal_flushes_pending_rows(tmp_path, handled):
+    store = LogStore(str(tmp_path))
+    with LogWriter(store, flush_interval=60) as writer:
+        writer.write(_records(3))
+        signal.raise_signal(signal.SIGTERM)
+        assert len(store) == 3
+    assert handled == [signal.SIGTERM]
+
+
+def test_signal_inside_writer_waits_for_its_locks(tmp_path, handled):
+    store = LogStore(str(tmp_path))
+    with LogWriter(store, flush_interval=60) as writer:
+        writer.write(_records(2))
+        with writer._locked(writer._io_lock):
+            # Flushing here would deadlock on the lock this thread holds
+            signal.raise_signal(signal.SIGTERM)
+            assert handled == []
+        assert handled == [signal.SIGTERM]
+        assert len(store) == 2
+
+
+class FlakyStore:
+    """Fails the first ``failures`` appends, then passes them on."""
+
+    def __init__(self, store, failures=1):
+        self.store = store
+        self.failures = failures
+
+    def append(self, records, texts=None):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.store.append(records, texts=texts)
+
+
+def test_failed_append_keeps_the_batch(tmp_path, capsys):
+    store = LogStore(str(tmp_path))
+    writer = LogWriter(FlakyStore(store), flush_interval=60, max_rows=2)
+    writer.write(_records(2))
+    # The thread takes the full batch, fails, prints the error and keeps running
+    deadline = time.monotonic() + 5
+    while writer.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer._thread.is_alive()
+    assert isinstance(writer.error, OSError) and "disk full" in capsys.readouterr().err
+    assert len(store) == 0
+
+    writer.write(_records(1))
+    writer.close()
+    assert len(store) == 3 and writer.error is None
+
+
+def test_flush_and_close_raise_store_errors(tmp_path):
+    store = LogStore(str(tmp_path))
+    # One failure each for flush, the thread's last write and close's retry
+    writer = LogWriter(FlakyStore(store, failures=3), flush_interval=60)
+    writer.write(_records(2))
+    with pytest.raises(OSError, match="disk full"):
+        writer.flush()
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+    assert len(store) == 0
+    writer.flush()
+    assert len(store) == 2
@@ -0,0 +1,58 @@
+import pytest
+
+from sctools.matching import AnswerIndex, edit_distance, normalize, split_images
+
+PAIRS = [("AB", "Abraham Lincoln / Abby"), ("CD", "Cédric; CD player"), ("EF", "Elephant"), ("GH", "Gus")]
+
+
+@pytest.fixture
+def index():
+    return AnswerIndex(PAIRS, aliases={"ef": ["Dumbo"]})
+
+
+def test_normalize_and_split():
+    assert normalize("Álvaro's") == "alvaros"
+    assert split_images("a / b; c|d") == ["a", "b", "c", "d"]
+
+
+def test_exact(index):
+    assert index.match("ab", "abby")
+    assert index.match("AB", "  ABRAHAM lincoln")
+    assert index.match("CD", "cedric")
+    assert index.match("EF", "dumbo")
+    assert not index.match("AB", "abra")
+    assert not index.match("AB", "")
+    assert not index.match("ZZ", "abby")
+
+
+def test_prefix(index):
+    assert index.match("AB", "abra", policy="prefix")
+    assert index.match("EF", "el", policy="prefix")
+    assert not index.match("EF", "e", policy="prefix")
+    assert not index.match("EF", "lephant", policy="prefix")
+
+
+def test_edit(index):
+    assert index.match("EF", "elefant", policy="edit")        # two edits, 8 letters
+    assert index.match("EF", "elpehant", policy="edit")       # one transposition
+    assert not index.match("EF", "elfnt", policy="edit")
+    assert index.match("AB", "aby", policy="edit")            # one edit, 4 letters
+    assert not index.match("GH", "gas", policy="edit")        # up to 3 letters must be exact
+    assert index.match("CD", "cdplayer", policy="edit")
+
+
+def test_default_policy_and_prepare():
+    index = AnswerIndex(PAIRS, policy="edit").prepare()
+    assert index.match("EF", "elefant")
+    assert not index.match("EF", "elefant", policy="exact")
+    assert index.reference("cd") == "Cédric; CD player"
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        AnswerIndex(PAIRS, policy="fuzzy")
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("abcdef", "uvwxyz", limit=2) == 3
@@ -0,0 +1,41 @@
+from sctools.memo import Memo, chunks, iter_memo_rows, memo, memo_scrambles
+
+T_PERM = "R U R' U' R' F R2 U' R' U' R U R' F'"
+CHECKERBOARD = "R2 L2 U2 D2 F2 B2"
+
+
+def test_solved():
+    assert memo("") == Memo(edges="", corners="", flips="", twists="", parity=False)
+
+
+def test_t_perm():
+    # UR/UL and UBR/URF swapped: one edge target, a corner cycle break from the solved ULB buffer
+    assert memo(T_PERM) == Memo(edges="D", corners="BCB", flips="", twists="", parity=True)
+
+
+def test_checkerboard():
+    # Every edge swaps with the one opposite it through the center; corners stay
+    assert memo(CHECKERBOARD) == Memo(edges="XAUACWCDVDFNFHPH", corners="", flips="", twists="", parity=False)
+
+
+def test_flips_and_twists():
+    # UF and UL flipped in place
+    assert memo("F R B L U L' U B' R' F' L' U' L U'") == Memo(edges="", corners="", flips="IE", twists="",
+                                                              parity=False)
+    twist = memo("R' D' R D R' D' R D U " + "R' D' R D " * 4 + "U'")
+    assert (twist.edges, twist.corners, len(twist.twists)) == ("", "", 2)
+
+
+def test_batch_matches_single_scrambles():
+    scrambles = [T_PERM, CHECKERBOARD, "F R' D2 L B U'"]
+    assert memo_scrambles(scrambles) == [memo(s) for s in scrambles]
+
+
+def test_rows_stream_in_order():
+    scrambles = [T_PERM, "", CHECKERBOARD, "  ", "U"] * 3
+    rows = list(iter_memo_rows(scrambles, workers=1, chunk_size=2))
+    assert [row[0] for row in rows] == [s for s in scrambles if s.strip()]
+
+
+def test_chunks_skip_blank_lines():
+    assert list(chunks(["a\n", "\n", " b", "c", "d"], 3)) == [["a", "b", "c"], ["d"]]
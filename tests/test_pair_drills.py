@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+
+from sctools import paths, pairs
+from sctools.cli import build_parser
+from sctools.pair_drills import (DEFAULT_SHEET, count_answer, create_groups, group_word_pairs,
+                                 load_csv_files, load_word_pairs, main)
+from sctools.pairs import build_groups, cache_path_for
+
+LETTERS = "ABCDE"
+
+
+def _spreadsheet(path):
+    images = [[f"{a}{b} img" if a != b else "." for b in LETTERS] for a in LETTERS]
+    pd.DataFrame(images, index=list(LETTERS), columns=list(LETTERS)).to_excel(path)
+    return str(path)
+
+
+def test_group_csvs_round_trip(tmp_path):
+    excel_path = _spreadsheet(tmp_path / "pairs.xlsx")
+    create_groups(excel_path, str(tmp_path))
+    files = load_csv_files(str(tmp_path))
+    groups = build_groups(excel_path)
+    assert sorted(files) == sorted(groups)
+    word_pairs = load_word_pairs([files["B"]])
+    assert word_pairs == group_word_pairs(groups, ["B"])
+    assert word_pairs["BC"] == {"image": "BC img", "counter": 0}
+
+
+def test_count_answer_needs_a_run_of_correct_answers():
+    word_pairs = {"BC": {"image": "x", "counter": 0}}
+    assert [count_answer(word_pairs, "BC", c, 2) for c in (True, False, True, True)] == [False, False, False, True]
+
+
+def test_drill_reads_the_spreadsheet_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    os.makedirs(paths.groups_dir())
+    excel_path = _spreadsheet(os.path.join(paths.groups_dir(), DEFAULT_SHEET))
+    monkeypatch.setattr("builtins.input", lambda prompt: "exit")
+
+    args = build_parser().parse_args(["pairs", "--no-log", "--enter"])
+    main(args)
+    assert os.path.exists(cache_path_for(excel_path, paths.cache_dir()))
+
+    def fail(excel_path):
+        raise AssertionError("the spreadsheet was read again")
+    monkeypatch.setattr(pairs, "build_groups", fail)
+    main(args)
@@ -0,0 +1,109 @@
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from sctools import pairs
+from sctools.pairs import (CACHE_VERSION, GROUPS_HEADER, build_all_groups, build_groups, cache_path_for,
+                           decode_pair, encode_pair, load_groups, read_groups, sheet_files)
+
+LETTERS = "ABCDE"
+
+
+def _spreadsheet(path, image="img"):
+    images = [[f"{a}{b} {image}" if a != b else "." for b in LETTERS] for a in LETTERS]
+    pd.DataFrame(images, index=list(LETTERS), columns=list(LETTERS)).to_excel(path)
+    return str(path)
+
+
+def _forbid_build(monkeypatch):
+    def fail(excel_path):
+        raise AssertionError("the spreadsheet was read again")
+    monkeypatch.setattr(pairs, "build_groups", fail)
+
+
+def test_pair_codes_round_trip():
+    assert encode_pair(" ab ") == 1
+    assert all(decode_pair(encode_pair(a + b)) == a + b for a in LETTERS for b in LETTERS)
+
+
+def test_build_groups(tmp_path):
+    groups = build_groups(_spreadsheet(tmp_path / "pairs.xlsx"))
+    # Pairs with a learn-last letter (A, E, R) all go to group Z, at the end
+    assert list(groups) == ["B", "C", "D", "Z"]
+    assert groups["B"] == [("BC", "BC img"), ("BD", "BD img")]
+    assert all(set(pair) & set("AER") for pair, _ in groups["Z"])
+    assert sum(len(g) for g in groups.values()) == len(LETTERS) * (len(LETTERS) - 1)
+
+
+def test_load_groups_uses_the_cache(tmp_path, monkeypatch):
+    excel_path = _spreadsheet(tmp_path / "pairs.xlsx")
+    cache_dir = str(tmp_path / "cache")
+    groups = load_groups(excel_path, cache_dir)
+    assert os.path.exists(cache_path_for(excel_path, cache_dir))
+
+    _forbid_build(monkeypatch)
+    assert load_groups(excel_path, cache_dir) == groups
+    # Touched but unchanged: the content hash still matches
+    stat = os.stat(excel_path)
+    os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert load_groups(excel_path, cache_dir) == groups
+
+
+def test_changed_spreadsheet_is_rebuilt(tmp_path):
+    excel_path = _spreadsheet(tmp_path / "pairs.xlsx")
+    cache_dir = str(tmp_path / "cache")
+    load_groups(excel_path, cache_dir)
+    _spreadsheet(excel_path, image="new")
+    assert load_groups(excel_path, cache_dir)["B"][0] == ("BC", "BC new")
+
+
+@pytest.mark.parametrize("content", [
+    b"",
+    b"not a pickle",
+    b"cno_such_module\nThing\n.",          # ImportError
+    b"csctools.pairs\nno_such_name\n.",    # AttributeError
+    pickle.dumps(["a", "list"]),
+    pickle.dumps({"version": CACHE_VERSION - 1}),
+])
+def test_unreadable_cache_is_rebuilt(tmp_path, content):
+    excel_path = _spreadsheet(tmp_path / "pairs.xlsx")
+    cache_dir = str(tmp_path / "cache")
+    expected = build_groups(excel_path)
+    os.makedirs(cache_dir)
+    with open(cache_path_for(excel_path, cache_dir), 'wb') as file:
+        file.write(content)
+    assert load_groups(excel_path, cache_dir) == expected
+    assert pairs._read_cache(cache_path_for(excel_path, cache_dir))["groups"] == expected
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_all_groups(tmp_path, workers):
+    sheets_dir = tmp_path / "sheets"
+    sheets_dir.mkdir()
+    excel_path = _spreadsheet(tmp_path / "pairs.xlsx")
+    for member in ("bob", "alice"):
+        shutil.copy(excel_path, sheets_dir / f"{member}.xlsx")
+    # An open workbook's lock file and other files are not sheets
+    (sheets_dir / "~$alice.xlsx").write_bytes(b"")
+    (sheets_dir / "notes.txt").write_text("")
+    assert [os.path.basename(p) for p in sheet_files(str(sheets_dir))] == ["alice.xlsx", "bob.xlsx"]
+
+    output_dir = str(tmp_path / "groups")
+    built = list(build_all_groups(str(sheets_dir), output_dir, str(tmp_path / "cache"), workers=workers))
+    assert [(member, count) for member, _, count in built] == [("alice", 20), ("bob", 20)]
+    for _, path, _ in built:
+        with open(path, encoding="utf-8") as file:
+            assert file.readline().strip() == ",".join(GROUPS_HEADER)
+        assert read_groups(path) == build_groups(excel_path)
+
+
+def test_importing_pairs_leaves_the_pool_out():
+    code = "import sys, sctools.pairs; print('sctools.parallel' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert out.stdout.strip() == "False"
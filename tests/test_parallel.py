@@ -0,0 +1,19 @@
+import itertools
+import operator
+
+from sctools.parallel import bounded_map
+
+
+def test_results_come_back_in_order():
+    items = [(i, i) for i in range(50)]
+    assert list(bounded_map(operator.mul, items, workers=3)) == [i * i for i in range(50)]
+    assert list(bounded_map(operator.mul, items, workers=1)) == [i * i for i in range(50)]
+
+
+def test_only_a_few_items_are_taken_ahead():
+    taken = []
+    items = ((taken.append(i) or i, 1) for i in itertools.count())
+    results = bounded_map(operator.add, items, workers=2, per_worker=2)
+    assert list(itertools.islice(results, 3)) == [1, 2, 3]
+    assert len(taken) <= 3 + 2 * 2
+    results.close()
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+from sctools import paths, recognition
+from sctools.bld import PieceAtlas, Trainer, encode_piece, get_scheme
+from sctools.cli import build_parser
+from sctools.logstore import LogStore
+from sctools.recognition import Prefetcher, run_session
+from sctools.srs import Scheduler, all_keys
+
+# Speffz shifted by one letter
+SHIFTED = get_scheme(letters="BCDEFGHIJKLMNOPQRSTUVWXA")
+
+
+@pytest.fixture(scope="module")
+def atlases():
+    return {None: PieceAtlas.build(Trainer(renderer="raster")),
+            SHIFTED: PieceAtlas.build(Trainer(renderer="raster", scheme=SHIFTED))}
+
+
+class FakeDisplay:
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self.shown = []
+
+    def show_image(self, image):
+        self.shown.append(image)
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    """Pieces in the order ``_next_prompt`` prepared them, prefetched or not."""
+    prepared = []
+    next_prompt = recognition._next_prompt
+
+    def spy(*args):
+        prompt = next_prompt(*args)
+        prepared.append(prompt[1])
+        return prompt
+    monkeypatch.setattr(recognition, "_next_prompt", spy)
+    return prepared
+
+
+def _answer(monkeypatch, display, prompts, trainer, plan):
+    """Answer the n-th prompt right or wrong as ``plan`` says, then quit."""
+    def read_answer(prompt, timer, single_key=False, raw=True):
+        timer.submitted()
+        n = len(display.shown)
+        if n > len(plan):
+            return "quit", timer
+        letter = trainer.get_piece_memo_letter(prompts[n - 1], ptype="edge")
+        return (letter if plan[n - 1] else "?"), timer
+    monkeypatch.setattr(recognition, "read_answer", read_answer)
+
+
+def _args(*extra):
+    return build_parser().parse_args(["recognition", "-t", "e", "--enter", *extra])
+
+
+def test_prefetcher_runs_one_prompt_ahead():
+    prefetcher = Prefetcher()
+    assert prefetcher.result(lambda x: x + 1, 1) == 2
+    threads = []
+    prefetcher.submit(lambda: threads.append(threading.current_thread()) or "ready")
+    assert prefetcher.result(lambda: "inline") == "ready"
+    assert threads[0] is not threading.current_thread()
+    # Taken: the next result is computed inline again
+    assert prefetcher.result(lambda: "inline") == "inline"
+    prefetcher.close()
+
+
+def test_prefetching_keeps_the_seeded_sequence(atlases, prompts, monkeypatch, capsys):
+    trainer = Trainer(seed=11)
+    display = FakeDisplay(atlases[None])
+    _answer(monkeypatch, display, prompts, trainer, [True, False, True, True])
+    run_session(_args("--no-log"), "edge", trainer, trainer.scheme, display)
+
+    expected = Trainer(seed=11)
+    # One prompt was prefetched beyond the quit
+    assert prompts == [expected.get_random_piece("edge") for _ in range(6)]
+    assert len(display.shown) == 5
+    assert "Correct: 3/4" in capsys.readouterr().out
+
+
+def test_logged_answers_in_a_custom_scheme(atlases, prompts, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    trainer = Trainer(seed=4, scheme=SHIFTED)
+    display = FakeDisplay(atlases[SHIFTED])
+    _answer(monkeypatch, display, prompts, trainer, [True, False])
+    run_session(_args(), "edge", trainer, SHIFTED, display)
+
+    records = LogStore(paths.store_dir()).read()
+    assert records["correct"].tolist() == [True, False]
+    assert records["item"].tolist() == [encode_piece(p, "edge", SHIFTED) for p in prompts[:2]]
+    # A right answer is stored as the memo position of the piece shown
+    assert records["answer"][0] == records["item"][0]
+
+
+def test_scheduled_prompts_are_reviewed(atlases, prompts, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    scheduler = Scheduler(paths.srs_state_path(), keys=all_keys())
+    trainer = Trainer(seed=0)
+    display = FakeDisplay(atlases[None])
+    _answer(monkeypatch, display, prompts, trainer, [True, True, False])
+    run_session(_args("--no-log", "--srs"), "edge", trainer, trainer.scheme, display, scheduler)
+
+    reviewed = [card for key, card in Scheduler(paths.srs_state_path()).cards.items()
+                if key.startswith("edge") and card.reps + card.lapses]
+    assert len(reviewed) == 3
@@ -0,0 +1,85 @@
+import struct
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+import pytest
+
+from sctools.render import (RasterRenderer, SVGRenderer, encode_png, get_renderer, label_map, palette,
+                            to_rgba, EDGE_LIMITS, EDGE_SHAPES)
+
+EDGE = ("white", "red")
+CORNER = ("yellow", "#00ff00", (0, 0, 255))
+
+
+def _decode_png(data):
+    """RGBA array of an unfiltered 8-bit RGBA PNG, as ``encode_png`` writes them."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    chunks, pos = {}, 8
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(kind + body)
+        chunks[kind] = chunks.get(kind, b"") + body
+        pos += 12 + length
+    width, height = struct.unpack(">II", chunks[b"IHDR"][:8])
+    raw = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(height, -1)
+    assert not raw[:, 0].any()
+    return raw[:, 1:].reshape(height, width, 4)
+
+
+def test_to_rgba():
+    assert to_rgba("Red") == (255, 0, 0, 255)
+    assert to_rgba("#0a0B0c") == (10, 11, 12, 255)
+    assert to_rgba((1, 2, 3)) == (1, 2, 3, 255)
+    assert to_rgba((1, 2, 3, 4)) == (1, 2, 3, 4)
+    with pytest.raises(ValueError):
+        to_rgba("mauve")
+
+
+def test_raster_edge_puts_the_first_sticker_below():
+    image = RasterRenderer(size=100).draw(EDGE, "edge")
+    assert image.shape == (100, 100, 4) and image.dtype == np.uint8
+    # The view is twice as tall as wide: the piece spans the middle columns
+    assert tuple(image[25, 50]) == to_rgba("red")
+    assert tuple(image[75, 50]) == to_rgba("white")
+    assert tuple(image[50, 2]) == to_rgba("white")   # background
+    assert tuple(image[50, 50]) == to_rgba("black")  # the line between the stickers
+
+
+def test_raster_corner_colors_each_face():
+    image = RasterRenderer(size=120).corner(CORNER)
+    colors = {tuple(c) for c in image.reshape(-1, 4)}
+    assert {to_rgba(c) for c in CORNER} | {to_rgba("black"), to_rgba("white")} == colors
+
+
+def test_label_map_and_palette():
+    labels = label_map(EDGE_SHAPES, EDGE_LIMITS, 20, 40, line_width=0)
+    assert set(np.unique(labels)) == {0, 1, 2}
+    colors = palette(["red", "blue"], background="gray")
+    assert colors.dtype == np.uint32 and len(colors) == 4
+    assert tuple(colors[:1].view(np.uint8)) == to_rgba("gray")
+    assert tuple(colors[-1:].view(np.uint8)) == to_rgba("black")
+
+
+def test_png_round_trips():
+    image = RasterRenderer(size=32).draw(EDGE, "edge")
+    assert np.array_equal(_decode_png(encode_png(image)), image)
+    assert np.array_equal(_decode_png(encode_png(image, level=0)), image)
+
+
+@pytest.mark.parametrize("ptype, colors", [("edge", EDGE), ("corner", ("yellow", "green", "blue"))])
+def test_svg_fills_every_sticker(ptype, colors):
+    svg = SVGRenderer(size=64).draw(colors, ptype)
+    root = ET.fromstring(svg)
+    assert root.get("width") == root.get("height") == "64"
+    fills = [p.get("fill") for p in root.iter("{http://www.w3.org/2000/svg}polygon")]
+    assert sorted(fills) == sorted(colors)
+
+
+def test_get_renderer():
+    renderer = RasterRenderer(size=8)
+    assert get_renderer(renderer) is renderer
+    assert get_renderer("svg", size=10).size == 10
+    with pytest.raises(ValueError, match="Unknown renderer"):
+        get_renderer("ascii")
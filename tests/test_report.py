@@ -0,0 +1,129 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from sctools import report
+from sctools.logstore import LogStore, make_records
+from sctools.report import ReportCache, aggregate, build_reports, fingerprints, panel_data, write_report
+
+
+def _add_session(store, kind, items, answers, correct, times, source=None):
+    session = store.new_session(kind, source=source)
+    n = len(items)
+    store.append(make_records(session, kind, [datetime(2024, 3, 1 + session)] * n, items, answers, correct, times))
+    return session
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LogStore(str(tmp_path / "store"))
+    _add_session(store, "edge", [1, 1, 2], ["b", "c", "c"], [True, False, True], [1.0, 3.0, 2.0])
+    _add_session(store, "corner", [4], ["e"], [True], [0.5], source="server:ana")
+    _add_session(store, "pairs", [25, 25], ["bulma", "bulma"], [True, True], [2.0, 4.0], source="server:bo")
+    return store
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Panels rendered, by file name; nothing is drawn."""
+    rendered = []
+
+    def render(panel, data, path):
+        rendered.append(os.path.basename(path))
+        with open(path, 'wb') as file:
+            file.write(b"png")
+        return path
+    monkeypatch.setattr(report, "_render_panel", render)
+    return rendered
+
+
+def test_aggregate_and_panel_data(store):
+    sessions, items, confusion = aggregate(np.asarray(store.read()))
+    assert sessions["count"].tolist() == [3, 1, 2] and sessions["correct"].tolist() == [2, 1, 2]
+    assert sessions["median_time"].tolist() == [2.0, 0.5, 3.0]
+    assert items[items["session"] == 0]["count"].tolist() == [2, 1]
+    # Pair answers are words, not letters: only piece drills are confused
+    assert set(confusion["session"].tolist()) == {0, 1}
+
+    cache = ReportCache()
+    cache.sync(store)
+    data = panel_data(cache, "edge")
+    assert data["count"][1] == 2 and data["accuracy"][1] == 0.5 and data["mean_time"][1] == 2.0
+    assert data["confusion"][1, 2] == 1
+    assert len(panel_data(cache, "edge", sessions=[1])["started"]) == 0
+
+
+def test_fingerprints_change_with_edits(store):
+    before = fingerprints(np.asarray(store.read()))
+    assert sorted(before) == [0, 1, 2]
+    store.update(np.array([1]), "correct", True)
+    after = fingerprints(np.asarray(store.read()))
+    assert after[0] != before[0] and after[1] == before[1] and after[2] == before[2]
+
+
+def test_cache_resyncs_only_changed_sessions(store, tmp_path):
+    path = str(tmp_path / "aggregates.npz")
+    cache = ReportCache(path)
+    assert cache.sync(store) == {0, 1, 2}
+    cache.save()
+
+    cache = ReportCache.load(path)
+    assert cache.sync(store) == set()
+    _add_session(store, "edge", [3], ["d"], [False], [1.5])
+    assert cache.sync(store) == {3}
+    assert cache.sessions["session"].tolist() == [0, 1, 2, 3]
+    fresh = ReportCache()
+    fresh.sync(store)
+    assert np.array_equal(cache.items, fresh.items) and np.array_equal(cache.confusion, fresh.confusion)
+
+
+def test_unchanged_panels_are_not_rendered_again(store, tmp_path, renders):
+    out = str(tmp_path / "report")
+    assert build_reports(store, out, workers=1)[""] == {"panels": 8, "rendered": 8}
+    assert sorted(renders) == sorted(f"{kind}_{panel}.png" for kind in ("edge", "corner", "pairs")
+                                     for panel in report._panels(kind))
+    with open(os.path.join(out, "manifest.json")) as file:
+        assert len(json.load(file)) == 8
+
+    renders.clear()
+    assert build_reports(store, out, workers=1)[""]["rendered"] == 0
+    # Only the corner panels show the re-graded session
+    store.update(np.array([3]), "correct", False)
+    assert build_reports(store, out, workers=1)[""]["rendered"] == 3
+    assert sorted(renders) == ["corner_confusion.png", "corner_items.png", "corner_trend.png"]
+
+    # A deleted panel is drawn again, and force redraws everything
+    renders.clear()
+    os.remove(os.path.join(out, "edge_trend.png"))
+    assert build_reports(store, out, workers=1)[""]["rendered"] == 1 and renders == ["edge_trend.png"]
+    assert build_reports(store, out, force=True, workers=1)[""]["rendered"] == 8
+    assert "corner_items.png?v=" in open(os.path.join(out, "index.html")).read()
+
+
+def test_per_user_reports(store, tmp_path, renders):
+    out = str(tmp_path / "report")
+    results = build_reports(store, out, per_user=True, workers=1)
+    assert sorted(results) == ["", "ana", "bo"]
+    assert results["ana"] == {"panels": 3, "rendered": 3}
+    assert results["bo"] == {"panels": 2, "rendered": 2}
+    assert os.path.exists(os.path.join(out, "bo", "index.html"))
+    assert not os.path.exists(os.path.join(out, "bo", "edge_trend.png"))
+
+
+def test_write_report_of_no_sessions(store, tmp_path, renders):
+    cache = ReportCache()
+    cache.sync(store)
+    assert write_report(cache, str(tmp_path / "empty"), sessions=[]) == {"panels": 0, "rendered": 0}
+    assert renders == []
+
+
+def test_panels_are_drawn_as_png(store, tmp_path):
+    cache = ReportCache()
+    cache.sync(store)
+    out = str(tmp_path / "report")
+    assert write_report(cache, out, workers=1) == {"panels": 8, "rendered": 8}
+    with open(os.path.join(out, "edge_confusion.png"), 'rb') as file:
+        assert file.read(8) == b"\x89PNG\r\n\x1a\n"
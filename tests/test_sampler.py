@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from sctools.sampler import PieceSampler, history_weights
+
+
+def test_same_seed_same_sequence():
+    a = PieceSampler(seed=7)
+    b = PieceSampler(seed=7)
+    assert [a.next() for _ in range(500)] == b.sample(500).tolist()
+
+
+def test_mixing_sample_and_next_keeps_the_sequence():
+    a = PieceSampler(seed=3, block_size=16)
+    b = PieceSampler(seed=3, block_size=16)
+    mixed = [a.next() for _ in range(5)] + a.sample(40).tolist() + [a.next() for _ in range(5)]
+    assert mixed == b.sample(50).tolist()
+
+
+def test_avoid_repeats():
+    prompts = PieceSampler(seed=1).sample(5000)
+    assert not (prompts[1:] == prompts[:-1]).any()
+
+
+def test_single_possible_item_does_not_hang():
+    weights = np.zeros(24)
+    weights[5] = 1.0
+    sampler = PieceSampler(weights=weights, seed=0, block_size=64)
+    assert (sampler.sample(200) == 5).all()
+    assert PieceSampler(n=1, seed=0).next() == 0
+
+
+def test_weights_follow_probabilities():
+    weights = np.zeros(24)
+    weights[[2, 9]] = [3.0, 1.0]
+    prompts = PieceSampler(weights=weights, seed=0, avoid_repeats=False).sample(20000)
+    assert set(np.unique(prompts).tolist()) == {2, 9}
+    assert 0.7 < (prompts == 2).mean() < 0.8
+
+
+@pytest.mark.parametrize("weights", [np.zeros(24), -np.ones(24), np.ones(23), np.full(24, np.nan)])
+def test_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        PieceSampler(weights=weights)
+
+
+@pytest.mark.parametrize("weights", [[0.999999, 1e-6], [1e-6, 0.999999, 0.0]])
+def test_skewed_weights_avoid_repeats_quickly(weights):
+    sampler = PieceSampler(n=len(weights), weights=weights, seed=0, block_size=4096)
+    prompts = sampler.sample(4096)
+    assert not (prompts[1:] == prompts[:-1]).any()
+    assert set(np.unique(prompts).tolist()) == {0, 1}
+
+
+def test_redraws_skip_zero_weights():
+    weights = np.zeros(24)
+    weights[[0, 7, 23]] = [5.0, 1.0, 2.0]
+    prompts = PieceSampler(weights=weights, seed=2).sample(5000)
+    assert set(np.unique(prompts).tolist()) == {0, 7, 23}
+    assert not (prompts[1:] == prompts[:-1]).any()
+
+
+def test_history_weights():
+    weights = history_weights([0, 10, 10], [0, 0, 5])
+    assert weights[0] == pytest.approx(0.55)
+    assert weights[1] < weights[2] < weights[0]
+    assert history_weights([0], [0], floor=0.0)[0] == pytest.approx(0.5)
+    # Twice the median time weighs twice as much; unseen times count as the median
+    timed = history_weights([4, 4, 4, 4], [1, 1, 1, 1], mean_times=[1.0, 2.0, 1.0, np.nan])
+    assert timed[1] == pytest.approx(2 * timed[0]) and timed[3] == pytest.approx(timed[0])
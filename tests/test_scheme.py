@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from sctools.bld import (INVALID_IDX, SCHEMES, SPEFFZ, Trainer, encode_letters, get_scheme,
+                         register_scheme)
+from sctools.logstore import make_records
+from sctools.report import aggregate
+
+# Speffz shifted by one: memo position 0 is "B", position 23 is "A"
+SHIFTED = SPEFFZ[1:] + SPEFFZ[0]
+
+
+def test_get_scheme_is_memoized():
+    assert get_scheme(letters=SHIFTED) is get_scheme(letters=SHIFTED.lower())
+    assert get_scheme(letters=SHIFTED) is not get_scheme()
+    assert get_scheme("default") is SCHEMES["default"]
+
+
+def test_unknown_and_invalid_schemes_are_rejected():
+    with pytest.raises(ValueError, match="Unknown scheme"):
+        get_scheme("nope")
+    with pytest.raises(ValueError, match="24 different letters"):
+        get_scheme(letters="A" * 24)
+    with pytest.raises(ValueError, match="24 different letters"):
+        get_scheme(letters=SPEFFZ[:-1])
+
+
+def test_register_scheme():
+    try:
+        scheme = register_scheme("shifted", letters=SHIFTED)
+        assert get_scheme("shifted") is scheme
+        assert Trainer(scheme="shifted").scheme is scheme
+    finally:
+        SCHEMES.pop("shifted", None)
+
+
+def test_custom_letters_encode_to_memo_positions():
+    scheme = get_scheme(letters=SHIFTED)
+    assert encode_letters("B", scheme) == 0
+    assert encode_letters("a", scheme) == 23
+    assert encode_letters(np.array(["b", "A", "quit"]), scheme).tolist() == [0, 23, INVALID_IDX]
+    assert encode_letters("B") == 1
+
+
+def test_custom_letters_check_answers():
+    trainer = Trainer(seed=0, scheme=get_scheme(letters=SHIFTED))
+    piece = trainer.scheme.encoders["edge"]["idx_to_tuple"][0]
+    assert trainer.get_piece_memo_letter(piece, ptype="edge") == "B"
+    assert trainer.check_piece_memo_letter(piece, "b", ptype="edge")
+    assert not trainer.check_piece_memo_letter(piece, "a", ptype="edge")
+
+
+def test_answers_are_stored_as_memo_positions():
+    scheme = get_scheme(letters=SHIFTED)
+    now = datetime.now()
+    records = make_records(1, "edge", [now, now], [0, 0], ["B", "C"], [True, False],
+                           [1.0, 1.0], scheme=scheme)
+    assert records["answer"].tolist() == [0, 1]
+
+    _, _, confusion = aggregate(records)
+    assert sorted(zip(confusion["expected"], confusion["answer"])) == [(0, 0), (0, 1)]
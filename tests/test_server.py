@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+import sctools.server as server_module
+from sctools import paths
+from sctools.bld import PieceAtlas, Trainer
+from sctools.logstore import LogStore
+from sctools.server import DrillServer
+
+
+@pytest.fixture(scope="module")
+def atlas():
+    return PieceAtlas.build(Trainer(renderer="raster"))
+
+
+async def _request(port, method, path, body=b"", headers=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"{method} {path} HTTP/1.1\r\n{headers}Connection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), payload
+
+
+def _serve(server, requests):
+    async def run():
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return await requests(port)
+    return asyncio.run(run())
+
+
+def test_invalid_content_length_is_a_bad_request(atlas):
+    server = DrillServer(atlas, log=False)
+
+    async def requests(port):
+        return [await _request(port, "POST", "/api/sessions", headers=f"Content-Length: {value}\r\n")
+                for value in ("abc", "-1")]
+    assert [status for status, _ in _serve(server, requests)] == [400, 400]
+
+
+def test_other_scheme_images_render_off_the_loop(atlas, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    server = DrillServer(atlas, log=False)
+
+    async def requests(port):
+        body = json.dumps({"user": "u", "kind": "edge", "orientation": ["white", "red"]}).encode()
+        _, session = await _request(port, "POST", "/api/sessions", body, f"Content-Length: {len(body)}\r\n")
+        _, prompt = await _request(port, "GET", f"/api/sessions/{json.loads(session)['session']}/next")
+        # Two requests for the same new scheme share one render
+        return await asyncio.gather(*(_request(port, "GET", json.loads(prompt)["image"]) for _ in range(2)))
+
+    (status, png), (other_status, other_png) = _serve(server, requests)
+    assert status == other_status == 200
+    assert png.startswith(b"\x89PNG") and png == other_png
+    assert len(server.pngs) == 2 and not server._rendering
+
+
+def test_session_state_is_loaded_and_saved_off_the_loop(atlas, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    loads = []
+    load_scheduler = server_module._load_scheduler
+
+    def load(user):
+        loads.append(threading.current_thread())
+        return load_scheduler(user)
+    monkeypatch.setattr(server_module, "_load_scheduler", load)
+    server = DrillServer(atlas, store_path=str(tmp_path / "store"))
+
+    async def requests(port):
+        body = json.dumps({"user": "u", "kind": "edge"}).encode()
+        # Two sessions of a new user share one scheduler load
+        created = await asyncio.gather(*(_request(port, "POST", "/api/sessions", body,
+                                                  f"Content-Length: {len(body)}\r\n") for _ in range(2)))
+        return [await _request(port, "DELETE", f"/api/sessions/{json.loads(session)['session']}")
+                for _, session in created]
+
+    assert [status for status, _ in _serve(server, requests)] == [200, 200]
+    server.close()
+    assert len(loads) == 1 and loads[0] is not threading.main_thread()
+    assert len(server.schedulers) == 1 and not server._loading
+    assert os.path.exists(paths.user_srs_state_path("u"))
+    assert len(LogStore(str(tmp_path / "store")).sessions) == 2
+
+
+def test_expired_sessions_are_closed(atlas, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    server = DrillServer(atlas, log=False, session_ttl=0.0)
+
+    async def run():
+        await server.create_session({"user": "u", "kind": "corner"})
+        await server.expire_sessions()
+    asyncio.run(run())
+    server.close()
+    assert not server.sessions
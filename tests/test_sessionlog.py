@@ -0,0 +1,17 @@
+from sctools.analytics import AnalyticsIndex
+from sctools.sessionlog import SessionLog
+
+
+def test_index_only_counts_stored_attempts(tmp_path):
+    with SessionLog("edge", path=str(tmp_path)) as log:
+        for item in range(5):
+            log.record(item, "b", True, 1.0)
+            # Never ahead of what is on disk, whenever the writer flushes
+            assert log.index.offset <= len(log.store)
+        log.writer.flush()
+        assert log.index.offset == len(log.store) == 5
+        assert log.index.count.sum() == 5
+
+    index = AnalyticsIndex.for_store(log.store)
+    assert index.offset == 5
+    assert index.sync(log.store) == 0
@@ -0,0 +1,61 @@
+import math
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from sctools.logstore import make_records
+from sctools.simulate import LearnerModel, simulate, summarize
+
+
+def _mean_prompts(model, strategy, n_items=8):
+    return summarize(simulate(model, 50, strategy, n_items=n_items, workers=1), n_items)["prompts_mean"]
+
+
+def test_default_model_is_not_degenerate():
+    assert LearnerModel().degenerate() == []
+
+
+def test_degenerate_behaviours_fall_back_to_the_prior():
+    model = LearnerModel(p0=0.9, p_max=0.9, rate=0.3, memory=math.inf, item_sigma=0.0, t0=2.0)
+    assert model.degenerate() == ["memory", "item_sigma", "learning"]
+
+    prior = LearnerModel()
+    fixed = model.with_prior(prior)
+    assert fixed.degenerate() == []
+    for name in ("memory", "item_sigma", "p0", "p_max", "rate"):
+        assert getattr(fixed, name) == getattr(prior, name)
+    # Fitted behaviours are kept
+    assert fixed.t0 == 2.0 and model.memory == math.inf
+
+
+def test_fit_without_learning_is_degenerate():
+    rng = np.random.default_rng(0)
+    n = 240
+    start = datetime(2024, 1, 1)
+    records = make_records(0, "edge", [start + timedelta(seconds=5 * i) for i in range(n)],
+                           np.arange(n) % 24, ["a"] * n, np.ones(n, dtype=bool),
+                           rng.lognormal(1.0, 0.3, n))
+    assert "learning" in LearnerModel.fit(records).degenerate()
+
+
+def test_spacing_loses_to_random_order_when_memories_fade_fast():
+    # Forgotten within seconds: the scheduler's spaced repeats are forgotten too
+    model = LearnerModel(p0=0.2, rate=10.0, memory=5.0)
+    srs = _mean_prompts(model, "srs")
+    assert srs > 1.1 * _mean_prompts(model, "random")
+    assert srs > 1.1 * _mean_prompts(model, "weighted")
+
+
+def test_strategies_tie_on_a_degenerate_model():
+    model = LearnerModel(memory=math.inf, item_sigma=0.0)
+    prompts = [_mean_prompts(model, strategy) for strategy in ("srs", "random", "weighted")]
+    assert max(prompts) < 1.05 * min(prompts)
+
+
+@pytest.mark.parametrize("strategy", ["srs", "random", "weighted"])
+def test_sessions_are_seeded(strategy):
+    model = LearnerModel()
+    a = simulate(model, 20, strategy, n_items=6, workers=1, seed=3)
+    b = simulate(model, 20, strategy, n_items=6, workers=1, seed=3, chunk_size=7)
+    assert np.array_equal(a, b)
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+from sctools import paths
+from sctools.srs import DAY, RELEARN_DELAY, Card, Scheduler, all_keys, quality
+
+
+def test_save_creates_the_logs_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path / "empty"))
+    scheduler = Scheduler(paths.srs_state_path(), keys=["pairs:AB"])
+    scheduler.review("pairs:AB", 5, now=0.0)
+    scheduler.save()
+    assert os.path.exists(paths.srs_state_path())
+    reloaded = Scheduler(paths.srs_state_path())
+    assert reloaded.cards["pairs:AB"].to_list() == scheduler.cards["pairs:AB"].to_list()
+
+
+def test_intervals_grow_with_the_ease():
+    scheduler = Scheduler(keys=["a"])
+    card = scheduler.review("a", 4, now=0.0)
+    assert card.interval == 1.0 and card.due == DAY and card.ease == pytest.approx(2.5)
+    card = scheduler.review("a", 4, now=card.due)
+    assert card.interval == 6.0
+    card = scheduler.review("a", 5, now=card.due)
+    assert card.interval == pytest.approx(6.0 * 2.5)
+    assert card.ease == pytest.approx(2.6)
+
+
+def test_lapse_resets_and_lowers_the_ease():
+    scheduler = Scheduler(keys=["a"])
+    scheduler.review("a", 5, now=0.0)
+    card = scheduler.review("a", quality(False, 1.0), now=100.0)
+    assert (card.reps, card.lapses, card.interval) == (0, 1, 0.0)
+    assert card.due == 100.0 + RELEARN_DELAY
+    assert card.ease == pytest.approx(2.6 - 0.54)
+    for _ in range(10):
+        card = scheduler.review("a", 0, now=200.0)
+    assert card.ease == 1.3
+
+
+def test_quality_grades():
+    assert [quality(True, 1.0), quality(True, 3.0), quality(True, 9.0), quality(False, 1.0)] == [5, 4, 3, 1]
+
+
+def test_heap_serves_the_earliest_due():
+    scheduler = Scheduler()
+    scheduler.cards = {key: Card(due=due) for key, due in (("a", 30.0), ("b", 10.0), ("c", 20.0))}
+    scheduler._heap = []
+    for key in scheduler.cards:
+        scheduler._push(key)
+    assert scheduler.peek() == "b"
+    scheduler.review("b", 5, now=0.0)
+    assert scheduler.peek() == "c"
+
+
+def test_session_queue_order_and_retire():
+    scheduler = Scheduler(keys=["a", "b", "c"])
+    queue = scheduler.session(["a", "b"])
+    first = queue.next()
+    queue.review(first, 5, now=1.0)
+    second = queue.next()
+    assert {first, second} == {"a", "b"}
+    queue.retire(second)
+    assert queue.next() == first
+
+
+def test_scheduler_heap_stays_compact():
+    keys = all_keys()[:10]
+    scheduler = Scheduler(keys=keys)
+    queue = scheduler.session(keys)
+    for i in range(500):
+        queue.review(queue.next(), 5, now=float(i))
+    assert len(scheduler._heap) <= 2 * len(scheduler.cards)
+    assert scheduler.peek() == min(keys, key=lambda k: (scheduler.cards[k].due, k))
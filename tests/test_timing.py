@@ -0,0 +1,89 @@
+import math
+import os
+import sys
+import threading
+
+import pytest
+
+from sctools import timing
+from sctools.timing import PromptTimer, _read_keys, read_answer
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A perf_counter_ns that moves only when told to."""
+    now = [0]
+    monkeypatch.setattr(timing.time, "perf_counter_ns", lambda: now[0])
+    return now
+
+
+def _keys(text):
+    return iter(text).__next__
+
+
+def test_durations_are_measured_from_display(clock):
+    timer = PromptTimer()
+    assert math.isnan(timer.response_time)
+    timer.start_render()
+    clock[0] = 20_000_000
+    timer.displayed()
+    clock[0] = 520_000_000
+    timer.key()
+    clock[0] = 900_000_000
+    timer.key()
+    timer.submitted()
+    assert timer.render_latency == pytest.approx(0.02)
+    assert timer.reaction_time == pytest.approx(0.5)
+    assert timer.response_time == pytest.approx(0.88)
+
+
+def test_submit_without_keys_is_the_first_key(clock):
+    timer = PromptTimer()
+    timer.displayed()
+    clock[0] = 10 ** 9
+    timer.submitted()
+    assert timer.render_latency == 0.0
+    assert timer.reaction_time == timer.response_time == 1.0
+
+
+def test_read_keys_edits_and_submits(clock, capsys):
+    assert _read_keys(_keys("ab\x7fc\x01\r"), PromptTimer(), single_key=False) == "ac"
+    assert _read_keys(_keys("\x7fxyz"), PromptTimer(), single_key=True) == "x"
+    assert capsys.readouterr().out == "ab\b \bcx"
+
+
+@pytest.mark.parametrize("key", ["\x1b", "\x04"])
+def test_quit_keys(key):
+    assert _read_keys(_keys("a" + key), PromptTimer(), single_key=False) == "quit"
+
+
+def test_ctrl_c_interrupts():
+    with pytest.raises(KeyboardInterrupt):
+        _read_keys(_keys("a\x03"), PromptTimer(), single_key=False)
+
+
+def test_input_fallback(monkeypatch, clock):
+    monkeypatch.setattr("builtins.input", lambda prompt: "b")
+    timer = PromptTimer()
+    assert read_answer("? ", timer, raw=False) == ("b", timer)
+    assert timer.response_time == 0.0
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX terminals only")
+@pytest.mark.parametrize("typed, answer", [
+    (b"a\x1b[Db\x1b[1;5Cc\x1bOP\r", "abc"),   # arrow, Ctrl-arrow and F1 keys are skipped
+    (b"a\x1b", "quit"),
+])
+def test_raw_terminal_skips_escape_sequences(monkeypatch, typed, answer):
+    master, slave = os.openpty()
+    # Typed once the terminal is in cbreak mode, which discards earlier input
+    typist = threading.Timer(0.2, os.write, (master, typed))
+    try:
+        with os.fdopen(slave, "r", closefd=False) as stdin:
+            monkeypatch.setattr(sys, "stdin", stdin)
+            typist.start()
+            assert read_answer("", PromptTimer())[0] == answer
+    finally:
+        typist.join()
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from sctools import paths, trace
+from sctools.cli import main as cli_main
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A perf_counter_ns that advances 1 ms per reading."""
+    now = [0]
+
+    def tick():
+        now[0] += 1_000_000
+        return now[0]
+    monkeypatch.setattr(trace.time, "perf_counter_ns", tick)
+
+
+@pytest.fixture(autouse=True)
+def stopped():
+    yield
+    trace.stop()
+
+
+def test_spans_are_free_and_unrecorded_when_off():
+    assert trace.active() is None
+    assert trace.span("render") is trace.span("grade")
+    with trace.span("render"):
+        trace.next_prompt()
+    assert trace.finish() is None
+
+
+def test_chrome_trace_of_a_session(clock, tmp_path):
+    tracer = trace.start("edge_rec_session", {"seed": 7})
+    for _ in range(2):
+        trace.next_prompt()
+        with trace.span("prompt"):
+            with trace.span("prompt.render"):
+                pass
+    path = trace.finish(str(tmp_path / "t.json"), session=3)
+    assert trace.active() is None and path == str(tmp_path / "t.json")
+
+    with open(path) as file:
+        data = json.load(file)
+    assert data["otherData"]["prompts"] == 2
+    assert data["otherData"]["session"] == 3 and data["otherData"]["seed"] == 7
+    events = data["traceEvents"]
+    assert [(e["name"], e["args"]["prompt"]) for e in events] == [
+        ("prompt.render", 1), ("prompt", 1), ("prompt.render", 2), ("prompt", 2)]
+    assert all(e["ph"] == "X" and e["cat"] == "prompt" for e in events)
+    # Every reading is 1 ms later: the inner span takes 1 ms, the outer one 3 ms
+    assert [e["dur"] for e in events[:2]] == [1000.0, 3000.0]
+    assert events[0]["ts"] > events[1]["ts"] and tracer.events
+
+
+def test_default_path_and_files(clock, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCTOOLS_HOME", str(tmp_path))
+    tracer = trace.start("bld_pairs_session")
+    path = trace.finish(session=12)
+    assert os.path.dirname(path) == paths.traces_dir()
+    assert os.path.basename(path) == f"bld_pairs_session_12_{tracer.started:%Y%m%d_%H%M%S}.json"
+    assert trace.trace_files(paths.traces_dir()) == [path]
+    assert trace.trace_files(str(tmp_path / "missing")) == []
+
+
+def test_durations_summary(clock, tmp_path):
+    files = []
+    for i in range(2):
+        trace.start("s")
+        for _ in range(5):
+            trace.next_prompt()
+            with trace.span("grade"):
+                pass
+        files.append(trace.finish(str(tmp_path / f"{i}.json")))
+    durations = trace.load_durations(files)
+    assert list(durations) == ["grade"] and durations["grade"] == pytest.approx([0.001] * 10)
+    (stage, count, mean, p50, p95, p99, longest), = trace.summarize(durations)
+    assert (stage, count) == ("grade", 10)
+    assert [mean, p50, p95, p99, longest] == pytest.approx([0.001] * 5)
+
+
+def test_traces_budget_sets_the_exit_status(clock, tmp_path, capsys):
+    trace.start("s")
+    with trace.span("prompt"):
+        pass
+    path = trace.finish(str(tmp_path / "t.json"))
+    assert cli_main(["traces", path, "--stage", "prompt", "--budget", "5"]) == 0
+    assert cli_main(["traces", path, "--stage", "prompt", "--budget", "0.5"]) == 1
+    # No timings of the stage at all
+    assert cli_main(["traces", path, "--budget", "5"]) == 1
+    assert "over the 0.5 ms budget" in capsys.readouterr().out